@@ -0,0 +1,72 @@
+"""
+Benchmark de l'ingestion d'un delta : mise à jour incrémentale vs reconstruction complète.
+
+Usage : python -m src.bench.ingest_bench [--sizes 1 10 100 500]
+
+Pour chaque taille N, les N dernières cartes de `full.json` sont retirées d'une
+copie du dataset (dans un dossier temporaire) puis ajoutées sous forme de
+fichier delta : on mesure la fusion incrémentale dans le snapshot existant,
+puis la reconstruction complète du même dataset. Le vrai dataset et le cache
+de l'application ne sont pas modifiés.
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from src.core.ingest import ingest_dataset
+from src.core.make_proxies import DATASET_PATH, pick_image_url
+
+
+def split_dataset(data: Dict, n: int):
+    """(dataset sans ses `n` dernières cartes, réparties au prorata des sous-ensembles ; delta de ces cartes)."""
+    subsets = {k: v for k, v in data["cards"].items() if isinstance(v, list)}
+    total = sum(len(v) for v in subsets.values())
+    takes = {k: min(len(v), round(n * len(v) / total)) for k, v in subsets.items()}
+    if not any(takes.values()):
+        takes[max(subsets, key=lambda k: len(subsets[k]))] = 1
+    base, delta = dict(data, cards=dict(data["cards"])), {}
+    for k, take in takes.items():
+        if take:
+            base["cards"][k], delta[k] = subsets[k][:-take], subsets[k][-take:]
+    return base, {"cards": delta}
+
+
+def measure(work: Path, base: Dict, delta: Dict) -> List[float]:
+    full, deltas = work / "full.json", work / "deltas"
+    shutil.rmtree(work, ignore_errors=True)
+    deltas.mkdir(parents=True)
+    full.write_text(json.dumps(base, ensure_ascii=False), encoding="utf-8")
+    snap, manifest = work / "cards.snapshot", work / "manifest.json"
+    ingest_dataset(snap, manifest, full, deltas, pick_image_url)
+
+    (deltas / "delta.json").write_text(json.dumps(delta, ensure_ascii=False), encoding="utf-8")
+    t0 = time.perf_counter()
+    _, _, report = ingest_dataset(snap, manifest, full, deltas, pick_image_url)
+    incremental = time.perf_counter() - t0
+    assert report.mode == "incrémental", report
+
+    t0 = time.perf_counter()
+    ingest_dataset(work / "full.snapshot", work / "full_manifest.json", full, deltas, pick_image_url)
+    return [report.added, incremental, time.perf_counter() - t0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="*", type=int, default=[1, 10, 100, 500])
+    args = parser.parse_args(argv)
+
+    data = json.loads(DATASET_PATH.read_text(encoding="utf-8"))
+    print(f"{'delta':>6} {'ajoutées':>9} {'incrémental':>12} {'complet':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            base, delta = split_dataset(data, n)
+            added, inc, full = measure(Path(tmp) / f"n{n}", base, delta)
+            print(f"{n:>6} {added:>9} {inc * 1000:9.1f} ms {full * 1000:6.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark mémoire du dataset chargé : dicts JSON bruts vs cartes compactes vs snapshot.
+
+Usage : python -m src.bench.memory_bench
+
+Chaque variante est chargée dans un interpréteur neuf (cartes + index de
+recherche, sans l'index approché) :
+- `brut`     : implémentation historique, dicts d'origine avec variantes comptées comme cartes
+- `compact`  : ingestion actuelle du JSON (`CardRecord`, variantes écartées)
+- `snapshot` : lecture du snapshot binaire mappé en mémoire
+On mesure la mémoire Python retenue (tracemalloc, après ramasse-miettes),
+la mémoire résidente ajoutée (Linux) et la durée du chargement.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict, List
+
+VARIANTS = ("brut", "compact", "snapshot")
+
+PROBE = r"""
+import gc, json, os, sys, time, tracemalloc
+from src.bench.memory_bench import load_variant
+
+def rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+import src.core.make_proxies  # modules importés avant la mesure
+variant, traced = sys.argv[1], sys.argv[2] == "1"
+gc.collect()
+if traced:
+    tracemalloc.start()
+r0 = rss()
+t0 = time.perf_counter()
+kept = load_variant(variant)
+seconds = time.perf_counter() - t0
+gc.collect()
+out = {"cards": len(kept[0]), "seconds": seconds}
+if traced:
+    out["heap"] = tracemalloc.get_traced_memory()[0]
+elif r0 is not None:
+    out["rss"] = rss() - r0
+print("RESULT " + json.dumps(out))
+"""
+
+
+# =========================
+# Implémentation historique (référence)
+# =========================
+def legacy_read_dataset(path) -> List[Dict]:
+    data = json.loads(path.read_text(encoding="utf-8").strip())
+    cards: List[Dict] = []
+    seen_ids = set()
+
+    def add_card(c):
+        if not isinstance(c, dict):
+            return
+        cid = str(c.get("card_id") or c.get("id") or id(c))
+        if cid not in seen_ids:
+            cards.append(c)
+            seen_ids.add(cid)
+        for val in c.values():
+            if isinstance(val, list):
+                for sub in val:
+                    if isinstance(sub, dict):
+                        add_card(sub)
+            elif isinstance(val, dict):
+                add_card(val)
+
+    for subset in data["cards"].values():
+        for c in subset if isinstance(subset, list) else [subset]:
+            add_card(c)
+    return cards
+
+
+def read_dataset(dataset_path, deltas_dir) -> List:
+    """
+    Lecture complète du JSON par l'ingestion actuelle, sans snapshot : `full.json`
+    puis les deltas, chaque carte réduite à un `CardRecord`.
+    """
+    from src.core.ingest import collect_records, parse_subset, read_subsets, source_files
+    from src.core.make_proxies import pick_image_url
+
+    subsets = []
+    for name, path in source_files(dataset_path, deltas_dir):
+        subsets.extend(read_subsets(name, path.read_text(encoding="utf-8")))
+    for s in subsets:
+        parse_subset(s)
+    return collect_records(subsets, pick_image_url)
+
+
+def load_variant(variant: str):
+    """(cartes, index) chargés selon la variante ; le snapshot est créé au besoin."""
+    from src.core import make_proxies as mp
+    from src.core.search_index import CardIndex
+
+    if variant == "brut":
+        cards = legacy_read_dataset(mp.DATASET_PATH)
+        return cards, CardIndex(cards)
+    if variant == "compact":
+        cards = read_dataset(mp.DATASET_PATH, mp.DELTAS_DIR)
+        return cards, CardIndex(cards)
+    # Snapshot validé par le manifeste du dataset, reconstruit s'il ne correspond plus aux sources
+    return mp._load_cards_and_index()
+
+
+def run_probe(variant: str, traced: bool) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE, variant, "1" if traced else "0"], capture_output=True, text=True
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[7:])
+    raise RuntimeError(proc.stderr.strip() or "aucun résultat")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--variants", nargs="*", choices=VARIANTS, default=list(VARIANTS))
+    args = parser.parse_args(argv)
+
+    # Snapshot à jour avant de le mesurer
+    from src.core import make_proxies as mp
+    mp.DATASET.get()
+
+    print(f"{'variante':<10} {'cartes':>7} {'tas Python':>11} {'RSS ajoutée':>12} {'durée':>9}")
+    for variant in args.variants:
+        plain = run_probe(variant, traced=False)
+        traced = run_probe(variant, traced=True)
+        rss = f"{plain['rss'] / 1e6:9.1f} Mo" if "rss" in plain else f"{'n/d':>12}"
+        print(
+            f"{variant:<10} {plain['cards']:>7} {traced['heap'] / 1e6:8.1f} Mo {rss} "
+            f"{plain['seconds'] * 1000:7.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
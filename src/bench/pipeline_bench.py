@@ -0,0 +1,295 @@
+"""
+Benchmark des étapes du pipeline de génération, hors ligne et reproductible.
+
+Usage :
+    python -m src.bench.pipeline_bench [--sizes 60,200,1000] [--out bench.json]
+    python -m src.bench.pipeline_bench --save-baseline baseline.json
+    python -m src.bench.pipeline_bench --baseline baseline.json [--tolerance 0.15]
+
+Chaque étape est chronométrée séparément (médiane de `--repeat` passages),
+puis rejouée une fois sous tracemalloc pour son pic mémoire Python. Les
+decklists synthétiques sont tirées de `data/full.json` ; les illustrations
+sont servies par un serveur HTTP local. Avec `--baseline`, les étapes plus
+lentes (ou plus gourmandes) que la référence au-delà de la tolérance sont
+signalées et le code de sortie vaut 1.
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from PIL import Image, ImageDraw
+
+from src.bench.memory_bench import read_dataset
+from src.core import make_proxies as mp
+from src.core.decklist import QueryCache, parse_decklist, resolve_deck
+from src.core.image_store import ImageStore
+from src.core.pdf_writer import PdfStreamWriter
+from src.core.prefetch import prefetch_images
+from src.core.search_index import card_title
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Écarts ignorés sous ces seuils (bruit de mesure)
+NOISE_SECONDS = 0.005
+NOISE_KB = 1024
+
+
+# =========================
+# Données synthétiques
+# =========================
+def build_deck(cards: List[Dict], size: int, seed: int = 42) -> str:
+    """Decklist « quantité titre » de `size` cartes, tirée du dataset."""
+    rng = random.Random(seed + size)
+    named = [c for c in cards if c.get("name")]
+    lines, total = [], 0
+    while total < size:
+        qty = min(rng.randint(1, 4), size - total)
+        lines.append(f"{qty} {card_title(rng.choice(named))}")
+        total += qty
+    return "\n".join(lines)
+
+def stub_image(i: int) -> bytes:
+    """Illustration factice au format des images du dataset (JPEG 1468 x 2048)."""
+    im = Image.new("RGB", (1468, 2048), ((i * 37) % 256, (i * 91) % 256, (i * 53) % 256))
+    d = ImageDraw.Draw(im)
+    for k in range(0, 2048, 40):
+        d.line((0, k, 1468, 2048 - k), fill=((k + i) % 256, 128, 255 - k % 256), width=9)
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+def start_stub_server(n_images: int) -> ThreadingHTTPServer:
+    """Serveur HTTP local servant /0.jpg … /{n-1}.jpg depuis la mémoire."""
+    images = {f"/{i}.jpg": stub_image(i) for i in range(n_images)}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = images.get(self.path.split("?", 1)[0])
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# =========================
+# Mesure
+# =========================
+class Bench:
+    def __init__(self, repeat: int, memory: bool):
+        self.repeat = repeat
+        self.memory = memory
+        self.results: Dict[str, Dict] = {}
+
+    def run(
+        self,
+        name: str,
+        fn: Callable[[], object],
+        items: int = 1,
+        repeat: Optional[int] = None,
+        setup: Optional[Callable[[], None]] = None,
+    ) -> object:
+        """Chronomètre `fn` ; `setup` est rappelé avant chaque passage, hors chronomètre."""
+        times = []
+        result = None
+        for _ in range(repeat or self.repeat):
+            if setup:
+                setup()
+            t0 = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - t0)
+
+        entry = {"seconds": statistics.median(times), "min": min(times), "runs": len(times), "items": items}
+        if self.memory:
+            if setup:
+                setup()
+            tracemalloc.start()
+            fn()
+            entry["peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+        self.results[name] = entry
+        per_item = f"  {entry['seconds'] / items * 1000:8.2f} ms/élément" if items > 1 else ""
+        mem = f"  pic {entry['peak_kb'] / 1024:7.1f} Mo" if "peak_kb" in entry else ""
+        print(f"{name:<28} {entry['seconds'] * 1000:10.1f} ms{per_item}{mem}")
+        return result
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Liste les régressions (temps ou pic mémoire) par rapport à la référence."""
+    out = []
+    for name, cur in results.items():
+        ref = baseline.get(name)
+        if ref is None:
+            continue
+        if cur["seconds"] > ref["seconds"] * (1 + tolerance) and cur["seconds"] - ref["seconds"] > NOISE_SECONDS:
+            out.append(f"{name} : {ref['seconds'] * 1000:.1f} ms -> {cur['seconds'] * 1000:.1f} ms (x{cur['seconds'] / ref['seconds']:.2f})")
+        if "peak_kb" in cur and "peak_kb" in ref:
+            if cur["peak_kb"] > ref["peak_kb"] * (1 + tolerance) and cur["peak_kb"] - ref["peak_kb"] > NOISE_KB:
+                out.append(f"{name} : pic {ref['peak_kb']} Ko -> {cur['peak_kb']} Ko")
+    return out
+
+
+# =========================
+# Étapes
+# =========================
+def bench_dataset(b: Bench):
+    cards = b.run("read_dataset_json", lambda: read_dataset(mp.DATASET_PATH, mp.DELTAS_DIR), repeat=1)
+    b.run("build_card_index", lambda: mp._build_card_index(cards), items=len(cards), repeat=1)
+    b.run("load_snapshot", mp._load_cards_and_index, repeat=1)
+    mp.DATASET.get()
+    b.run("load_dataset_cached", mp.load_dataset, repeat=max(b.repeat, 5))
+    return mp.DATASET.get()
+
+def bench_search(b: Bench, state, decks: Dict[int, str]):
+    cards = state.cards
+    for size, text in decks.items():
+        lines = parse_decklist(text)
+        b.run(f"search_local[{size}]", lambda: [mp.search_local(cards, l.name) for l in lines], items=len(lines))
+        b.run(f"resolve_deck_cold[{size}]", lambda: resolve_deck(text, state, QueryCache(None)), items=len(lines))
+        warm = QueryCache(None)
+        resolve_deck(text, state, warm)
+        b.run(f"resolve_deck_warm[{size}]", lambda: resolve_deck(text, state, warm), items=len(lines))
+
+def bench_images(b: Bench, n_images: int) -> List[Image.Image]:
+    server = start_stub_server(n_images)
+    base = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{base}/{i}.jpg" for i in range(n_images)]
+    saved_store = mp.IMAGE_STORE
+    with tempfile.TemporaryDirectory(prefix="lorcy_bench_") as tmp:
+        # Cache d'images isolé : chaque passage « à froid » repart d'un magasin vide
+        def empty_cache():
+            mp.IMAGE_STORE.close()
+            for p in Path(tmp).iterdir():
+                if p.is_dir():
+                    shutil.rmtree(p)
+                else:
+                    p.unlink()
+            mp.IMAGE_STORE = ImageStore(Path(tmp))
+
+        mp.IMAGE_STORE = ImageStore(Path(tmp))
+        try:
+            images = b.run("fetch_image_cold", lambda: [mp.fetch_image(u) for u in urls], items=n_images, setup=empty_cache)
+            b.run("fetch_image_disk", lambda: [mp.fetch_image(u) for u in urls], items=n_images)
+            b.run(
+                "prefetch_images_cold",
+                lambda: [r.image for r in prefetch_images(urls, mp.fetch_image)],
+                items=n_images,
+                setup=empty_cache,
+            )
+        finally:
+            mp.IMAGE_STORE.close()
+            mp.IMAGE_STORE = saved_store
+            server.shutdown()
+            server.server_close()
+    b.run("resize_and_crop", lambda: [mp.resize_and_crop(im) for im in images], items=n_images)
+    b.run("resize_and_gray", lambda: [mp.resize_and_gray(im) for im in images], items=n_images)
+    return images
+
+def bench_text_cards(b: Bench, cards: List[Dict], n: int) -> List[Image.Image]:
+    sample = random.Random(7).sample([c for c in cards if c.get("name")], n)
+    mp.generate_text_card(sample[0])  # polices et gabarits chargés hors mesure
+    return b.run("generate_text_card", lambda: [mp.generate_text_card(c) for c in sample], items=n)
+
+def bench_layout_and_pdf(b: Bench, rendered: List[Image.Image], sizes: List[int], out_dir: Path):
+    for size in sizes:
+        deck = [(f"k{i % len(rendered)}", rendered[i % len(rendered)]) for i in range(size)]
+        pages = -(-size // (mp.COLS * mp.ROWS))
+
+        def layout():
+            for _ in mp.iter_pages(im for _, im in deck):
+                pass
+
+        b.run(f"layout_pages[{size}]", layout, items=pages, repeat=1)
+
+        def write_pdf():
+            with PdfStreamWriter(out_dir / f"bench_{size}.pdf", resolution=mp.DPI) as pdf:
+                mp.write_cards_pdf(pdf, deck, "text")
+
+        b.run(f"pdf_write[{size}]", write_pdf, items=pages, repeat=1)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.bench.pipeline_bench", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="60,200,1000", help="tailles des decks synthétiques")
+    parser.add_argument("--images", type=int, default=24, help="illustrations servies par le serveur local")
+    parser.add_argument("--text-cards", type=int, default=30, help="cartes texte rendues")
+    parser.add_argument("--repeat", type=int, default=3, help="passages par étape (médiane)")
+    parser.add_argument("--no-memory", action="store_true", help="ne pas mesurer le pic mémoire")
+    parser.add_argument("--out", type=Path, default=Path("pipeline_bench.json"), help="fichier de résultats JSON")
+    parser.add_argument("--baseline", type=Path, help="référence à comparer")
+    parser.add_argument("--save-baseline", type=Path, help="enregistre aussi les résultats comme référence")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="écart relatif toléré avant alerte")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    b = Bench(max(1, args.repeat), memory=not args.no_memory)
+
+    state = bench_dataset(b)
+    decks = {size: build_deck(state.cards, size) for size in sizes}
+    bench_search(b, state, decks)
+    bench_images(b, args.images)
+    rendered = bench_text_cards(b, state.cards, args.text_cards)
+    with tempfile.TemporaryDirectory(prefix="lorcy_bench_pdf_") as tmp:
+        bench_layout_and_pdf(b, rendered, sizes, Path(tmp))
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cards": len(state.cards),
+            "sizes": sizes,
+            "repeat": b.repeat,
+            "memory": b.memory,
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+        },
+        "stages": b.results,
+    }
+    args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Résultats : {args.out}")
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Référence enregistrée : {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(b.results, baseline.get("stages", {}), args.tolerance)
+        if regressions:
+            print(f"[REGRESSION] {len(regressions)} étape(s) au-delà de {args.tolerance:.0%} :")
+            for r in regressions:
+                print(f"  - {r}")
+            return 1
+        print(f"Aucune régression par rapport à {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
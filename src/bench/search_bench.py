@@ -0,0 +1,152 @@
+"""
+Benchmark de la recherche locale : index inversé (CardIndex) vs parcours linéaire historique,
+puis suggestions de l'index approché sur des titres comportant une faute de frappe.
+
+Usage : python -m src.bench.search_bench [--decks 20]
+"""
+import argparse
+import random
+import time
+from typing import List, Dict, Tuple
+
+from src.core.make_proxies import load_dataset
+from src.core.search_index import CardIndex, normalize, split_tokens, tokenize, card_title
+
+
+# =========================
+# Implémentation historique (référence)
+# =========================
+def legacy_build(cards: List[Dict]):
+    index = []
+    for c in cards:
+        name = c.get("name") or ""
+        subtitle = c.get("subtitle") or ""
+        full_title = card_title(c)
+        kws = [k for k in (c.get("searchable_keywords") or []) if isinstance(k, str)]
+        token_set = set(tokenize(full_title) + tokenize(name) + tokenize(subtitle))
+        for k in kws:
+            token_set.update(tokenize(k))
+        index.append({"card": c, "full_title_norm": normalize(full_title), "token_set": token_set})
+    return index
+
+def legacy_search(index, q: str) -> List[Dict]:
+    q_norm = normalize(q).strip()
+    if not q_norm:
+        return []
+    q_tokens = split_tokens(q_norm)
+    if not q_tokens:
+        return []
+
+    def token_matches(query_tok: str, candidate_tok: str) -> bool:
+        if query_tok == candidate_tok:
+            return True
+        return len(query_tok) >= 3 and candidate_tok.startswith(query_tok)
+
+    def card_matches(entry) -> bool:
+        return all(any(token_matches(qt, ct) for ct in entry["token_set"]) for qt in q_tokens)
+
+    exact = [e["card"] for e in index if e["full_title_norm"] == q_norm]
+    if exact:
+        return exact
+
+    seen = set()
+    out = []
+    for e in index:
+        if card_matches(e):
+            c = e["card"]
+            cid = c.get("card_id") or id(c)
+            if cid not in seen:
+                out.append(c)
+                seen.add(cid)
+    return out
+
+
+# =========================
+# Corpus de requêtes
+# =========================
+def build_queries(cards: List[Dict], n_decks: int, seed: int = 42) -> List[str]:
+    """Génère des decklists de 60 lignes : titres exacts, noms seuls, préfixes et fautes."""
+    rng = random.Random(seed)
+    named = [c for c in cards if c.get("name")]
+    queries = []
+    for _ in range(n_decks):
+        for c in rng.sample(named, 60):
+            title = card_title(c)
+            kind = rng.random()
+            if kind < 0.5:
+                queries.append(title)
+            elif kind < 0.7:
+                queries.append(c["name"])
+            elif kind < 0.9:
+                queries.append(" ".join(t[:3] for t in tokenize(title)))
+            else:
+                queries.append(title[::-1])
+    return queries
+
+def build_typos(cards: List[Dict], n: int, seed: int = 42) -> List[Tuple[str, str]]:
+    """(requête avec une lettre supprimée, ajoutée ou remplacée, titre normalisé attendu)."""
+    rng = random.Random(seed)
+    named = [c for c in cards if c.get("name")]
+    out = []
+    for c in rng.sample(named, n):
+        title = card_title(c)
+        i = rng.randrange(len(title))
+        kind = rng.random()
+        if kind < 1 / 3:
+            q = title[:i] + title[i + 1:]
+        elif kind < 2 / 3:
+            q = title[:i] + "x" + title[i:]
+        else:
+            q = title[:i] + "z" + title[i + 1:]
+        out.append((q, normalize(title)))
+    return out
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--decks", type=int, default=20, help="nombre de decklists de 60 lignes")
+    parser.add_argument("--typos", type=int, default=500, help="requêtes avec faute pour les suggestions")
+    args = parser.parse_args(argv)
+
+    cards = load_dataset()
+    queries = build_queries(cards, args.decks)
+
+    legacy_index, t_legacy_build = _timed(legacy_build, cards)
+    new_index, t_new_build = _timed(CardIndex, cards)
+
+    legacy_res, t_legacy = _timed(lambda: [legacy_search(legacy_index, q) for q in queries])
+    new_res, t_new = _timed(lambda: [new_index.search(q) for q in queries])
+
+    mismatches = [q for q, a, b in zip(queries, legacy_res, new_res) if [id(c) for c in a] != [id(c) for c in b]]
+
+    print(f"{len(cards)} cartes, {len(queries)} requêtes")
+    print(f"construction : linéaire {t_legacy_build * 1000:8.1f} ms | index {t_new_build * 1000:8.1f} ms")
+    print(f"recherche    : linéaire {t_legacy * 1000:8.1f} ms | index {t_new * 1000:8.1f} ms  (x{t_legacy / max(t_new, 1e-9):.0f})")
+    print(f"par requête  : linéaire {t_legacy / len(queries) * 1e6:8.1f} µs | index {t_new / len(queries) * 1e6:8.1f} µs")
+    if mismatches:
+        print(f"[ERREUR] {len(mismatches)} résultats différents, ex. : {mismatches[:5]}")
+        return 1
+    print("Résultats identiques.")
+
+    typos = build_typos(cards, args.typos)
+    _, t_fuzzy_build = _timed(lambda: new_index.fuzzy)
+    suggestions, t_fuzzy = _timed(lambda: [new_index.suggest(q) for q, _ in typos])
+    ranks = [
+        next((i for i, (c, _) in enumerate(s) if normalize(card_title(c)) == expected), None)
+        for (_, expected), s in zip(typos, suggestions)
+    ]
+    print(f"suggestions  : construction {t_fuzzy_build * 1000:.1f} ms, {t_fuzzy / len(typos) * 1e6:.1f} µs par requête")
+    print(
+        f"               titre attendu en tête {sum(r == 0 for r in ranks)}/{len(typos)}, "
+        f"parmi les 5 premiers {sum(r is not None for r in ranks)}/{len(typos)}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""
+Benchmark du démarrage de l'interface : délai avant la première fenêtre.
+
+Usage : python -m src.bench.startup_bench [--runs 5] [--cold]
+
+Chaque mesure lance un nouvel interpréteur (imports à froid) qui crée
+`LorcanaApp`, affiche la fenêtre puis attend que le dataset soit chargé.
+Avec `--cold`, le cache est vide (pas de snapshot) : le dataset est relu
+depuis `full.json`. Sans affichage disponible, seul le temps d'import du
+module de l'interface est mesuré.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import src.ui.main_window as ui
+t_import = time.perf_counter() - t0
+out = {"import": t_import, "heavy_modules": sorted(m for m in ("PIL", "requests") if m in sys.modules)}
+try:
+    app = ui.LorcanaApp()
+except Exception as e:  # pas d'affichage
+    out["error"] = str(e)
+else:
+    app.update()
+    out["window"] = time.perf_counter() - t0
+    while app._core_result is None:
+        app.update()
+        time.sleep(0.005)
+    out["ready"] = time.perf_counter() - t0
+    app.destroy()
+print("RESULT " + json.dumps(out))
+"""
+
+
+def run_probe(env) -> dict:
+    proc = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[7:])
+    raise RuntimeError(proc.stderr.strip() or "aucun résultat")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="nombre de démarrages mesurés")
+    parser.add_argument("--cold", action="store_true", help="cache vide à chaque démarrage (pas de snapshot)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for _ in range(args.runs):
+        env = dict(os.environ)
+        tmp = tempfile.mkdtemp(prefix="lorcy-bench-") if args.cold else None
+        if tmp:
+            env["LORCY_CACHE_DIR"] = tmp
+        try:
+            results.append(run_probe(env))
+        finally:
+            if tmp:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"Modules lourds chargés à l'import de l'interface : {', '.join(results[0]['heavy_modules']) or 'aucun'}")
+    for metric, label in (("import", "import de l'interface"), ("window", "première fenêtre"), ("ready", "dataset prêt")):
+        values = [r[metric] for r in results if metric in r]
+        if values:
+            print(f"{label:<24} médiane {statistics.median(values) * 1000:7.1f} ms  (min {min(values) * 1000:.1f} ms)")
+    if "error" in results[0]:
+        print(f"Fenêtre non mesurée : {results[0]['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark du rendu des cartes texte : rendu historique vs TextCardRenderer, sur tout le dataset.
+
+Usage : python -m src.bench.text_card_bench [--limit N]
+"""
+import argparse
+import time
+from typing import Dict
+
+from PIL import Image, ImageDraw, ImageChops
+
+from src.core.make_proxies import CARD_W_PX, CARD_H_PX, load_dataset
+from src.core.text_card import TextCardRenderer, open_font
+
+
+# =========================
+# Implémentation historique (référence)
+# =========================
+def _legacy_text_size(draw, text, font):
+    x0, y0, x1, y1 = draw.textbbox((0, 0), text, font=font)
+    return (x1 - x0, y1 - y0)
+
+def _legacy_draw_wrapped(draw, text, font, x, y, max_w, line_gap=6, fill="black"):
+    words = text.split()
+    line = ""
+    _, line_h = _legacy_text_size(draw, "Hg", font)
+    cy = y
+    for w in words:
+        probe = (line + " " + w) if line else w
+        tw, _ = _legacy_text_size(draw, probe, font)
+        if tw <= max_w:
+            line = probe
+        else:
+            draw.text((x, cy), line, fill=fill, font=font)
+            cy += line_h + line_gap
+            line = w
+    if line:
+        draw.text((x, cy), line, fill=fill, font=font)
+        cy += line_h + line_gap
+    return cy
+
+def legacy_text_card(card: Dict) -> Image.Image:
+    W, H = CARD_W_PX, CARD_H_PX
+    P, COST_BOX, LORE_COL_W, BORDER = 26, 82, 56, 3
+
+    img = Image.new("RGB", (W, H), "white")
+    d = ImageDraw.Draw(img)
+    d.rounded_rectangle([(5, 5), (W - 5, H - 5)], radius=22, outline="#B0B8C0", width=BORDER)
+
+    f_name = open_font("comicbd.ttf", 50)
+    f_sub = open_font("comic.ttf", 36)
+    f_type = open_font("comicbd.ttf", 32)
+    f_ability = open_font("comicbd.ttf", 44)
+    f_text = open_font("comic.ttf", 40)
+    f_stat = open_font("comicbd.ttf", 46)
+    f_cost = open_font("comicbd.ttf", 40)
+    f_tag = open_font("comic.ttf", 32)
+
+    name = card.get("name", "")
+    subtitle = card.get("subtitle", "")
+    ctype = card.get("type", "")
+    rules_raw = (card.get("rules_text") or "").strip()
+    ability_name, rules_text = "", rules_raw
+    if "\n" in rules_raw:
+        parts = [p.strip() for p in rules_raw.split("\n", 1)]
+        ability_name, rules_text = parts[0], parts[1]
+
+    strength = str(card.get("strength") or "")
+    willpower = str(card.get("willpower") or "")
+    ink_cost = str(card.get("ink_cost") or "?")
+    inkable = bool(card.get("ink_convertible", False))
+    tag_color = "#10B981" if inkable else "#FF0000"
+    tag_txt = "ENCRABLE" if inkable else "NON-ENCRABLE"
+
+    cost_x, cost_y = P, P
+    d.rounded_rectangle([cost_x, cost_y, cost_x + COST_BOX, cost_y + COST_BOX], radius=6, outline=tag_color, width=4)
+    tw, th = _legacy_text_size(d, ink_cost, f_cost)
+    d.text((cost_x + (COST_BOX - tw)//2, cost_y + (COST_BOX - th)//2), ink_cost, fill=tag_color, font=f_cost)
+    d.text((cost_x + COST_BOX + 14, cost_y + 8), tag_txt, fill=tag_color, font=f_tag)
+
+    title_y = cost_y + COST_BOX + 14
+    d.text((P, title_y), name, fill="black", font=f_name)
+    _, name_h = _legacy_text_size(d, "Hg", f_name)
+    sub_y = title_y + name_h - 6
+    d.text((P, sub_y), subtitle, fill="black", font=f_sub)
+    _, sub_h = _legacy_text_size(d, "Hg", f_sub)
+    sep_y = sub_y + sub_h + 8
+    d.line((P, sep_y, W - P, sep_y), fill="#B0B8C0", width=2)
+    type_y = sep_y + 8
+    d.text((P, type_y), ctype, fill="black", font=f_type)
+    _, type_h = _legacy_text_size(d, "Hg", f_type)
+
+    text_top = type_y + type_h + 18
+    if ability_name:
+        d.text((P, text_top), ability_name, fill="black", font=f_ability)
+        _, ability_h = _legacy_text_size(d, "Hg", f_ability)
+        text_top += ability_h + 8
+    _legacy_draw_wrapped(d, rules_text, f_text, P, text_top, max_w=W - 2 * P - LORE_COL_W, line_gap=8)
+
+    if strength or willpower:
+        stats = f"{strength}/{willpower}" if strength and willpower else (strength or willpower)
+        tw, th = _legacy_text_size(d, stats, f_stat)
+        d.text((W - P - tw, H - P - th), stats, fill="black", font=f_stat)
+    return img
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=0, help="nombre de cartes (0 = tout le dataset)")
+    args = parser.parse_args(argv)
+
+    cards = [c for c in load_dataset() if c.get("name")]
+    if args.limit:
+        cards = cards[:args.limit]
+
+    t0 = time.perf_counter()
+    legacy = [legacy_text_card(c) for c in cards]
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    renderer = TextCardRenderer(CARD_W_PX, CARD_H_PX)
+    new = [renderer.render(c) for c in cards]
+    t_new = time.perf_counter() - t0
+
+    identical = sum(ImageChops.difference(a, b).getbbox() is None for a, b in zip(legacy, new))
+
+    print(f"{len(cards)} cartes texte")
+    print(f"historique : {t_legacy:7.2f} s  ({t_legacy / len(cards) * 1000:6.1f} ms/carte)")
+    print(f"gabarits   : {t_new:7.2f} s  ({t_new / len(cards) * 1000:6.1f} ms/carte)  x{t_legacy / max(t_new, 1e-9):.1f}")
+    print(f"rendus identiques au pixel près : {identical}/{len(cards)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,144 @@
+"""
+Génération de proxys en ligne de commande, sans interface Tk.
+
+Exemples :
+    python -m src.cli decks/ -o out/ --model bw --jobs 4
+    python -m src.cli manifest.json
+    python -m src.cli deck.txt
+
+Un dossier est lu comme un ensemble de decklists `*.txt` (nom du deck = nom
+du fichier). Un manifeste JSON est une liste d'entrées :
+    [{"file": "aggro.txt", "name": "Aggro", "model": "color"}, ...]
+(`name` et `model` sont facultatifs, `file` est relatif au manifeste).
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.core.make_proxies import DATASET, DeckStats, generate_from_text
+from src.utils.env import OUTPUT_DIR
+
+MODELS = ("text", "color", "bw")
+
+
+@dataclass
+class DeckJob:
+    path: Path
+    name: str
+    model: str
+
+
+def collect_jobs(source: Path, default_model: str) -> List[DeckJob]:
+    """Liste les decks à générer depuis un dossier, un manifeste JSON ou une decklist."""
+    if source.is_dir():
+        return [DeckJob(p, p.stem, default_model) for p in sorted(source.glob("*.txt"))]
+    if source.suffix.lower() == ".json":
+        entries = json.loads(source.read_text(encoding="utf-8"))
+        if not isinstance(entries, list):
+            raise ValueError("Le manifeste doit être une liste d'entrées.")
+        jobs = []
+        for n, e in enumerate(entries, 1):
+            if not isinstance(e, dict):
+                raise ValueError(f"entrée {n} : objet attendu")
+            if not isinstance(e.get("file"), str) or not e["file"]:
+                raise ValueError(f"entrée {n} : champ 'file' manquant")
+            if not isinstance(e.get("name") or "", str):
+                raise ValueError(f"entrée {n} : champ 'name' invalide")
+            path = source.parent / e["file"]
+            model = e.get("model", default_model)
+            if model not in MODELS:
+                raise ValueError(f"entrée {n} : modèle inconnu pour {path.name} : {model}")
+            jobs.append(DeckJob(path, e.get("name") or path.stem, model))
+        return jobs
+    return [DeckJob(source, source.stem, default_model)]
+
+
+def duplicate_names(jobs: List[DeckJob]) -> List[str]:
+    """
+    Noms de sortie partagés par plusieurs decks : leurs PDF (et fichiers `.part`,
+    manifestes de génération) s'écraseraient, en même temps avec `--jobs`.
+    La casse est ignorée (systèmes de fichiers Windows et macOS).
+    """
+    seen: Dict[str, str] = {}
+    dups: List[str] = []
+    for job in jobs:
+        folded = job.name.casefold()
+        if folded in seen and seen[folded] not in dups:
+            dups.append(seen[folded])
+        seen.setdefault(folded, job.name)
+    return dups
+
+
+def run_job(job: DeckJob, output_dir: Path, trace_dir: Optional[Path] = None):
+    stats = DeckStats()
+    try:
+        text = job.path.read_text(encoding="utf-8")
+        trace = trace_dir / f"{job.name}.trace.json" if trace_dir else None
+        pdf = generate_from_text(text, job.name, model=job.model, output_dir=output_dir, stats=stats, trace_path=trace)
+        return job, pdf, stats, None
+    except Exception as e:
+        return job, None, stats, e
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Génère les PDF de proxys d'un ou plusieurs decks.",
+    )
+    parser.add_argument("source", type=Path, help="dossier de decklists .txt, manifeste .json ou decklist")
+    parser.add_argument("-o", "--output-dir", type=Path, default=OUTPUT_DIR, help="dossier des PDF générés")
+    parser.add_argument("-m", "--model", choices=MODELS, default="text", help="modèle par défaut")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="nombre de decks générés en parallèle")
+    parser.add_argument("--trace", type=Path, metavar="DIR", help="écrit une trace JSON par deck dans ce dossier")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = collect_jobs(args.source, args.model)
+    except ValueError as e:
+        print(f"Manifeste invalide ({args.source}) : {e}", file=sys.stderr)
+        return 1
+    if not jobs:
+        print(f"Aucune decklist trouvée dans {args.source}", file=sys.stderr)
+        return 1
+    dups = duplicate_names(jobs)
+    if dups:
+        print(f"Plusieurs decks ont le même nom de sortie : {', '.join(dups)} (préciser \"name\" dans le manifeste)",
+              file=sys.stderr)
+        return 1
+
+    # Dataset et index chargés une seule fois ; caches d'images et de rendu partagés entre decks
+    t0 = time.perf_counter()
+    DATASET.get()
+    t_load = time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        results = list(pool.map(lambda j: run_job(j, args.output_dir, args.trace), jobs))
+    total = time.perf_counter() - t0
+
+    print()
+    print(f"Dataset chargé en {t_load:.2f} s")
+    print(f"{'deck':<28} {'modèle':<6} {'cartes':>6} {'uniq.':>5} {'mém.':>5} {'disque':>6} {'images':>6} {'rendus':>6} {'réut.':>5} {'manq.':>5} {'temps':>7}")
+    failures = 0
+    for job, pdf, st, err in results:
+        line = (
+            f"{job.name[:28]:<28} {job.model:<6} {st.cards:>6} {st.unique:>5} {st.memory_hits:>5} "
+            f"{st.disk_hits:>6} {st.images:>6} {st.rendered:>6} {st.reused:>5} {st.missing:>5} {st.seconds:>6.2f}s"
+        )
+        if err is not None:
+            failures += 1
+            line += f"  ERREUR : {err}"
+        print(line)
+        for missing in st.unresolved:
+            hint = " ; ".join(st.suggestions.get(missing, ()))
+            print(f"{'':<4}introuvable : {missing}" + (f"  → vouliez-vous dire : {hint} ?" if hint else ""))
+    print(f"{len(results) - failures}/{len(results)} PDF générés dans {args.output_dir} en {total:.2f} s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+# =========================
+# Cache disque des cartes prêtes à imprimer
+# =========================
+PRINT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+class BitmapCache:
+    """
+    Second niveau de cache sur disque : cartes déjà redimensionnées et recadrées
+    au format d'impression, en PNG sans perte.
+
+    Le nom de fichier dérive du hash de la source (URL ou identifiant de carte),
+    du modèle (`color` / `bw` / `text`) et des paramètres de rendu : changer la
+    résolution ou le rendu invalide naturellement les anciennes entrées.
+    Au-delà de `max_bytes`, les fichiers les moins récemment utilisés sont supprimés.
+    """
+
+    def __init__(self, root: Path, params: str, max_bytes: int = PRINT_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.params = params
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._nbytes: Optional[int] = None
+
+    def path_for(self, source: str, model: str) -> Path:
+        digest = hashlib.sha1(f"{source}|{model}|{self.params}".encode("utf-8")).hexdigest()
+        return self.root / f"{model}_{digest}.png"
+
+    def size_of(self, source: str, model: str) -> Optional[int]:
+        """Taille du fichier en cache, None s'il n'y est pas."""
+        try:
+            return self.path_for(source, model).stat().st_size
+        except OSError:
+            return None
+
+    def get(self, source: str, model: str) -> Optional[Image.Image]:
+        p = self.path_for(source, model)
+        try:
+            im = Image.open(p)
+            im.load()
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        return im
+
+    def put(self, source: str, model: str, im: Image.Image) -> None:
+        p = self.path_for(source, model)
+        tmp = p.with_name(f"{p.name}.{threading.get_ident()}.tmp")
+        try:
+            im.save(tmp, "PNG", compress_level=1)
+            os.replace(tmp, p)
+            size = p.stat().st_size
+        except OSError as e:
+            print(f"[DEBUG] Impossible d’écrire le cache d’impression : {e}")
+            tmp.unlink(missing_ok=True)
+            return
+        with self._lock:
+            if self._nbytes is None:
+                self._nbytes = self._scan_size()
+            else:
+                self._nbytes += size
+            if self._nbytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        return [e for e in os.scandir(self.root) if e.is_file() and e.name.endswith(".png")]
+
+    def _scan_size(self) -> int:
+        return sum(e.stat().st_size for e in self._entries())
+
+    def _evict(self) -> None:
+        """Supprime les fichiers les plus anciens jusqu'à repasser sous 90 % du budget."""
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        target = int(self.max_bytes * 0.9)
+        for e in entries:
+            if total <= target:
+                break
+            try:
+                size = e.stat().st_size
+                os.remove(e.path)
+                total -= size
+            except OSError:
+                pass
+        self._nbytes = total
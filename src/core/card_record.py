@@ -0,0 +1,67 @@
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.snapshot import BOOL_FIELDS, FIELDS, INT_FIELDS, STR_FIELDS
+
+# =========================
+# Carte compacte
+# =========================
+class CardRecord:
+    """
+    Carte réduite aux champs utilisés par le générateur, construite à l'ingestion
+    du JSON : un attribut par champ (`__slots__`), chaînes internées (types,
+    mots-clés, textes de règles repris d'une extension à l'autre), mots-clés en
+    tuple. Se consulte comme le dict d'origine (`get`, `[]`, `in`), comme `SnapshotCard`.
+    """
+
+    __slots__ = FIELDS
+
+    def get(self, field: str, default: Any = None) -> Any:
+        value = getattr(self, field, None) if field in _FIELD_SET else None
+        return default if value is None else value
+
+    def __getitem__(self, field: str) -> Any:
+        value = self.get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field: str) -> bool:
+        return self.get(field) is not None
+
+    def keys(self) -> List[str]:
+        return [f for f in FIELDS if f in self]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f: self.get(f) for f in self.keys()}
+
+    def __repr__(self) -> str:
+        return f"CardRecord({self.name!r}, {self.subtitle!r})"
+
+_FIELD_SET = frozenset(FIELDS)
+
+def _str(v: Any) -> Optional[str]:
+    return None if v is None else sys.intern(str(v))
+
+def make_record(raw: Dict, pick_image_url: Callable[[Dict], Optional[str]]) -> CardRecord:
+    """
+    Extrait d'une carte brute du JSON ses champs utiles ; `image_url` reçoit
+    l'illustration retenue par `pick_image_url` (les variantes ne sont pas conservées).
+    """
+    rec = CardRecord()
+    for f in STR_FIELDS:
+        if f == "image_url":
+            v = _str(pick_image_url(raw))
+        elif f == "searchable_keywords":
+            kws = raw.get(f)
+            v = tuple(sys.intern(k) for k in kws if isinstance(k, str)) if isinstance(kws, list) else None
+        else:
+            v = _str(raw.get(f))
+        setattr(rec, f, v)
+    for f in INT_FIELDS:
+        v = raw.get(f)
+        setattr(rec, f, v if isinstance(v, int) and not isinstance(v, bool) else None)
+    for f in BOOL_FIELDS:
+        v = raw.get(f)
+        setattr(rec, f, None if v is None else bool(v))
+    return rec
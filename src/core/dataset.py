@@ -0,0 +1,94 @@
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Dict, Optional, Tuple
+
+from src.core.search_index import CardIndex
+
+# =========================
+# Service dataset partagé
+# =========================
+@dataclass(frozen=True)
+class DatasetState:
+    """Cartes chargées, index de recherche et version du fichier source."""
+    cards: List[Dict]
+    index: CardIndex
+    version: Tuple[int, int]
+
+def file_version(path: Path) -> Tuple[int, int]:
+    """Version d'un fichier : (taille, mtime en ns), ou (-1, -1) s'il est absent."""
+    try:
+        st = path.stat()
+    except OSError:
+        return -1, -1
+    return st.st_size, st.st_mtime_ns
+
+class DatasetService:
+    """
+    Propriétaire unique du dataset et de son index pour tout le processus.
+
+    Le chargement n'a lieu qu'une fois (éventuellement en tâche de fond au
+    démarrage) ; les appels suivants renvoient l'état en mémoire. Le fichier
+    source est surveillé (taille/mtime, au plus toutes les `check_interval`
+    secondes) et l'état est rechargé s'il a changé. `version` remplace la
+    version du fichier source quand le dataset a plusieurs fichiers.
+    """
+
+    def __init__(
+        self,
+        source: Path,
+        loader: Callable[[], Tuple[List[Dict], CardIndex]],
+        check_interval: float = 2.0,
+        version: Optional[Callable[[], Tuple[int, int]]] = None,
+    ):
+        self.source = Path(source)
+        self.loader = loader
+        self.check_interval = check_interval
+        self.version = version or (lambda: file_version(self.source))
+        self._state: Optional[DatasetState] = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def state(self) -> Optional[DatasetState]:
+        """État courant sans déclencher de chargement (None tant que rien n'est chargé)."""
+        return self._state
+
+    def get(self) -> DatasetState:
+        """Retourne l'état chargé, en chargeant ou rechargeant le dataset si nécessaire."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state is not None and now - self._checked_at < self.check_interval:
+                return self._state
+            self._checked_at = now
+            version = self.version()
+            if self._state is None or self._state.version != version:
+                if self._state is not None:
+                    print("[DEBUG] Dataset modifié, rechargement.")
+                cards, index = self.loader()
+                self._state = DatasetState(cards, index, version)
+                self._error = None
+            return self._state
+
+    def start_background_load(self, on_done: Optional[Callable[[Optional[BaseException]], None]] = None) -> None:
+        """Charge le dataset sur un thread dédié ; `on_done(erreur ou None)` est appelé à la fin."""
+
+        def run():
+            try:
+                self.get()
+            except Exception as e:
+                self._error = e
+            if on_done:
+                on_done(self._error)
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=run, name="dataset-loader", daemon=True)
+            self._thread.start()
+
+    def search(self, q: str) -> List[Dict]:
+        return self.get().index.search(q)
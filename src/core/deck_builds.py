@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+# =========================
+# Dernière génération de chaque deck
+# =========================
+@dataclass
+class BuildManifest:
+    """
+    Description de la dernière génération d'un PDF : cartes dans l'ordre,
+    hash de chaque page et, pour chaque clé de génération (modèle et source du
+    rendu), l'emplacement de son image encodée dans le fichier (offset, longueur,
+    largeur, hauteur, espace couleur, filtre).
+    """
+    deck: str
+    model: str
+    params: str
+    pdf_size: int
+    pdf_mtime_ns: int
+    cards: List[str] = field(default_factory=list)
+    pages: List[str] = field(default_factory=list)
+    images: Dict[str, list] = field(default_factory=dict)
+
+def manifest_path(root: Path, out_pdf: Path) -> Path:
+    """Un manifeste par fichier de sortie (nom du deck + dossier)."""
+    digest = hashlib.sha1(str(Path(out_pdf).resolve()).encode("utf-8")).hexdigest()
+    return Path(root) / f"{digest}.json"
+
+def page_hashes(keys: Sequence[str], per_page: int, model: str, params: str) -> List[str]:
+    """Hash de la composition de chaque page (clés de génération des cartes, dans l'ordre des emplacements)."""
+    return [
+        hashlib.sha1("|".join([model, params, *keys[i:i + per_page]]).encode("utf-8")).hexdigest()
+        for i in range(0, len(keys), per_page)
+    ]
+
+def save_manifest(root: Path, out_pdf: Path, manifest: BuildManifest) -> None:
+    p = manifest_path(root, out_pdf)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + ".tmp")
+    try:
+        tmp.write_text(json.dumps(asdict(manifest)), encoding="utf-8")
+        os.replace(tmp, p)
+    except OSError as e:
+        print(f"[DEBUG] Impossible d’écrire le manifeste de génération : {e}")
+
+class PreviousBuild:
+    """
+    PDF précédent d'un deck, ouvert en lecture : les images encodées des cartes
+    inchangées y sont relues telles quelles au lieu d'être rendues et réencodées.
+    """
+
+    def __init__(self, manifest: BuildManifest, fp: BinaryIO):
+        self.manifest = manifest
+        self._fp = fp
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.manifest.images
+
+    def read(self, key: str) -> Tuple[int, int, str, str, bytes]:
+        """(largeur, hauteur, espace couleur, filtre, flux encodé) de l'image d'une carte."""
+        offset, length, width, height, colorspace, filter_name = self.manifest.images[key]
+        self._fp.seek(offset)
+        data = self._fp.read(length)
+        if len(data) != length:
+            raise OSError("PDF précédent tronqué")
+        return width, height, colorspace, filter_name, data
+
+    def close(self) -> None:
+        self._fp.close()
+
+def open_previous(root: Path, out_pdf: Path, model: str, params: str) -> Optional[PreviousBuild]:
+    """Dernière génération réutilisable pour ce fichier (même modèle, même rendu, PDF intact), sinon None."""
+    p = manifest_path(root, out_pdf)
+    try:
+        manifest = BuildManifest(**json.loads(p.read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        return None
+    if manifest.model != model or manifest.params != params:
+        return None
+    try:
+        st = Path(out_pdf).stat()
+        if (st.st_size, st.st_mtime_ns) != (manifest.pdf_size, manifest.pdf_mtime_ns):
+            return None
+        return PreviousBuild(manifest, open(out_pdf, "rb"))
+    except OSError:
+        return None
@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.core.dataset import DatasetState
+from src.core.search_index import card_key, card_title, normalize
+
+# =========================
+# Lecture de la decklist
+# =========================
+@dataclass
+class DeckLine:
+    """Ligne non vide d'une decklist : numéro (1 = première ligne du texte), quantité et requête."""
+    number: int
+    text: str
+    qty: int
+    name: str
+    query: str
+
+def parse_decklist(deck_text: str) -> List[DeckLine]:
+    """Découpe la liste en lignes « [quantité] nom » ; la quantité vaut 1 si elle est absente."""
+    out = []
+    for number, raw in enumerate(deck_text.splitlines(), 1):
+        line = raw.strip()
+        if not line:
+            continue
+        qty, name_part = 1, line
+        parts = line.split(" ", 1)
+        if len(parts) == 2 and parts[0].isdigit():
+            qty = int(parts[0])
+            name_part = parts[1].strip()
+        out.append(DeckLine(number, line, qty, name_part, normalize(name_part).strip()))
+    return out
+
+@dataclass
+class ResolvedDeck:
+    """
+    Résultat de la résolution : cartes dans l'ordre du deck (quantités dépliées),
+    lignes introuvables et, pour chacune de leurs requêtes, les titres proches.
+    """
+    lines: List[DeckLine]
+    cards: List[Dict] = field(default_factory=list)
+    unresolved: List[DeckLine] = field(default_factory=list)
+    suggestions: Dict[str, List[str]] = field(default_factory=dict)
+    queries: int = 0
+    cache_hits: int = 0
+
+# =========================
+# Cache requête -> carte
+# =========================
+class QueryCache:
+    """
+    Mémoïse la résolution des requêtes normalisées : requête -> (position, clé de carte),
+    ou None pour une requête sans résultat. Persisté en JSON entre deux lancements ;
+    vidé dès que la version du dataset change. La clé de carte est revérifiée à la
+    lecture, une entrée incohérente est simplement recalculée.
+    """
+
+    def __init__(self, path: Optional[Path], max_entries: int = 20000):
+        self.path = Path(path) if path is not None else None
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._entries: Dict[str, Optional[Tuple[int, str]]] = {}
+        self._dirty = False
+        self._loaded = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._version = data["version"]
+            self._entries = {q: (tuple(v) if v is not None else None) for q, v in data["queries"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            print(f"[DEBUG] Cache des requêtes illisible, ignoré : {self.path}")
+            self._version, self._entries = None, {}
+
+    def bind(self, version: str) -> None:
+        """Associe le cache à une version du dataset (vide le cache si elle a changé)."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if self._version != version:
+                self._version = version
+                self._entries = {}
+                self._dirty = True
+
+    def get(self, query: str):
+        with self._lock:
+            return self._entries.get(query, KeyError)
+
+    def put(self, query: str, value: Optional[Tuple[int, str]]) -> None:
+        with self._lock:
+            self._entries.pop(query, None)
+            self._entries[query] = value
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            data = {"version": self._version, "queries": self._entries}
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            try:
+                tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, self.path)
+                self._dirty = False
+            except OSError as e:
+                print(f"[DEBUG] Impossible d’écrire le cache des requêtes : {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
+
+# =========================
+# Résolution par lot
+# =========================
+# Suggestions proposées par ligne introuvable
+SUGGESTIONS = 3
+
+def dataset_version(state: DatasetState) -> str:
+    size, mtime_ns = state.version
+    return f"{size}:{mtime_ns}:{len(state.cards)}"
+
+def resolve_query(line: DeckLine, state: DatasetState, cache: QueryCache) -> Tuple[Optional[Dict], bool]:
+    """
+    Première carte correspondant à la requête d'une ligne, via le cache (déjà lié à
+    la version du dataset) : (carte ou None, résultat lu dans le cache).
+    """
+    cards = state.index.cards
+    hit = cache.get(line.query)
+    if hit is not KeyError and (hit is None or (hit[0] < len(cards) and card_key(cards[hit[0]]) == hit[1])):
+        return (cards[hit[0]] if hit is not None else None), True
+    positions = state.index.search_positions(line.name)
+    hit = (positions[0], card_key(cards[positions[0]])) if positions else None
+    cache.put(line.query, hit)
+    return (cards[hit[0]] if hit is not None else None), False
+
+def suggestions_for(line: DeckLine, state: DatasetState) -> List[str]:
+    """Titres proches d'une ligne introuvable (index approché)."""
+    return [card_title(c) for c, _ in state.index.suggest(line.name, SUGGESTIONS)]
+
+def resolve_deck(deck_text: str, state: DatasetState, cache: QueryCache) -> ResolvedDeck:
+    """
+    Lit toute la liste, dédoublonne les requêtes normalisées et les résout en un
+    seul passage sur l'index, en passant par le cache ; seule la première carte
+    trouvée est retenue, comme dans la recherche ligne par ligne.
+    Les lignes introuvables ne sont jamais remplacées : l'index approché ne fournit
+    que des suggestions (`deck.suggestions`).
+    """
+    deck = ResolvedDeck(parse_decklist(deck_text))
+    cache.bind(dataset_version(state))
+
+    found: Dict[str, Optional[Dict]] = {}
+    for line in deck.lines:
+        if line.query in found:
+            continue
+        found[line.query], cached = resolve_query(line, state, cache)
+        deck.cache_hits += cached
+    deck.queries = len(found)
+    cache.save()
+
+    for line in deck.lines:
+        card = found[line.query]
+        if card is None:
+            deck.unresolved.append(line)
+            if line.query not in deck.suggestions:
+                deck.suggestions[line.query] = suggestions_for(line, state)
+        else:
+            deck.cards.extend([card] * line.qty)
+    return deck
@@ -0,0 +1,209 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# =========================
+# Magasin des illustrations
+# =========================
+IMAGE_STORE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Dernier accès : écrit dans l'index par lots, pas à chaque lecture
+TOUCH_FLUSH_EVERY = 64
+
+class IncompleteDownload(IOError):
+    pass
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+def check_image_bytes(data: bytes, expected_len: Optional[int] = None) -> None:
+    """Lève IncompleteDownload si les octets reçus sont tronqués ou ne sont pas une image."""
+    if expected_len is not None and len(data) != expected_len:
+        raise IncompleteDownload(f"{len(data)} octets reçus sur {expected_len}")
+    if data[:3] == b"\xff\xd8\xff":
+        if b"\xff\xd9" not in data[-32:]:
+            raise IncompleteDownload("JPEG tronqué (marqueur de fin absent)")
+    elif data[:8] == b"\x89PNG\r\n\x1a\n":
+        if b"IEND" not in data[-16:]:
+            raise IncompleteDownload("PNG tronqué (bloc IEND absent)")
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        if len(data) < int.from_bytes(data[4:8], "little") + 8:
+            raise IncompleteDownload("WebP tronqué")
+    elif data[:6] not in (b"GIF87a", b"GIF89a"):
+        raise IncompleteDownload("contenu non reconnu comme image")
+
+class ImageStore:
+    """
+    Cache disque des illustrations téléchargées, octets d'origine inchangés.
+
+    - clé = SHA-256 de l'URL ; fichier `objects/ab/<clé>` (pas de nom dérivé de l'URL)
+    - index SQLite `index.sqlite` : URL, taille, SHA-256 du contenu, ETag, dernier accès
+    - écriture atomique (fichier temporaire puis renommage) après vérification
+      que le téléchargement est complet
+    - budget en octets (`max_bytes`) : au-delà, éviction des entrées les moins
+      récemment utilisées, d'après l'index, sans parcourir le dossier
+
+    Une lecture ne touche qu'un fichier : l'index est chargé en mémoire à l'ouverture.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = IMAGE_STORE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            " key TEXT PRIMARY KEY, url TEXT NOT NULL, size INTEGER NOT NULL,"
+            " sha256 TEXT NOT NULL, etag TEXT, last_access REAL NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS images_lru ON images(last_access)")
+        self._db.commit()
+        # key -> (taille, etag)
+        self._entries: Dict[str, Tuple[int, Optional[str]]] = {
+            k: (size, etag) for k, size, etag in self._db.execute("SELECT key, size, etag FROM images")
+        }
+        self._nbytes = sum(size for size, _ in self._entries.values())
+        self._touched: Dict[str, float] = {}
+
+    # ---- Chemins ----
+    def path_for(self, key: str) -> Path:
+        return self.objects / key[:2] / key
+
+    def __contains__(self, url: str) -> bool:
+        return url_key(url) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def etag(self, url: str) -> Optional[str]:
+        entry = self._entries.get(url_key(url))
+        return entry[1] if entry else None
+
+    # ---- Lecture / écriture ----
+    def get(self, url: str) -> Optional[bytes]:
+        """Octets de l'image si elle est en cache et intacte (taille conforme à l'index), sinon None."""
+        key = url_key(url)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        try:
+            data = self.path_for(key).read_bytes()
+        except OSError:
+            data = None
+        if data is None or len(data) != entry[0]:
+            print(f"[DEBUG] Cache image incohérent, entrée supprimée : {url}")
+            self.discard(url)
+            return None
+        self._touch(key)
+        return data
+
+    def put(self, url: str, data: bytes, etag: Optional[str] = None) -> None:
+        """Enregistre les octets d'une image (vérifiés) et applique le budget."""
+        check_image_bytes(data)
+        key = url_key(url)
+        p = self.path_for(key)
+        p.parent.mkdir(exist_ok=True)
+        tmp = p.with_name(f"{key}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, p)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            raise
+        now = time.time()
+        with self._lock:
+            old = self._entries.get(key)
+            self._nbytes += len(data) - (old[0] if old else 0)
+            self._entries[key] = (len(data), etag)
+            self._touched.pop(key, None)
+            self._db.execute(
+                "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, len(data), hashlib.sha256(data).hexdigest(), etag, now, now),
+            )
+            self._db.commit()
+            if self._nbytes > self.max_bytes:
+                self._evict()
+
+    def discard(self, url: str) -> None:
+        key = url_key(url)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return
+            self._nbytes -= entry[0]
+            self._touched.pop(key, None)
+            self._db.execute("DELETE FROM images WHERE key = ?", (key,))
+            self._db.commit()
+        self.path_for(key).unlink(missing_ok=True)
+
+    def fetch(self, url: str, download: Callable[[str, Optional[str]], Tuple[Optional[bytes], Optional[str], Optional[int]]],
+              revalidate: bool = False) -> bytes:
+        """
+        Octets de l'image, depuis le cache ou via `download(url, etag) -> (octets, etag, taille annoncée)`.
+        `download` renvoie des octets None si le serveur confirme la version en cache (304).
+        Avec `revalidate`, une entrée en cache est revérifiée auprès du serveur par son ETag.
+        """
+        cached = self.get(url)
+        if cached is not None and not revalidate:
+            return cached
+        data, etag, expected = download(url, self.etag(url) if cached is not None else None)
+        if data is None:
+            if cached is None:
+                raise IncompleteDownload(f"réponse vide pour {url}")
+            return cached
+        check_image_bytes(data, expected)
+        self.put(url, data, etag)
+        return data
+
+    # ---- Dernier accès et éviction ----
+    def _touch(self, key: str) -> None:
+        with self._lock:
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_FLUSH_EVERY:
+                self._flush_touched()
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._db.executemany(
+                "UPDATE images SET last_access = ? WHERE key = ?",
+                [(t, k) for k, t in self._touched.items()],
+            )
+            self._db.commit()
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        """Supprime les entrées les moins récemment utilisées jusqu'à 90 % du budget."""
+        self._flush_touched()
+        target = int(self.max_bytes * 0.9)
+        removed = []
+        for key, size in self._db.execute("SELECT key, size FROM images ORDER BY last_access"):
+            if self._nbytes <= target:
+                break
+            removed.append(key)
+            self._nbytes -= size
+            self._entries.pop(key, None)
+        self._db.executemany("DELETE FROM images WHERE key = ?", [(k,) for k in removed])
+        self._db.commit()
+        for key in removed:
+            self.path_for(key).unlink(missing_ok=True)
+        if removed:
+            print(f"[DEBUG] Cache images : {len(removed)} entrées évincées ({self._nbytes // (1024 * 1024)} Mo)")
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_touched()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._db.close()
@@ -0,0 +1,371 @@
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.core.card_record import CardRecord, make_record
+from src.core.search_index import CardIndex, card_key
+from src.core.snapshot import FIELDS, Snapshot, open_snapshot, write_snapshot
+
+# =========================
+# Sources du dataset
+# =========================
+MANIFEST_VERSION = 1
+
+def source_files(dataset_path: Path, deltas_dir: Path) -> List[Tuple[str, Path]]:
+    """(nom, chemin) des fichiers sources : `full.json` puis les deltas, par ordre de nom."""
+    deltas = sorted(Path(deltas_dir).glob("*.json")) if Path(deltas_dir).is_dir() else []
+    return [(Path(dataset_path).name, Path(dataset_path))] + [(f"deltas/{p.name}", p) for p in deltas]
+
+def file_stamp(path: Path) -> List[int]:
+    st = Path(path).stat()
+    return [st.st_size, st.st_mtime_ns]
+
+def sources_version(dataset_path: Path, deltas_dir: Path) -> Tuple[int, int]:
+    """Version de l'ensemble des sources (tailles et mtimes cumulés), (-1, -1) sans `full.json`."""
+    try:
+        stamps = [file_stamp(p) for _, p in source_files(dataset_path, deltas_dir)]
+    except OSError:
+        return -1, -1
+    return sum(s[0] for s in stamps), sum(s[1] for s in stamps)
+
+# =========================
+# Découpage en sous-ensembles
+# =========================
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+def _skip_ws(text: str, pos: int) -> int:
+    return _WS.match(text, pos).end()
+
+def _scan_object(text: str, pos: int, descend: Optional[str] = None) -> Tuple[List[Tuple[str, int, int, Any]], int]:
+    """
+    Parcourt l'objet JSON qui commence à `pos` : ([(clé, début, fin, valeur)], fin).
+    Les bornes délimitent le texte de chaque valeur ; celle de la clé `descend`,
+    si c'est un objet, est elle-même parcourue (liste de ses membres) au lieu d'être décodée.
+    """
+    pos = _skip_ws(text, pos)
+    if text[pos:pos + 1] != "{":
+        raise ValueError(f"objet JSON attendu (caractère {pos})")
+    members = []
+    pos = _skip_ws(text, pos + 1)
+    if text[pos:pos + 1] == "}":
+        return members, pos + 1
+    while True:
+        key, pos = _DECODER.raw_decode(text, pos)
+        pos = _skip_ws(text, pos)
+        if not isinstance(key, str) or text[pos:pos + 1] != ":":
+            raise ValueError(f"membre d'objet JSON invalide (caractère {pos})")
+        start = _skip_ws(text, pos + 1)
+        if key == descend and text[start:start + 1] == "{":
+            value, end = _scan_object(text, start)
+        else:
+            value, end = _DECODER.raw_decode(text, start)
+        members.append((key, start, end, value))
+        pos = _skip_ws(text, end)
+        if text[pos:pos + 1] == "}":
+            return members, pos + 1
+        if text[pos:pos + 1] != ",":
+            raise ValueError(f"',' ou '}}' attendu (caractère {pos})")
+        pos = _skip_ws(text, pos + 1)
+
+@dataclass
+class Subset:
+    """
+    Sous-ensemble d'un fichier source (clé sous `cards`) et empreinte SHA-1 de son texte.
+    `node` est la valeur décodée, None quand le sous-ensemble est repris du manifeste.
+    """
+    name: str
+    file: str
+    digest: str
+    node: Any = None
+    keys: List[str] = field(default_factory=list)
+    cards: Dict[str, Dict] = field(default_factory=dict)
+
+def read_subsets(file: str, text: str) -> List[Subset]:
+    """
+    Sous-ensembles d'un fichier source : un par clé sous `cards` (characters,
+    items…). Un fichier delta peut aussi n'être qu'une liste de cartes, ou avoir
+    une liste sous `cards` : il forme alors un seul sous-ensemble.
+    """
+    def digest(a: int, b: int) -> str:
+        return hashlib.sha1(text[a:b].encode("utf-8")).hexdigest()
+
+    pos = _skip_ws(text, 0)
+    if text[pos:pos + 1] == "[":
+        node, end = _DECODER.raw_decode(text, pos)
+        return [Subset(f"{file}:cards", file, digest(pos, end), node)]
+    members, _ = _scan_object(text, pos, descend="cards")
+    for key, start, end, value in members:
+        if key != "cards":
+            continue
+        if text[start] == "{":
+            return [Subset(f"{file}:{k}", file, digest(a, b), v) for k, a, b, v in value]
+        if isinstance(value, list):
+            return [Subset(f"{file}:cards", file, digest(start, end), value)]
+        raise ValueError("Format inattendu pour la clé 'cards'.")
+    raise ValueError("Le fichier JSON ne contient pas de clé 'cards'.")
+
+def walk_cards(node: Any) -> Iterator[Dict]:
+    """
+    Cartes d'un sous-ensemble, sous-structures comprises. Les dicts sans nom
+    (variantes d'illustration, masques de brillance…) ne sont pas des cartes.
+    """
+    if isinstance(node, list):
+        for c in node:
+            yield from walk_cards(c) if isinstance(c, dict) else ()
+        return
+    if not isinstance(node, dict):
+        return
+    if node.get("name"):
+        yield node
+    for val in node.values():
+        if isinstance(val, list):
+            for sub in val:
+                if isinstance(sub, dict):
+                    yield from walk_cards(sub)
+        elif isinstance(val, dict):
+            yield from walk_cards(val)
+
+def parse_subset(subset: Subset) -> None:
+    """Clés stables (`card_key`) et cartes brutes d'un sous-ensemble décodé ; la première occurrence l'emporte."""
+    subset.cards = {}
+    for raw in walk_cards(subset.node):
+        subset.cards.setdefault(card_key(raw), raw)
+    subset.keys = list(subset.cards)
+
+def collect_records(subsets: List[Subset], pick_image_url: Callable[[Dict], Optional[str]]) -> List[CardRecord]:
+    """Cartes de tous les sous-ensembles, dans l'ordre des sources ; une clé n'apparaît qu'une fois."""
+    seen = set()
+    cards = []
+    for s in subsets:
+        for key in s.keys:
+            if key not in seen:
+                seen.add(key)
+                cards.append(make_record(s.cards[key], pick_image_url))
+    return cards
+
+# =========================
+# Manifeste du dataset persistant
+# =========================
+@dataclass
+class DatasetManifest:
+    """
+    Description du snapshot persistant : fichiers sources lus, pour chaque
+    sous-ensemble son fichier, son empreinte et les clés de ses cartes, et
+    les clés dans l'ordre des lignes du snapshot (les ajouts vont à la fin).
+    """
+    version: int
+    snapshot: List[int]
+    files: Dict[str, List[int]] = field(default_factory=dict)
+    subsets: Dict[str, List] = field(default_factory=dict)
+    order: List[str] = field(default_factory=list)
+
+    def owners(self) -> Dict[str, str]:
+        """Clé -> sous-ensemble propriétaire (le premier qui la contient)."""
+        out: Dict[str, str] = {}
+        for name, (_, _, keys) in self.subsets.items():
+            for key in keys:
+                out.setdefault(key, name)
+        return out
+
+def read_manifest(path: Path) -> Optional[DatasetManifest]:
+    try:
+        manifest = DatasetManifest(**json.loads(Path(path).read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        return None
+    return manifest if manifest.version == MANIFEST_VERSION else None
+
+def write_manifest(
+    path: Path, snapshot_path: Path, files: Dict[str, List[int]], subsets: List[Subset], order: List[str]
+) -> None:
+    manifest = DatasetManifest(
+        MANIFEST_VERSION,
+        file_stamp(snapshot_path),
+        files,
+        {s.name: [s.file, s.digest, s.keys] for s in subsets},
+        order,
+    )
+    tmp = Path(path).with_name(Path(path).name + ".tmp")
+    # vars() plutôt qu'asdict() : les listes de clés ne sont pas recopiées
+    tmp.write_text(json.dumps(vars(manifest), ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+# =========================
+# Ingestion
+# =========================
+@dataclass
+class IngestReport:
+    """Bilan d'un chargement : snapshot repris tel quel, mise à jour incrémentale ou reconstruction complète."""
+    mode: str
+    cards: int = 0
+    changed: List[str] = field(default_factory=list)
+    added: int = 0
+    updated: int = 0
+    reason: str = ""
+    seconds: float = 0.0
+
+def _same_card(old: Any, new: CardRecord) -> bool:
+    def norm(v):
+        return tuple(v) if isinstance(v, list) else v
+    return all(norm(old.get(f)) == norm(new.get(f)) for f in FIELDS)
+
+def ingest_dataset(
+    snapshot_path: Path,
+    manifest_path: Path,
+    dataset_path: Path,
+    deltas_dir: Path,
+    pick_image_url: Callable[[Dict], Optional[str]],
+) -> Tuple[List, CardIndex, IngestReport]:
+    """
+    Charge le dataset (`full.json` et deltas) et son index, en tenant le snapshot à jour.
+
+    - sources inchangées : snapshot mappé tel quel
+    - sinon, seuls les fichiers modifiés sont relus ; leurs sous-ensembles dont
+      l'empreinte a changé sont parcourus, et seules leurs cartes nouvelles ou
+      modifiées sont converties, indexées et encodées dans le snapshot (les autres
+      lignes et chaînes sont recopiées). Chaque carte garde sa position.
+    - reconstruction complète sans snapshot/manifeste cohérent, ou si une carte
+      a disparu, changé de sous-ensemble ou de rang dans l'ordre des sources
+      (ajout ailleurs qu'à la fin, cartes réordonnées)
+    """
+    t0 = time.perf_counter()
+    if not Path(dataset_path).exists():
+        raise FileNotFoundError(f"Fichier de dataset introuvable : {dataset_path}")
+    files = source_files(dataset_path, deltas_dir)
+    stamps = {name: file_stamp(p) for name, p in files}
+    manifest = read_manifest(manifest_path)
+    try:
+        paired = manifest is not None and manifest.snapshot == file_stamp(snapshot_path)
+    except OSError:
+        paired = False
+
+    if paired and manifest.files == stamps:
+        snap = open_snapshot(snapshot_path)
+        if snap is not None:
+            cards = snap.cards()
+            return cards, snap.index(cards), IngestReport("snapshot", len(cards), seconds=time.perf_counter() - t0)
+        # Snapshot d'une version antérieure ou illisible : tout est relu
+        paired = False
+
+    # Fichiers relus : les modifiés seulement si le manifeste décrit le snapshot, sinon tous
+    subsets: List[Subset] = []
+    for name, path in files:
+        if paired and manifest.files.get(name) == stamps[name]:
+            subsets.extend(
+                Subset(sname, file, digest, keys=keys)
+                for sname, (file, digest, keys) in manifest.subsets.items() if file == name
+            )
+        else:
+            subsets.extend(read_subsets(name, path.read_text(encoding="utf-8")))
+
+    changed = []
+    for s in subsets:
+        if s.node is None:
+            continue
+        previous = manifest.subsets.get(s.name) if paired else None
+        if previous is not None and previous[1] == s.digest:
+            s.keys = previous[2]
+        else:
+            parse_subset(s)
+            changed.append(s)
+
+    base = open_snapshot(snapshot_path, in_memory=True) if paired else None
+    merge, reason = _update(base, manifest, subsets, changed, pick_image_url) if base is not None else (
+        None, "pas de snapshot décrit par le manifeste"
+    )
+    if merge is not None:
+        cards, index = merge.cards, merge.index
+        try:
+            if merge.added or merge.updated:
+                write_snapshot(snapshot_path, cards, index, pick_image_url, base=base)
+            write_manifest(manifest_path, snapshot_path, stamps, subsets, merge.order)
+            snap = Snapshot(snapshot_path)
+            cards = snap.cards()
+            index = snap.index(cards)
+        except OSError as e:
+            print(f"[DEBUG] Impossible d’écrire le snapshot : {e}")
+        return cards, index, IngestReport(
+            "incrémental", len(cards), [s.name for s in changed], merge.added, merge.updated,
+            seconds=time.perf_counter() - t0,
+        )
+
+    # Reconstruction complète : les fichiers repris du manifeste sont relus à leur tour
+    full: List[Subset] = []
+    for name, path in files:
+        own = [s for s in subsets if s.file == name]
+        if any(s.node is None for s in own):
+            own = read_subsets(name, path.read_text(encoding="utf-8"))
+        full.extend(own)
+    subsets = full
+    for s in subsets:
+        if not s.cards:
+            parse_subset(s)
+    cards = collect_records(subsets, pick_image_url)
+    index = CardIndex(cards)
+    try:
+        write_snapshot(snapshot_path, cards, index, pick_image_url)
+        write_manifest(manifest_path, snapshot_path, stamps, subsets, [card_key(c) for c in cards])
+    except OSError as e:
+        print(f"[DEBUG] Impossible d’écrire le snapshot : {e}")
+    return cards, index, IngestReport(
+        "complet", len(cards), [s.name for s in subsets], len(cards), reason=reason,
+        seconds=time.perf_counter() - t0,
+    )
+
+@dataclass
+class _Merge:
+    cards: List
+    index: CardIndex
+    order: List[str]
+    added: int = 0
+    updated: int = 0
+
+def _update(
+    base: Snapshot,
+    manifest: DatasetManifest,
+    subsets: List[Subset],
+    changed: List[Subset],
+    pick_image_url: Callable[[Dict], Optional[str]],
+) -> Tuple[Optional[_Merge], str]:
+    """Applique les sous-ensembles modifiés au snapshot `base` : (fusion, "") ou (None, raison d'y renoncer)."""
+    old = {key: pos for pos, key in enumerate(manifest.order)}
+    old_owner = manifest.owners()
+    if len(old) != base.n_cards or len(old_owner) != len(old):
+        return None, "manifeste et snapshot incohérents"
+    owner: Dict[str, Subset] = {}
+    for s in subsets:
+        for key in s.keys:
+            owner.setdefault(key, s)
+    if any(key not in owner for key in old):
+        return None, "cartes retirées des sources"
+    changed_names = {s.name for s in changed}
+    if any(s.name not in changed_names and old_owner.get(key, s.name) != s.name for key, s in owner.items()):
+        return None, "cartes déplacées d'un sous-ensemble à l'autre"
+    # Les ajouts vont en fin de snapshot : l'ordre doit rester celui d'une reconstruction
+    # complète (la recherche renvoie les cartes dans cet ordre, la première l'emporte)
+    if list(owner) != manifest.order + [key for key in owner if key not in old]:
+        return None, "cartes insérées ou réordonnées dans les sources"
+
+    cards = base.cards()
+    merge = _Merge(cards, base.index(cards), list(manifest.order))
+    for key, s in owner.items():
+        if s.name not in changed_names:
+            continue
+        rec = make_record(s.cards[key], pick_image_url)
+        if key in old:
+            pos = old[key]
+            if _same_card(cards[pos], rec):
+                continue
+            merge.index.remove_card(pos)
+            merge.index.add_card(pos, rec)
+            merge.updated += 1
+        else:
+            merge.index.add_card(len(cards), rec)
+            merge.order.append(key)
+            merge.added += 1
+    return merge, ""
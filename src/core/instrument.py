@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+# =========================
+# Étapes et pondérations
+# =========================
+STAGES = ("resolve", "fetch", "render", "layout", "write")
+
+STAGE_LABELS = {
+    "resolve": "Lecture de la decklist",
+    "fetch": "Téléchargement des illustrations",
+    "render": "Rendu des cartes",
+    "layout": "Mise en page",
+    "write": "Écriture du PDF",
+}
+
+def stage_weights(model: str) -> Dict[str, float]:
+    """Poids relatifs des étapes dans la progression globale (pas de téléchargement en mode texte)."""
+    if model == "text":
+        return {"resolve": 0.05, "fetch": 0.0, "render": 0.45, "layout": 0.1, "write": 0.4}
+    return {"resolve": 0.05, "fetch": 0.45, "render": 0.25, "layout": 0.05, "write": 0.2}
+
+# Dossier des traces JSON si aucun chemin n'est donné explicitement
+TRACE_DIR_ENV = "LORCY_TRACE_DIR"
+
+# =========================
+# Événements
+# =========================
+@dataclass
+class StageEvent:
+    """Événement d'étape : `start`, `progress` ou `end` ; compteurs cumulés de l'étape."""
+    stage: str
+    event: str
+    t: float
+    done: int = 0
+    total: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    detail: Optional[str] = None
+
+@dataclass
+class StageStats:
+    done: int = 0
+    total: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+
+class Tracer:
+    """
+    Instrumentation d'une génération.
+
+    Chaque étape déclare son volume (`set_total`), puis avance unité par unité
+    (`add`) avec durée, octets et succès/échec de cache. Les événements sont
+    transmis à `on_event`, la progression pondérée (0 → 1, croissante) à
+    `on_progress`, et l'ensemble est écrit dans `trace_path` à la fermeture.
+    Tous les appels ont lieu sur le thread de génération.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        on_progress: Optional[Callable[[float], None]] = None,
+        on_event: Optional[Callable[[StageEvent], None]] = None,
+        trace_path: Optional[Path] = None,
+    ):
+        self.weights = weights if weights is not None else stage_weights("color")
+        self.on_progress = on_progress
+        self.on_event = on_event
+        self.trace_path = Path(trace_path) if trace_path is not None else None
+        self.stats: Dict[str, StageStats] = {s: StageStats() for s in STAGES}
+        self.events: List[StageEvent] = []
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._progress = 0.0
+
+    def _emit(self, stage: str, event: str, detail: Optional[str] = None) -> None:
+        st = self.stats[stage]
+        ev = StageEvent(
+            stage, event, time.perf_counter() - self._t0,
+            st.done, st.total, st.seconds, st.bytes, st.hits, st.misses, detail,
+        )
+        with self._lock:
+            self.events.append(ev)
+        if self.on_event:
+            self.on_event(ev)
+        progress = self.progress()
+        if self.on_progress and progress > self._progress:
+            self._progress = progress
+            self.on_progress(progress)
+
+    def set_total(self, stage: str, total: int) -> None:
+        self.stats[stage].total = total
+        self._emit(stage, "start")
+
+    def add(
+        self,
+        stage: str,
+        done: int = 1,
+        seconds: float = 0.0,
+        nbytes: int = 0,
+        hit: Optional[bool] = None,
+        detail: Optional[str] = None,
+    ) -> None:
+        st = self.stats[stage]
+        st.done += done
+        st.seconds += seconds
+        st.bytes += nbytes
+        if hit is True:
+            st.hits += done
+        elif hit is False:
+            st.misses += done
+        self._emit(stage, "end" if st.total and st.done >= st.total else "progress", detail)
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Ajoute la durée du bloc à l'étape, sans faire avancer son compteur."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stats[stage].seconds += time.perf_counter() - t0
+
+    def progress(self) -> float:
+        total_w = sum(self.weights.values()) or 1.0
+        p = 0.0
+        for stage, w in self.weights.items():
+            st = self.stats[stage]
+            if st.total:
+                p += w * min(1.0, st.done / st.total)
+        return min(1.0, p / total_w)
+
+    def summary(self) -> Dict[str, Dict]:
+        return {s: asdict(st) for s, st in self.stats.items()}
+
+    def close(self, **meta) -> None:
+        """Écrit la trace JSON (résumé par étape et événements), si un chemin a été donné."""
+        if self.trace_path is None:
+            return
+        data = {
+            "meta": dict(meta, seconds=time.perf_counter() - self._t0),
+            "summary": self.summary(),
+            "events": [asdict(e) for e in self.events],
+        }
+        try:
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+            self.trace_path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+            print(f"[DEBUG] Trace écrite : {self.trace_path}")
+        except OSError as e:
+            print(f"[DEBUG] Impossible d’écrire la trace : {e}")
+
+def default_trace_path(deck_name: str) -> Optional[Path]:
+    """Chemin de trace déduit de LORCY_TRACE_DIR, ou None si la variable n'est pas définie."""
+    trace_dir = os.environ.get(TRACE_DIR_ENV)
+    return Path(trace_dir) / f"{deck_name}.trace.json" if trace_dir else None
@@ -1,14 +1,29 @@
-import json
-import re
+import atexit
 import io
-import unicodedata
-import requests
-import sys
-import tempfile
+import math
+import os
+import threading
+import time
+from concurrent.futures import as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from PIL import Image, ImageDraw, ImageFont, ImageOps
-from src.utils.env import DATASET_PATH, OUTPUT_DIR, ensure_dirs
+from typing import List, Dict, Any, Callable, Container, Iterable, Iterator, Optional, Tuple
+from PIL import Image, ImageOps
+from src.utils.env import CACHE_DIR, DATASET_PATH, DELTAS_DIR, LEGACY_CACHE_DIR, OUTPUT_DIR, ensure_dirs
+from src.core.search_index import CardIndex, card_key
+from src.core.prefetch import get_session, prefetch_images
+from src.core.render_cache import RENDER_CACHE
+from src.core.bitmap_cache import PRINT_CACHE_MAX_BYTES, BitmapCache
+from src.core.image_store import IMAGE_STORE_MAX_BYTES, ImageStore, IncompleteDownload, check_image_bytes
+from src.core.pdf_writer import PdfStreamWriter
+from src.core.ingest import ingest_dataset, sources_version
+from src.core.dataset import DatasetService
+from src.core.decklist import QueryCache, resolve_deck
+from src.core.deck_builds import BuildManifest, PreviousBuild, open_previous, page_hashes, save_manifest
+from src.core.text_card import TextCardRenderer, card_digest
+from src.core.scheduler import get_render_pool
+from src.core.instrument import StageEvent, Tracer, default_trace_path, stage_weights
 
 # =========================
 # Constantes impression
@@ -26,171 +41,99 @@ GUTTER = 30
 # =========================
 # Gestion du cache
 # =========================
-def get_cache_dir() -> Path:
-    """Retourne un dossier de cache valide, compatible PyInstaller."""
-    if getattr(sys, "frozen", False):
-        base_dir = Path(tempfile.gettempdir()) / "Lorcy" / "cache_lorcana"
-    else:
-        base_dir = Path(__file__).resolve().parent / "cache_lorcana"
-    base_dir.mkdir(parents=True, exist_ok=True)
-    return base_dir
-
-CACHE_DIR = get_cache_dir()
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+# Illustrations téléchargées (octets d'origine), budget réglable en Mo via LORCY_IMAGE_CACHE_MB
+IMAGE_STORE = ImageStore(
+    CACHE_DIR / "images",
+    max_bytes=int(os.environ.get("LORCY_IMAGE_CACHE_MB", IMAGE_STORE_MAX_BYTES // (1024 * 1024))) * 1024 * 1024,
+)
+atexit.register(IMAGE_STORE.flush)
+
+# Cartes prêtes à imprimer, budget réglable en Mo via LORCY_PRINT_CACHE_MB ;
+# incrémenter RENDER_VERSION si le rendu change
+RENDER_VERSION = 3
+PRINT_CACHE = BitmapCache(
+    CACHE_DIR / f"print_{DPI}dpi",
+    params=f"{CARD_W_PX}x{CARD_H_PX}@{DPI}|v{RENDER_VERSION}",
+    max_bytes=int(os.environ.get("LORCY_PRINT_CACHE_MB", PRINT_CACHE_MAX_BYTES // (1024 * 1024))) * 1024 * 1024,
+)
 
 # =========================
 # Outils dataset
 # =========================
-def normalize(txt: str) -> str:
-    txt = txt.lower().strip()
-    txt = txt.replace("–", "-").replace("—", "-").replace("−", "-")
-    txt = "".join(c for c in unicodedata.normalize("NFD", txt) if unicodedata.category(c) != "Mn")
-    return txt
+SNAPSHOT_PATH = CACHE_DIR / "cards.snapshot"
+DATASET_MANIFEST_PATH = CACHE_DIR / "dataset_manifest.json"
+LEGACY_CACHE_JSON = CACHE_DIR / "cards_cache.json"
+
+def _load_cards_and_index() -> Tuple[List[Dict], CardIndex]:
+    """
+    Charge toutes les cartes et l'index de recherche.
+    Utilise le snapshot binaire (mmap) tant qu'il correspond aux sources ; sinon
+    n'y fusionne que les sous-ensembles modifiés (voir `ingest_dataset`).
+    """
+    cards, index, report = ingest_dataset(
+        SNAPSHOT_PATH, DATASET_MANIFEST_PATH, DATASET_PATH, DELTAS_DIR, pick_image_url
+    )
+    if report.mode == "snapshot":
+        print(f"[DEBUG] Snapshot chargé ({report.cards} cartes)")
+    else:
+        LEGACY_CACHE_JSON.unlink(missing_ok=True)
+        print(
+            f"[DEBUG] Dataset ingéré ({report.mode}{', ' + report.reason if report.reason else ''}) : "
+            f"{len(report.changed)} sous-ensemble(s) modifié(s), {report.added} ajoutée(s), "
+            f"{report.updated} mise(s) à jour en {report.seconds * 1000:.0f} ms"
+        )
 
-CACHE_JSON = CACHE_DIR / "cards_cache.json"
-from datetime import datetime
+    # Index approché (suggestions des lignes introuvables) construit avec le reste,
+    # pour ne pas le payer pendant une génération
+    _ = index.fuzzy
+    return cards, index
 
-def load_dataset() -> List[Dict]:
-    """Charge toutes les cartes depuis le JSON principal, avec gestion de cache."""
-    if CACHE_JSON.exists():
-        try:
-            data = json.loads(CACHE_JSON.read_text(encoding="utf-8"))
-            print(f"[DEBUG] Cache chargé ({len(data)} cartes)")
-            return data
-        except Exception:
-            print("[DEBUG] Cache corrompu, rechargement du dataset complet.")
-
-    if not DATASET_PATH.exists():
-        raise FileNotFoundError(f"Fichier de dataset introuvable : {DATASET_PATH}")
-
-    raw = DATASET_PATH.read_text(encoding="utf-8").strip()
-    data = json.loads(raw)
-
-    if "cards" not in data:
-        raise ValueError("Le fichier JSON ne contient pas de clé 'cards'.")
-
-    cards_section = data["cards"]
-    cards: List[Dict] = []
-    seen_ids = set()
-
-    def add_card(c: Dict):
-        """Ajoute une carte et explore ses sous-structures si besoin."""
-        if not isinstance(c, dict):
-            return
-        cid = str(c.get("card_id") or c.get("id") or id(c))
-        if cid not in seen_ids:
-            cards.append(c)
-            seen_ids.add(cid)
-        for key, val in c.items():
-            if isinstance(val, list):
-                for sub in val:
-                    if isinstance(sub, dict):
-                        add_card(sub)
-            elif isinstance(val, dict):
-                add_card(val)
-
-    if isinstance(cards_section, list):
-        for c in cards_section:
-            add_card(c)
-    elif isinstance(cards_section, dict):
-        for subset_name, subset in cards_section.items():
-            if isinstance(subset, list):
-                for c in subset:
-                    add_card(c)
-            elif isinstance(subset, dict):
-                add_card(subset)
-    else:
-        raise ValueError("Format inattendu pour la clé 'cards'.")
+# Dataset et index partagés par l'interface et le générateur (`full.json` et deltas)
+DATASET = DatasetService(
+    DATASET_PATH, _load_cards_and_index, version=lambda: sources_version(DATASET_PATH, DELTAS_DIR)
+)
 
-    print(f"[DEBUG] {len(cards)} cartes détectées dans le dataset (avec variantes et promos)")
+# Dernière génération de chaque PDF, pour la régénération incrémentale
+BUILDS_DIR = CACHE_DIR / "builds"
 
-    try:
-        CACHE_JSON.write_text(json.dumps(cards, ensure_ascii=False, indent=2), encoding="utf-8")
-        print(f"[DEBUG] Cache mis à jour : {CACHE_JSON}")
-    except Exception as e:
-        print(f"[DEBUG] Impossible d’écrire le cache : {e}")
+# Résolutions requête -> carte des decklists, conservées entre deux lancements
+DECK_QUERIES = QueryCache(CACHE_DIR / "deck_queries.json")
 
-    return cards
+def load_dataset() -> List[Dict]:
+    """Cartes du dataset partagé, chargées une seule fois par processus."""
+    return DATASET.get().cards
 
 def get_card_name(card: Dict) -> str:
     n = card.get("name", "")
     s = card.get("subtitle")
     return f"{n} – {s}" if s else n
 
-# ---- Index global (construit une seule fois) ----
-_CARD_INDEX = None
-
-def _build_card_index(cards: List[Dict]):
+def _build_card_index(cards: List[Dict]) -> CardIndex:
     """Prépare un index pour une recherche robuste, bilingue, sans faux positifs."""
-    index = []
-    for c in cards:
-        name = c.get("name") or ""
-        subtitle = c.get("subtitle") or ""
-        full_title = f"{name} – {subtitle}" if subtitle else name
-
-        kws = c.get("searchable_keywords") or []
-        kws = [k for k in kws if isinstance(k, str)]
-
-        def to_tokens(s: str) -> list[str]:
-            s_norm = normalize(s)
-            return [t for t in re.split(r"[^a-z0-9]+", s_norm) if t]
-
-        title_tokens = to_tokens(full_title) + to_tokens(name) + to_tokens(subtitle)
-        kw_tokens = []
-        for k in kws:
-            kw_tokens.extend(to_tokens(k))
-
-        token_set = set(title_tokens + kw_tokens)
-        full_title_norm = normalize(full_title)
-
-        index.append({
-            "card": c,
-            "full_title_norm": full_title_norm,
-            "token_set": token_set,
-        })
-    return index
+    return CardIndex(cards)
+
+# Index construit à la demande pour une liste de cartes autre que celle du service
+_CARD_INDEX: Optional[CardIndex] = None
+_CARD_INDEX_SOURCE: Optional[List[Dict]] = None
 
 def search_local(cards: List[Dict], q: str) -> List[Dict]:
     """Recherche stricte, bilingue et sans faux positifs."""
-    global _CARD_INDEX
-    if _CARD_INDEX is None:
+    global _CARD_INDEX, _CARD_INDEX_SOURCE
+    state = DATASET.state
+    if state is not None and state.cards is cards:
+        return state.index.search(q)
+    if _CARD_INDEX is None or _CARD_INDEX_SOURCE is not cards:
         _CARD_INDEX = _build_card_index(cards)
-
-    q_norm = normalize(q).strip()
-    if not q_norm:
-        return []
-
-    q_tokens = [t for t in re.split(r"[^a-z0-9]+", q_norm) if t]
-    if not q_tokens:
-        return []
-
-    def token_matches(query_tok: str, candidate_tok: str) -> bool:
-        if query_tok == candidate_tok:
-            return True
-        return len(query_tok) >= 3 and candidate_tok.startswith(query_tok)
-
-    def card_matches(entry) -> bool:
-        tokens = entry["token_set"]
-        for qt in q_tokens:
-            if not any(token_matches(qt, ct) for ct in tokens):
-                return False
-        return True
-
-    exact = [e["card"] for e in _CARD_INDEX if e["full_title_norm"] == q_norm]
-    if exact:
-        return exact
-
-    hits = [e["card"] for e in _CARD_INDEX if card_matches(e)]
-
-    seen = set()
-    out = []
-    for c in hits:
-        cid = c.get("card_id") or id(c)
-        if cid not in seen:
-            out.append(c)
-            seen.add(cid)
-    return out
+        _CARD_INDEX_SOURCE = cards
+    return _CARD_INDEX.search(q)
 
 def pick_image_url(card: Dict[str, Any]) -> Optional[str]:
+    # Cartes issues du snapshot : URL déjà choisie à l'ingestion
+    u = card.get("image_url")
+    if u:
+        return u
     vs = card.get("variants")
     if isinstance(vs, list):
         for v in vs:
@@ -200,202 +143,467 @@ def pick_image_url(card: Dict[str, Any]) -> Optional[str]:
                     return u
     return card.get("thumbnail_url")
 
-def fetch_image(url: str) -> Image.Image:
+def legacy_image_path(url: str) -> Path:
     safe = url.replace("://", "_").replace("/", "_").replace("?", "_").replace("=", "_")
-    p = CACHE_DIR / f"{safe}.jpg"
-    if p.exists():
-        return Image.open(p).convert("RGB")
-    r = requests.get(url, timeout=20)
+    return LEGACY_CACHE_DIR / f"{safe}.jpg"
+
+def read_legacy_image(url: str) -> Optional[bytes]:
+    """Octets de l'illustration dans l'ancien cache s'ils sont intacts, sinon None ; rien n'est écrit ni supprimé."""
+    try:
+        data = legacy_image_path(url).read_bytes()
+        check_image_bytes(data)
+    except (OSError, IncompleteDownload):
+        return None
+    return data
+
+def import_legacy_image(url: str) -> Optional[bytes]:
+    """
+    Reprend dans IMAGE_STORE l'illustration de l'ancien cache, s'il l'a : ses octets, sinon None.
+    Le fichier est supprimé une fois l'entrée enregistrée, pour que le budget du magasin
+    borne l'espace réellement occupé. Un fichier tronqué (écriture interrompue) est
+    supprimé aussi ; l'illustration sera retéléchargée.
+    """
+    legacy = legacy_image_path(url)
+    if not legacy.is_file():
+        return None
+    data = legacy.read_bytes()
+    try:
+        IMAGE_STORE.put(url, data)
+    except IncompleteDownload as e:
+        print(f"[DEBUG] Ancien cache ignoré ({legacy.name}) : {e}")
+        data = None
+    legacy.unlink(missing_ok=True)
+    return data
+
+def download_image(url: str, etag: Optional[str] = None, session=None):
+    """Télécharge une image : (octets ou None si 304, ETag, taille annoncée)."""
+    headers = {"If-None-Match": etag} if etag else {}
+    r = (session or get_session()).get(url, timeout=20, headers=headers)
+    if r.status_code == 304:
+        return None, etag, None
     r.raise_for_status()
-    im = Image.open(io.BytesIO(r.content)).convert("RGB")
-    im.save(p, "JPEG", quality=90)
+    length = r.headers.get("Content-Length")
+    expected = int(length) if length and not r.headers.get("Content-Encoding") else None
+    return r.content, r.headers.get("ETag"), expected
+
+def fetch_image_bytes(url: str, session=None, revalidate: bool = False, download_url: Optional[str] = None) -> bytes:
+    """
+    Octets d'origine d'une illustration, depuis IMAGE_STORE ou le réseau.
+    `download_url` : adresse de téléchargement effective (miroir), l'entrée restant indexée sous `url`.
+    """
+    if url not in IMAGE_STORE:
+        import_legacy_image(url)
+    return IMAGE_STORE.fetch(
+        url, lambda u, etag: download_image(download_url or u, etag, session), revalidate=revalidate
+    )
+
+# Marge tolérée sous le format d'impression pour le décodage réduit (~296 dpi au lieu de 300)
+DRAFT_TOLERANCE = 0.02
+# Modes acceptés tels quels par `Image.reduce`
+REDUCE_MODES = ("RGB", "RGBA", "L")
+
+def open_art(data: bytes, size: Tuple[int, int] = (CARD_W_PX, CARD_H_PX)) -> Image.Image:
+    """
+    Décode une illustration au plus près du format `size` (recadrage « cover ») :
+    pour un JPEG, le mode brouillon de Pillow décode directement à 1/2, 1/4 ou 1/8
+    de la résolution d'origine ; les autres formats sont réduits par `reduce`.
+    """
+    im = Image.open(io.BytesIO(data))
+    sw, sh = im.size
+    scale = max(size[0] / sw, size[1] / sh) * (1 - DRAFT_TOLERANCE)
+    need = (math.ceil(sw * scale), math.ceil(sh * scale))
+    if im.format == "JPEG":
+        im.draft("RGB", need)
+    else:
+        factor = min(sw // need[0], sh // need[1])
+        if factor >= 2:
+            # `reduce` ne gère pas les modes palette (PNG quantifiés, GIF) ni CMYK
+            if im.mode not in REDUCE_MODES:
+                im = im.convert("RGB")
+            im = im.reduce(factor)
+    return im.convert("RGB")
+
+def fetch_image(url: str, session=None) -> Image.Image:
+    cached = url in IMAGE_STORE
+    data = fetch_image_bytes(url, session)
+    im = open_art(data)
+    im.info["cached"] = cached
+    im.info["bytes"] = 0 if cached else len(data)
     return im
 
-def resize_and_gray(im: Image.Image) -> Image.Image:
+def resize_and_crop(im: Image.Image) -> Image.Image:
     sw, sh = im.size
     scale = max(CARD_W_PX / sw, CARD_H_PX / sh)
     nw, nh = int(sw * scale), int(sh * scale)
     im = im.resize((nw, nh), Image.LANCZOS)
     left, top = (nw - CARD_W_PX)//2, (nh - CARD_H_PX)//2
-    im = im.crop((left, top, left + CARD_W_PX, top + CARD_H_PX))
+    return im.crop((left, top, left + CARD_W_PX, top + CARD_H_PX))
+
+def resize_and_gray(im: Image.Image) -> Image.Image:
+    """Carte noir et blanc en niveaux de gris (mode L) : trois fois moins de mémoire et de cache qu'en RGB."""
+    im = resize_and_crop(im)
     im = ImageOps.grayscale(im)
-    im = ImageOps.autocontrast(im)
-    return im.convert("RGB")
+    return ImageOps.autocontrast(im)
 
-def text_size(draw, text, font):
-    x0, y0, x1, y1 = draw.textbbox((0, 0), text, font=font)
-    return (x1 - x0, y1 - y0)
-
-def draw_wrapped(draw, text, font, x, y, max_w, line_gap=6, fill="black"):
-    words = text.split()
-    line = ""
-    _, line_h = text_size(draw, "Hg", font)
-    cy = y
-    for w in words:
-        probe = (line + " " + w) if line else w
-        tw, _ = text_size(draw, probe, font)
-        if tw <= max_w:
-            line = probe
-        else:
-            draw.text((x, cy), line, fill=fill, font=font)
-            cy += line_h + line_gap
-            line = w
-    if line:
-        draw.text((x, cy), line, fill=fill, font=font)
-        cy += line_h + line_gap
-    return cy
+# Rendu texte : polices, mesures et gabarits chargés une seule fois par thread de rendu
+_TEXT_CARDS = threading.local()
 
 def generate_text_card(card: Dict) -> Image.Image:
-    W, H = CARD_W_PX, CARD_H_PX
-    P = 26
-    COST_BOX = 82
-    LORE_COL_W = 56
-    BORDER = 3
-
-    img = Image.new("RGB", (W, H), "white")
-    d = ImageDraw.Draw(img)
-    d.rounded_rectangle([(5, 5), (W - 5, H - 5)], radius=22, outline="#B0B8C0", width=BORDER)
-
-    f_name = ImageFont.truetype("comicbd.ttf", 50)
-    f_sub = ImageFont.truetype("comic.ttf", 36)
-    f_type = ImageFont.truetype("comicbd.ttf", 32)
-    f_ability = ImageFont.truetype("comicbd.ttf", 44)
-    f_text = ImageFont.truetype("comic.ttf", 40)
-    f_stat = ImageFont.truetype("comicbd.ttf", 46)
-    f_cost = ImageFont.truetype("comicbd.ttf", 40)
-    f_tag = ImageFont.truetype("comic.ttf", 32)
-
-    name = card.get("name", "")
-    subtitle = card.get("subtitle", "")
-    ctype = card.get("type", "")
-    rules_raw = (card.get("rules_text") or "").strip()
-
-    ability_name, rules_text = "", rules_raw
-    if "\n" in rules_raw:
-        parts = [p.strip() for p in rules_raw.split("\n", 1)]
-        ability_name, rules_text = parts[0], parts[1]
-
-    strength = str(card.get("strength") or "")
-    willpower = str(card.get("willpower") or "")
-    ink_cost = str(card.get("ink_cost") or "?")
-    inkable = bool(card.get("ink_convertible", False))
-    lore_val = int(card.get("quest_value") or 0)
-
-    tag_color = "#10B981" if inkable else "#FF0000"
-    tag_txt = "ENCRABLE" if inkable else "NON-ENCRABLE"
-
-    cost_x, cost_y = P, P
-    d.rounded_rectangle([cost_x, cost_y, cost_x + COST_BOX, cost_y + COST_BOX], radius=6, outline=tag_color, width=4)
-    tw, th = text_size(d, ink_cost, f_cost)
-    d.text((cost_x + (COST_BOX - tw)//2, cost_y + (COST_BOX - th)//2), ink_cost, fill=tag_color, font=f_cost)
-    d.text((cost_x + COST_BOX + 14, cost_y + 8), tag_txt, fill=tag_color, font=f_tag)
-
-    title_y = cost_y + COST_BOX + 14
-    d.text((P, title_y), name, fill="black", font=f_name)
-    _, name_h = text_size(d, "Hg", f_name)
-    sub_y = title_y + name_h - 6
-    d.text((P, sub_y), subtitle, fill="black", font=f_sub)
-    _, sub_h = text_size(d, "Hg", f_sub)
-
-    sep_y = sub_y + sub_h + 8
-    d.line((P, sep_y, W - P, sep_y), fill="#B0B8C0", width=2)
-
-    type_y = sep_y + 8
-    d.text((P, type_y), ctype, fill="black", font=f_type)
-    _, type_h = text_size(d, "Hg", f_type)
-
-    text_top = type_y + type_h + 18
-    text_x = P
-    text_max_w = W - 2 * P - LORE_COL_W
-
-    if ability_name:
-        d.text((text_x, text_top), ability_name, fill="black", font=f_ability)
-        _, ability_h = text_size(d, "Hg", f_ability)
-        text_top += ability_h + 8
-
-    cy = draw_wrapped(d, rules_text, f_text, text_x, text_top, max_w=text_max_w, line_gap=8)
-
-    if strength or willpower:
-        stats = f"{strength}/{willpower}" if strength and willpower else (strength or willpower)
-        tw, th = text_size(d, stats, f_stat)
-        d.text((W - P - tw, H - P - th), stats, fill="black", font=f_stat)
-
-    return img
+    renderer = getattr(_TEXT_CARDS, "renderer", None)
+    if renderer is None:
+        renderer = _TEXT_CARDS.renderer = TextCardRenderer(CARD_W_PX, CARD_H_PX)
+    return renderer.render(card)
 
-def layout_pages(images: List[Image.Image]) -> List[Image.Image]:
-    pages: List[Image.Image] = []
+def card_slots() -> List[Tuple[int, int]]:
+    """Coins haut-gauche (x, y) en pixels des emplacements d'une planche A4, ligne par ligne."""
     total_w = COLS * CARD_W_PX + (COLS - 1) * GUTTER
     total_h = ROWS * CARD_H_PX + (ROWS - 1) * GUTTER
     start_x = (A4_W_PX - total_w)//2
     start_y = (A4_H_PX - total_h)//2
-    page = Image.new("RGB", (A4_W_PX, A4_H_PX), "white")
-    col = row = 0
-    for i, card in enumerate(images):
-        x = start_x + col * (CARD_W_PX + GUTTER)
-        y = start_y + row * (CARD_H_PX + GUTTER)
-        page.paste(card, (x, y))
-        col += 1
-        if col == COLS:
-            col = 0
-            row += 1
-        if row == ROWS or i == len(images) - 1:
-            pages.append(page)
-            if i != len(images) - 1:
-                page = Image.new("RGB", (A4_W_PX, A4_H_PX), "white")
-                col = row = 0
-    return pages
-
-def generate_from_text(deck_text: str, deck_name: str, model="text", progress_callback=None):
-    ensure_dirs()
-    cards = load_dataset()
-
-    for c in cards[:5]:
-        name = c.get("name") or c.get("title") or "??"
-        print(" -", name)
-
-    lines = [l.strip() for l in deck_text.splitlines() if l.strip()]
-    selected: List[Dict] = []
-
-    for i, line in enumerate(lines, 1):
-        if progress_callback:
-            progress_callback(i / len(lines))
-        qty, name_part = 1, line
-        parts = line.split(" ", 1)
-        if len(parts) == 2 and parts[0].isdigit():
-            qty = int(parts[0])
-            name_part = parts[1].strip()
-        results = search_local(cards, name_part)
-        if not results:
+    return [
+        (start_x + col * (CARD_W_PX + GUTTER), start_y + row * (CARD_H_PX + GUTTER))
+        for row in range(ROWS)
+        for col in range(COLS)
+    ]
+
+def iter_pages(images: Iterable[Image.Image]) -> Iterator[Image.Image]:
+    """Compose les pages A4 une par une : une seule page est allouée à la fois."""
+    slots = card_slots()
+    page = None
+    n = 0
+    for card in images:
+        if page is None:
+            page = Image.new("RGB", (A4_W_PX, A4_H_PX), "white")
+        page.paste(card, slots[n])
+        n += 1
+        if n == len(slots):
+            yield page
+            page = None
+            n = 0
+    if page is not None:
+        yield page
+
+def layout_pages(images: List[Image.Image]) -> List[Image.Image]:
+    return list(iter_pages(images))
+
+def render_source(card: Dict, model: str) -> tuple[str, bool]:
+    """
+    Source du rendu d'une carte : (URL de l'illustration, True), ou pour le modèle
+    texte (identifiant et empreinte des champs rendus, False). Les caches de rendu
+    sont indexés par cette source : une errata ou une nouvelle URL n'y trouve rien.
+    """
+    url = pick_image_url(card)
+    if model in ("color", "bw") and url:
+        return url, True
+    return f"card:{card_key(card)}:{card_digest(card)}", False
+
+def build_key(card: Dict, model: str) -> str:
+    """Identité d'une carte dans un PDF généré : modèle et source du rendu (URL, ou empreinte du texte)."""
+    return f"{model}|{render_source(card, model)[0]}"
+
+def render_art(im: Image.Image, model: str) -> Image.Image:
+    return resize_and_crop(im) if model == "color" else resize_and_gray(im)
+
+def _render_and_persist(source: str, model: str, fn, *args) -> Tuple[Image.Image, float]:
+    """Tâche du pool de rendu : rend la carte puis l'écrit dans le cache disque (image, durée)."""
+    t0 = time.perf_counter()
+    im = fn(*args)
+    PRINT_CACHE.put(source, model, im)
+    return im, time.perf_counter() - t0
+
+@dataclass
+class DeckStats:
+    """Compteurs d'une génération (résumé du mode batch)."""
+    lines: int = 0
+    missing: int = 0
+    cards: int = 0
+    unique: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    images: int = 0
+    rendered: int = 0
+    reused: int = 0
+    pages_reused: int = 0
+    seconds: float = 0.0
+    unresolved: List[str] = field(default_factory=list)
+    suggestions: Dict[str, List[str]] = field(default_factory=dict)
+
+def render_cards(
+    unique: Dict[str, Dict],
+    model: str,
+    stats: Optional[DeckStats] = None,
+    tracer: Optional[Tracer] = None,
+) -> Dict[str, Image.Image]:
+    """
+    Rend chaque carte unique (clé -> carte) au format d'impression.
+    Ordre de recherche : cache mémoire, cache disque, puis téléchargement/rendu.
+    Les lectures disque et les rendus sont répartis sur le pool de rendu.
+    `tracer` reçoit une unité « fetch » et une unité « render » par carte unique.
+    """
+    pool = get_render_pool()
+    rendered: Dict[str, Image.Image] = {}
+    sources: Dict[str, List[str]] = {}
+    cards_by_source: Dict[str, Dict] = {}
+
+    for key, c in unique.items():
+        source, _ = render_source(c, model)
+        im = RENDER_CACHE.get((source, model))
+        if im is not None:
+            rendered[key] = im
+            if tracer:
+                tracer.add("fetch", hit=True, detail="memory")
+                tracer.add("render", hit=True, detail="memory")
             continue
-        selected.extend([results[0]] * qty)
+        sources.setdefault(source, []).append(key)
+        cards_by_source.setdefault(source, c)
+
+    def store(source: str, im: Image.Image):
+        RENDER_CACHE.put((source, model), im)
+        for key in sources[source]:
+            rendered[key] = im
+
+    def advance(stage: str, source: str, **kw):
+        if tracer:
+            tracer.add(stage, done=len(sources[source]), **kw)
+
+    # Cache disque, lu en parallèle
+    with tracer.timed("render") if tracer else nullcontext():
+        disk = dict(zip(sources, pool.map(lambda src: PRINT_CACHE.get(src, model), sources)))
+    pending = {}
+    to_fetch: List[str] = []
+    for source, im in disk.items():
+        if im is not None:
+            store(source, im)
+            advance("fetch", source, hit=True, detail="disk")
+            advance("render", source, hit=True, detail="disk")
+        elif render_source(cards_by_source[source], model)[1]:
+            to_fetch.append(source)
+        else:
+            advance("fetch", source, detail="text")
+            pending[pool.submit(_render_and_persist, source, model, generate_text_card, cards_by_source[source])] = source
+
+    # Préchargement parallèle des images manquantes, rendu au fil de l'arrivée
+    for res in prefetch_images(to_fetch, fetch_image):
+        if res.error is not None:
+            for fut in pending:
+                fut.cancel()
+            raise res.error
+        if tracer is None:
+            # Sinon, la durée de chaque téléchargement est dans les événements « fetch » de la trace
+            print(f"[DEBUG] Image {res.seconds * 1000:7.1f} ms : {res.url}")
+        cached = bool(res.image.info.get("cached"))
+        advance("fetch", res.url, seconds=res.seconds, nbytes=res.image.info.get("bytes", 0), hit=cached)
+        pending[pool.submit(_render_and_persist, res.url, model, render_art, res.image, model)] = res.url
+
+    for fut in as_completed(pending):
+        im, seconds = fut.result()
+        store(pending[fut], im)
+        advance("render", pending[fut], seconds=seconds, hit=False)
+
+    disk_hits = sum(im is not None for im in disk.values())
+    if stats is not None:
+        stats.unique += len(unique)
+        stats.memory_hits += len(unique) - sum(len(keys) for keys in sources.values())
+        stats.disk_hits += disk_hits
+        stats.images += len(to_fetch)
+        stats.rendered += len(pending)
+    print(f"[DEBUG] Rendu : {len(unique)} cartes uniques, {disk_hits} depuis le cache disque, {len(RENDER_CACHE)} en mémoire")
+    return rendered
+
+# Nombre de cartes rendues d'avance pendant la mise en page (deux planches)
+RENDER_CHUNK = COLS * ROWS * 2
+
+def iter_rendered(
+    selected: List[Dict],
+    model: str,
+    on_card=None,
+    stats: Optional[DeckStats] = None,
+    tracer: Optional[Tracer] = None,
+    reuse: Container[str] = (),
+) -> Iterator[Tuple[str, Optional[Image.Image]]]:
+    """
+    Produit les couples (clé, carte rendue) dans l'ordre du deck, par paquets de RENDER_CHUNK :
+    seules les cartes du paquet en cours sont gardées en mémoire (plus le cache LRU).
+    Les cartes dont la clé est dans `reuse` ne sont pas rendues (image None).
+    `on_card(fait, total)` est appelé pour chaque carte produite.
+    """
+    done = 0
+    for start in range(0, len(selected), RENDER_CHUNK):
+        chunk = selected[start:start + RENDER_CHUNK]
+        unique: Dict[str, Dict] = {}
+        reused = set()
+        for c in chunk:
+            key = card_key(c)
+            if key in reuse:
+                reused.add(key)
+            else:
+                unique.setdefault(key, c)
+        if tracer and reused:
+            tracer.add("fetch", done=len(reused), hit=True, detail="build")
+            tracer.add("render", done=len(reused), hit=True, detail="build")
+        rendered = render_cards(unique, model, stats, tracer) if unique else {}
+        for c in chunk:
+            key = card_key(c)
+            done += 1
+            if on_card:
+                on_card(done, len(selected))
+            yield key, rendered.get(key)
+
+def write_cards_pdf(
+    pdf: PdfStreamWriter,
+    cards: Iterable[Tuple[str, Image.Image]],
+    model: str,
+    tracer: Optional[Tracer] = None,
+    previous: Optional[PreviousBuild] = None,
+    build_keys: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Place les cartes sur les planches directement dans le PDF, selon la géométrie
+    de `card_slots()`. Chaque carte unique n'est encodée qu'une fois puis
+    référencée à chacun de ses emplacements : aucune page A4 n'est rastérisée.
+    Une carte sans image (None) est recopiée, déjà encodée, depuis `previous`,
+    où elle est rangée sous sa clé de génération (`build_keys[clé]`, voir `build_key`).
+    """
+    slots = card_slots()
+    encoding = "flate" if model == "text" else "jpeg"
+    placements = []
+
+    def flush_page():
+        t0, size0 = time.perf_counter(), pdf.bytes_written
+        pdf.add_page(A4_W_PX, A4_H_PX, placements)
+        if tracer:
+            tracer.add("layout", done=len(placements), seconds=time.perf_counter() - t0,
+                       nbytes=pdf.bytes_written - size0, detail=f"page {pdf.page_count}")
+
+    for key, im in cards:
+        t0, size0 = time.perf_counter(), pdf.bytes_written
+        if im is None:
+            ref = pdf.add_encoded_image(*previous.read(build_keys[key]), key=(key, model))
+        else:
+            if model == "bw" and im.mode != "L":
+                im = im.convert("L")
+            ref = pdf.add_image(im, key=(key, model), encoding=encoding)
+        written = pdf.bytes_written - size0
+        if tracer:
+            tracer.add("write", seconds=time.perf_counter() - t0, nbytes=written, hit=im is None or not written)
+        x, y = slots[len(placements)]
+        placements.append((ref, x, y, CARD_W_PX, CARD_H_PX))
+        if len(placements) == len(slots):
+            flush_page()
+            placements = []
+    if placements:
+        flush_page()
+
+def generate_from_text(
+    deck_text: str,
+    deck_name: str,
+    model="text",
+    progress_callback=None,
+    output_dir: Optional[Path] = None,
+    stats: Optional[DeckStats] = None,
+    on_event: Optional[Callable[[StageEvent], None]] = None,
+    trace_path: Optional[Path] = None,
+    remember_build: bool = True,
+):
+    """
+    Génère le PDF de proxys d'une decklist et retourne son chemin.
+    `output_dir` : dossier de sortie (Téléchargements par défaut) ;
+    `stats` : compteurs remplis pendant la génération ;
+    `progress_callback(ratio)` : progression pondérée des étapes (resolve, fetch, render, layout, write) ;
+    `on_event(StageEvent)` : événements détaillés de chaque étape ;
+    `trace_path` : trace JSON de la génération (par défaut dans LORCY_TRACE_DIR si défini) ;
+    `remember_build` : False pour une sortie jetable (dossier temporaire), qui ne
+    réutilise ni n'enregistre de génération précédente.
+    """
+    t0 = time.perf_counter()
+    stats = stats if stats is not None else DeckStats()
+    tracer = Tracer(
+        stage_weights(model),
+        on_progress=progress_callback,
+        on_event=on_event,
+        trace_path=trace_path if trace_path is not None else default_trace_path(deck_name),
+    )
+    ensure_dirs()
+    dataset = DATASET.get()
+
+    # Résolution de toute la liste en un passage (requêtes dédoublonnées, cache persistant)
+    tracer.set_total("resolve", 1)
+    t_resolve = time.perf_counter()
+    deck = resolve_deck(deck_text, dataset, DECK_QUERIES)
+    tracer.stats["resolve"].hits = deck.cache_hits
+    tracer.stats["resolve"].misses = deck.queries - deck.cache_hits
+    tracer.add("resolve", seconds=time.perf_counter() - t_resolve, detail=f"{len(deck.unresolved)} introuvable(s)")
+    selected = deck.cards
+    stats.lines = len(deck.lines)
+    stats.missing = len(deck.unresolved)
+    stats.unresolved = [l.text for l in deck.unresolved]
+    stats.suggestions = {l.text: deck.suggestions[l.query] for l in deck.unresolved}
+    stats.cards = len(selected)
+    for l in deck.unresolved:
+        hint = " ; ".join(deck.suggestions[l.query])
+        print(f"[DEBUG] Ligne {l.number} introuvable : {l.text}" + (f" (vouliez-vous dire : {hint} ?)" if hint else ""))
+    print(f"[DEBUG] Decklist : {deck.queries} requêtes uniques, {deck.cache_hits} depuis le cache")
 
     if not selected:
+        tracer.close(deck=deck_name, model=model, error="Aucune carte trouvée.")
         raise ValueError("Aucune carte trouvée.")
 
-    downloads = Path.home() / "Downloads"
-    out_pdf = downloads / f"{deck_name}.pdf"
-
-    images: List[Image.Image] = []
-
-    for c in selected:
-        url = pick_image_url(c)
-        if model == "color" and url:
-            im = fetch_image(url)
-            sw, sh = im.size
-            scale = max(CARD_W_PX / sw, CARD_H_PX / sh)
-            im = im.resize((int(sw * scale), int(sh * scale)), Image.LANCZOS)
-            left, top = (im.width - CARD_W_PX)//2, (im.height - CARD_H_PX)//2
-            im = im.crop((left, top, left + CARD_W_PX, top + CARD_H_PX))
-        elif model == "bw" and url:
-            im = resize_and_gray(fetch_image(url))
-        else:
-            im = generate_text_card(c)
-        images.append(im)
-
-    pages = layout_pages(images)
-    first, rest = pages[0], pages[1:]
-    first.save(out_pdf, "PDF", resolution=DPI, save_all=True, append_images=rest)
+    # Volume de chaque étape : une unité par carte unique de chaque paquet de rendu,
+    # une unité par emplacement pour la mise en page et l'écriture
+    per_chunk_unique = sum(
+        len({card_key(c) for c in selected[i:i + RENDER_CHUNK]}) for i in range(0, len(selected), RENDER_CHUNK)
+    )
+    tracer.set_total("fetch", per_chunk_unique)
+    tracer.set_total("render", per_chunk_unique)
+    tracer.set_total("layout", len(selected))
+    tracer.set_total("write", len(selected))
+
+    out_dir = Path(output_dir) if output_dir is not None else OUTPUT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_pdf = out_dir / f"{deck_name}.pdf"
+
+    # Génération précédente de ce PDF : les cartes déjà encodées y sont recopiées,
+    # reconnues à leur source de rendu (une errata ou une nouvelle illustration est réencodée)
+    keys = [card_key(c) for c in selected]
+    build_keys = {card_key(c): build_key(c, model) for c in selected}
+    pages = page_hashes([build_keys[k] for k in keys], COLS * ROWS, model, PRINT_CACHE.params)
+    previous = open_previous(BUILDS_DIR, out_pdf, model, PRINT_CACHE.params) if remember_build else None
+    reuse = {k for k, b in build_keys.items() if b in previous} if previous else set()
+    if previous:
+        stats.reused = len(reuse)
+        stats.pages_reused = sum(1 for a, b in zip(pages, previous.manifest.pages) if a == b)
+        print(f"[DEBUG] Génération incrémentale : {len(reuse)}/{len(set(keys))} cartes et "
+              f"{stats.pages_reused}/{len(pages)} pages inchangées")
+
+    # Rendu une seule fois par carte unique (clé card_id + modèle), réutilisé pour
+    # chaque exemplaire ; chaque carte est embarquée une fois dans le PDF.
+    try:
+        with PdfStreamWriter(out_pdf, resolution=DPI, title=deck_name) as pdf:
+            try:
+                cards_iter = iter_rendered(selected, model, stats=stats, tracer=tracer, reuse=reuse)
+                write_cards_pdf(pdf, cards_iter, model, tracer, previous, build_keys)
+            finally:
+                # Fermé avant le remplacement du fichier (impossible sous Windows s'il est ouvert)
+                if previous:
+                    previous.close()
+    except Exception as e:
+        tracer.close(deck=deck_name, model=model, error=str(e))
+        raise
+    if remember_build:
+        st = out_pdf.stat()
+        save_manifest(BUILDS_DIR, out_pdf, BuildManifest(
+            deck=deck_name,
+            model=model,
+            params=PRINT_CACHE.params,
+            pdf_size=st.st_size,
+            pdf_mtime_ns=st.st_mtime_ns,
+            cards=keys,
+            pages=pages,
+            images={build_keys[k]: loc for (k, _), loc in pdf.image_locations.items()},
+        ))
+    stats.seconds = time.perf_counter() - t0
+    tracer.close(deck=deck_name, model=model, cards=len(selected), pdf=str(out_pdf))
     return out_pdf
 
 if __name__ == "__main__":
-    print("Utiliser via main.py")
+    print("Utiliser via main.py (interface) ou python -m src.cli (ligne de commande)")
@@ -0,0 +1,191 @@
+import io
+import os
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Dict, Hashable, List, Optional, Tuple
+
+from PIL import Image
+
+# =========================
+# Écriture PDF en flux
+# =========================
+PDF_JPEG_QUALITY = 75
+
+def _pdf_text(s: str) -> bytes:
+    """Chaîne PDF en UTF-16BE (hexadécimal), sûre pour les noms de deck accentués."""
+    return b"<FEFF" + s.encode("utf-16-be").hex().upper().encode("ascii") + b">"
+
+class PdfStreamWriter:
+    """
+    Écrit un PDF page par page, sans garder les pages en mémoire.
+
+    Chaque image est écrite immédiatement comme XObject, une seule fois par clé :
+    une carte présente en plusieurs exemplaires est référencée à chaque
+    emplacement sans dupliquer ses pixels. Seuls les offsets des objets et les
+    références des pages et images sont conservés jusqu'à `close()`, qui
+    écrit l'arbre des pages, la table xref et le trailer. Le fichier est produit
+    sous un nom temporaire puis renommé, pour ne jamais laisser de PDF tronqué.
+    """
+
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, path: Path, resolution: float = 72.0, title: Optional[str] = None):
+        self.path = Path(path)
+        self.resolution = float(resolution)
+        self.title = title if title is not None else self.path.stem
+        self._tmp = self.path.with_name(self.path.name + ".part")
+        self._fp: BinaryIO = open(self._tmp, "wb")
+        self._offsets: Dict[int, int] = {}
+        self._next_id = 3
+        self._page_ids: List[int] = []
+        self._images: Dict[Hashable, int] = {}
+        # clé -> [offset du flux, longueur, largeur, hauteur, espace couleur, filtre]
+        self.image_locations: Dict[Hashable, list] = {}
+        self._closed = False
+        self._fp.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    # ---- Objets bas niveau ----
+    def _new_id(self) -> int:
+        oid = self._next_id
+        self._next_id += 1
+        return oid
+
+    def _write_obj(self, oid: int, body: bytes, stream: Optional[bytes] = None) -> int:
+        """Écrit un objet ; retourne l'offset des données du flux (ou de l'objet, sans flux)."""
+        self._offsets[oid] = at = self._fp.tell()
+        self._fp.write(b"%d 0 obj\n" % oid)
+        self._fp.write(body)
+        if stream is not None:
+            self._fp.write(b"\nstream\n")
+            at = self._fp.tell()
+            self._fp.write(stream)
+            self._fp.write(b"\nendstream")
+        self._fp.write(b"\nendobj\n")
+        return at
+
+    def px_to_pt(self, px: float) -> float:
+        return px * 72.0 / self.resolution
+
+    # ---- Images et pages ----
+    def add_image(self, im: Image.Image, key: Optional[Hashable] = None, encoding: str = "jpeg") -> int:
+        """
+        Écrit une image comme XObject et retourne son numéro d'objet.
+        Si `key` a déjà été écrite, l'objet existant est réutilisé.
+        `encoding` : "jpeg" (DCTDecode, illustrations) ou "flate" (sans perte, cartes texte).
+        """
+        if key is not None and key in self._images:
+            return self._images[key]
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        if encoding == "flate":
+            data = zlib.compress(im.tobytes(), 6)
+            filter_name = "FlateDecode"
+        else:
+            buf = io.BytesIO()
+            im.save(buf, "JPEG", quality=PDF_JPEG_QUALITY)
+            data = buf.getvalue()
+            filter_name = "DCTDecode"
+        colorspace = "DeviceGray" if im.mode == "L" else "DeviceRGB"
+        return self.add_encoded_image(im.width, im.height, colorspace, filter_name, data, key)
+
+    def add_encoded_image(
+        self,
+        width: int,
+        height: int,
+        colorspace: str,
+        filter_name: str,
+        data: bytes,
+        key: Optional[Hashable] = None,
+    ) -> int:
+        """Écrit une image déjà encodée (ex. relue d'un PDF précédent) ; mêmes règles de clé que `add_image`."""
+        if key is not None and key in self._images:
+            return self._images[key]
+        oid = self._new_id()
+        at = self._write_obj(
+            oid,
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /%s "
+            b"/BitsPerComponent 8 /Filter /%s /Length %d >>"
+            % (width, height, colorspace.encode("ascii"), filter_name.encode("ascii"), len(data)),
+            data,
+        )
+        if key is not None:
+            self._images[key] = oid
+            self.image_locations[key] = [at, len(data), width, height, colorspace, filter_name]
+        return oid
+
+    def add_page(self, width_px: int, height_px: int, placements: List[Tuple[int, int, int, int, int]]) -> None:
+        """
+        Ajoute une page de `width_px` x `height_px` pixels.
+        `placements` : (objet image, x, y, largeur, hauteur) en pixels, origine en haut à gauche.
+        """
+        page_w, page_h = self.px_to_pt(width_px), self.px_to_pt(height_px)
+        ops = []
+        names = {}
+        for ref, x, y, w, h in placements:
+            name = names.setdefault(ref, f"Im{ref}")
+            ops.append(
+                "q %.4f 0 0 %.4f %.4f %.4f cm /%s Do Q"
+                % (self.px_to_pt(w), self.px_to_pt(h), self.px_to_pt(x), page_h - self.px_to_pt(y + h), name)
+            )
+        content = zlib.compress("\n".join(ops).encode("ascii"))
+        content_id = self._new_id()
+        self._write_obj(content_id, b"<< /Filter /FlateDecode /Length %d >>" % len(content), content)
+
+        xobjects = b" ".join(b"/%s %d 0 R" % (n.encode("ascii"), ref) for ref, n in names.items())
+        page_id = self._new_id()
+        self._write_obj(
+            page_id,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.4f %.4f] "
+            b"/Resources << /ProcSet [/PDF /ImageB /ImageC] /XObject << %s >> >> /Contents %d 0 R >>"
+            % (self.PAGES_ID, page_w, page_h, xobjects, content_id),
+        )
+        self._page_ids.append(page_id)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    @property
+    def bytes_written(self) -> int:
+        return self._fp.tell() if not self._closed else self.path.stat().st_size
+
+    # ---- Finalisation ----
+    def close(self) -> None:
+        if self._closed:
+            return
+        kids = b" ".join(b"%d 0 R" % p for p in self._page_ids)
+        self._write_obj(self.PAGES_ID, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_ids)))
+        self._write_obj(self.CATALOG_ID, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES_ID)
+        info_id = self._new_id()
+        self._write_obj(info_id, b"<< /Title %s /Producer (Lorcy) >>" % _pdf_text(self.title))
+
+        xref_at = self._fp.tell()
+        size = self._next_id
+        self._fp.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for oid in range(1, size):
+            self._fp.write(b"%010d 00000 n \n" % self._offsets[oid])
+        self._fp.write(
+            b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (size, self.CATALOG_ID, info_id, xref_at)
+        )
+        self._fp.close()
+        os.replace(self._tmp, self.path)
+        self._closed = True
+
+    def abort(self) -> None:
+        """Abandonne l'écriture et supprime le fichier temporaire."""
+        if self._closed:
+            return
+        self._fp.close()
+        self._tmp.unlink(missing_ok=True)
+        self._closed = True
+
+    def __enter__(self) -> "PdfStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,76 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+
+from PIL import Image
+
+if TYPE_CHECKING:
+    import requests
+
+# =========================
+# Session HTTP partagée
+# =========================
+MAX_WORKERS = 8
+
+_SESSION: Optional["requests.Session"] = None
+_SESSION_LOCK = threading.Lock()
+
+def get_session() -> "requests.Session":
+    """
+    Retourne une session HTTP unique, avec un pool de connexions keep-alive.
+    `requests` n'est importé qu'ici, au premier téléchargement.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSION = session
+        return _SESSION
+
+# =========================
+# Préchargement des images
+# =========================
+@dataclass
+class FetchResult:
+    url: str
+    image: Optional[Image.Image]
+    seconds: float
+    error: Optional[BaseException] = None
+
+def unique_urls(urls: Iterable[Optional[str]]) -> list[str]:
+    """Dédoublonne les URL en conservant l'ordre de première apparition."""
+    return list(dict.fromkeys(u for u in urls if u))
+
+def prefetch_images(
+    urls: Iterable[Optional[str]],
+    fetch: Callable[[str], Image.Image],
+    max_workers: int = MAX_WORKERS,
+) -> Iterator[FetchResult]:
+    """
+    Télécharge/décode les images en parallèle (pool de threads borné).
+    Les résultats sont produits dans l'ordre d'arrivée, chaque URL une seule fois.
+    """
+    todo = unique_urls(urls)
+    if not todo:
+        return
+
+    def job(url: str) -> FetchResult:
+        t0 = time.perf_counter()
+        try:
+            im = fetch(url)
+            return FetchResult(url, im, time.perf_counter() - t0)
+        except Exception as e:
+            return FetchResult(url, None, time.perf_counter() - t0, e)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(todo)))) as pool:
+        futures = [pool.submit(job, u) for u in todo]
+        for fut in as_completed(futures):
+            yield fut.result()
@@ -0,0 +1,121 @@
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageOps
+
+from src.core import make_proxies as mp
+from src.core.decklist import ResolvedDeck, resolve_deck
+from src.core.scheduler import get_render_pool
+from src.core.search_index import card_key
+
+# =========================
+# Aperçu basse résolution
+# =========================
+# Largeur d'une planche d'aperçu en pixels (≈ 30 dpi pour une page A4 à 300 dpi)
+PREVIEW_PAGE_WIDTH = 248
+
+class PreviewLayout:
+    """Géométrie de `card_slots()` ramenée à l'échelle de l'aperçu."""
+
+    def __init__(self, page_width: int = PREVIEW_PAGE_WIDTH):
+        self.scale = page_width / mp.A4_W_PX
+        self.page_size = (page_width, round(mp.A4_H_PX * self.scale))
+        self.card_size = (round(mp.CARD_W_PX * self.scale), round(mp.CARD_H_PX * self.scale))
+        self.slots = [(round(x * self.scale), round(y * self.scale)) for x, y in mp.card_slots()]
+
+def _cover(im: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """Redimensionne puis recadre au centre (même cadrage que `resize_and_crop`)."""
+    return ImageOps.fit(im, size, Image.BILINEAR)
+
+def _placeholder(card: Dict, size: Tuple[int, int]) -> Image.Image:
+    """Vignette d'une illustration pas encore téléchargée : cadre gris et nom de la carte."""
+    im = Image.new("RGB", size, "#E5E7EB")
+    draw = ImageDraw.Draw(im)
+    draw.rectangle((0, 0, size[0] - 1, size[1] - 1), outline="#9CA3AF")
+    words, lines = (card.get("name") or "?").split(), [""]
+    for w in words:
+        if lines[-1] and draw.textlength(f"{lines[-1]} {w}") > size[0] - 6:
+            lines.append(w)
+        else:
+            lines[-1] = f"{lines[-1]} {w}".strip()
+    draw.multiline_text((3, 3), "\n".join(lines[:4]), fill="#374151", spacing=1)
+    return im
+
+def card_thumbnail(card: Dict, model: str, size: Tuple[int, int]) -> Image.Image:
+    """
+    Vignette d'une carte au format `size`, sans accès réseau :
+    - illustration en cache : décodage réduit (mode brouillon JPEG) puis recadrage
+    - modèle texte : carte déjà rendue (mémoire ou disque) sinon rendue, puis réduite
+    - illustration absente du cache : vignette de remplacement
+    """
+    source, is_art = mp.render_source(card, model)
+    if is_art:
+        data = mp.IMAGE_STORE.get(source) if source in mp.IMAGE_STORE else None
+        if data is None:
+            # Lecture seule : la reprise dans IMAGE_STORE est laissée à la génération
+            data = mp.read_legacy_image(source)
+        if data is None:
+            return _placeholder(card, size)
+        im = _cover(mp.open_art(data, size), size)
+        if model == "bw":
+            im = ImageOps.autocontrast(ImageOps.grayscale(im)).convert("RGB")
+        return im
+    im = mp.RENDER_CACHE.get((source, model))
+    if im is None:
+        im = mp.PRINT_CACHE.get(source, model)
+    if im is None:
+        im = mp.generate_text_card(card)
+    return im.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+def iter_preview_pages(
+    cards: List[Dict],
+    model: str,
+    layout: Optional[PreviewLayout] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[Image.Image]:
+    """
+    Produit les planches d'aperçu une par une, dans l'ordre du deck.
+    Seules les vignettes et une planche à l'échelle de l'aperçu sont allouées ;
+    les vignettes d'une planche sont calculées en parallèle sur le pool de rendu.
+    """
+    layout = layout or PreviewLayout()
+    per_page = len(layout.slots)
+    pool = get_render_pool()
+    thumbs: Dict[str, Image.Image] = {}
+    for start in range(0, len(cards), per_page):
+        if cancel is not None and cancel.is_set():
+            return
+        chunk = cards[start:start + per_page]
+        todo: Dict[str, Dict] = {}
+        for c in chunk:
+            key = card_key(c)
+            if key not in thumbs:
+                todo.setdefault(key, c)
+        for key, im in zip(todo, pool.map(lambda c: card_thumbnail(c, model, layout.card_size), todo.values())):
+            thumbs[key] = im
+        page = Image.new("RGB", layout.page_size, "white")
+        for c, slot in zip(chunk, layout.slots):
+            page.paste(thumbs[card_key(c)], slot)
+        yield page
+
+def preview_deck(
+    deck_text: str,
+    model: str,
+    on_page: Callable[[int, int, Image.Image], None],
+    cancel: Optional[threading.Event] = None,
+    page_width: int = PREVIEW_PAGE_WIDTH,
+) -> ResolvedDeck:
+    """
+    Résout la decklist puis appelle `on_page(numéro, total, planche)` pour chaque
+    planche d'aperçu dès qu'elle est prête. Rien n'est écrit : ni PDF, ni cache d'impression,
+    ni magasin d'images.
+    """
+    deck = resolve_deck(deck_text, mp.DATASET.get(), mp.DECK_QUERIES)
+    if not deck.cards:
+        raise ValueError("Aucune carte trouvée.")
+    layout = PreviewLayout(page_width)
+    total = -(-len(deck.cards) // len(layout.slots))
+    for n, page in enumerate(iter_preview_pages(deck.cards, model, layout, cancel), 1):
+        on_page(n, total, page)
+    print(f"[DEBUG] Aperçu : {len(deck.cards)} cartes, {total} planches, {len(deck.unresolved)} introuvable(s)")
+    return deck
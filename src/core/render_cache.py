@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from PIL import Image
+
+# =========================
+# Cache LRU des cartes rendues
+# =========================
+RENDER_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+def image_nbytes(im: Image.Image) -> int:
+    """Taille mémoire approximative d'une image décodée."""
+    return im.width * im.height * len(im.getbands())
+
+class RenderCache:
+    """
+    Cache LRU en mémoire des cartes prêtes à imprimer, clé (source du rendu, modèle).
+    La taille totale est plafonnée en octets : les entrées les moins récemment
+    utilisées sont évincées au-delà de `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = RENDER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Hashable, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def get(self, key: Hashable) -> Optional[Image.Image]:
+        with self._lock:
+            im = self._items.get(key)
+            if im is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return im
+
+    def put(self, key: Hashable, im: Image.Image) -> None:
+        size = image_nbytes(im)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= image_nbytes(old)
+            if size > self.max_bytes:
+                return
+            self._items[key] = im
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= image_nbytes(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+RENDER_CACHE = RenderCache()
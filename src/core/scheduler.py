@@ -0,0 +1,40 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# =========================
+# Pool de rendu
+# =========================
+def render_workers() -> int:
+    """
+    Nombre de threads de rendu : `LORCY_RENDER_WORKERS` si défini, sinon un par
+    cœur (moins celui de l'interface), plafonné à 8.
+    """
+    env = os.environ.get("LORCY_RENDER_WORKERS", "").strip()
+    if env.isdigit() and int(env) > 0:
+        return int(env)
+    return max(1, min(8, (os.cpu_count() or 2) - 1))
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def get_render_pool() -> ThreadPoolExecutor:
+    """
+    Pool partagé pour le rendu des cartes (redimensionnement LANCZOS, niveaux de
+    gris, cartes texte, encodage PNG du cache disque).
+
+    Des threads plutôt que des processus : Pillow relâche le GIL pendant ces
+    opérations, les images n'ont pas à être sérialisées entre processus, et
+    l'exécutable PyInstaller (sans console, sys.frozen) n'a pas à relancer
+    d'interpréteurs via multiprocessing.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            workers = render_workers()
+            if getattr(sys, "frozen", False):
+                print(f"[DEBUG] Exécutable figé : rendu sur {workers} threads")
+            _POOL = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+        return _POOL
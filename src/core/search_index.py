@@ -0,0 +1,298 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
+from heapq import nlargest
+from typing import List, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+# =========================
+# Normalisation / tokens
+# =========================
+_TOKEN_SPLIT = re.compile(r"[^a-z0-9]+")
+
+def normalize(txt: str) -> str:
+    txt = txt.lower().strip()
+    txt = txt.replace("–", "-").replace("—", "-").replace("−", "-")
+    txt = "".join(c for c in unicodedata.normalize("NFD", txt) if unicodedata.category(c) != "Mn")
+    return txt
+
+def split_tokens(s_norm: str) -> List[str]:
+    """Découpe une chaîne déjà normalisée en tokens alphanumériques."""
+    return [t for t in _TOKEN_SPLIT.split(s_norm) if t]
+
+def tokenize(s: str) -> List[str]:
+    return split_tokens(normalize(s))
+
+def card_title(card: Dict) -> str:
+    name = card.get("name") or ""
+    subtitle = card.get("subtitle") or ""
+    return f"{name} – {subtitle}" if subtitle else name
+
+def card_key(card: Dict) -> str:
+    """Identifiant stable d'une carte (le dataset n'a pas toujours de `card_id`)."""
+    for field in ("card_id", "culture_invariant_id", "card_identifier"):
+        v = card.get(field)
+        if v:
+            return str(v)
+    return f"title:{card_title(card)}"
+
+# =========================
+# Index approché (trigrammes)
+# =========================
+# Part minimale des trigrammes de la requête présents dans le titre candidat
+FUZZY_MIN_OVERLAP = 0.5
+# Score de Dice minimal d'une suggestion
+FUZZY_MIN_SCORE = 0.45
+
+def trigrams(s_norm: str) -> List[str]:
+    """Trigrammes d'une chaîne normalisée, ponctuation réduite à des espaces et bords marqués."""
+    s = "  " + " ".join(split_tokens(s_norm)) + " "
+    return list(dict.fromkeys(s[i:i + 3] for i in range(len(s) - 2)))
+
+class FuzzyIndex:
+    """
+    Suggestions « vouliez-vous dire » pour les requêtes sans résultat strict.
+
+    - `titles` : titres complets normalisés (clés de `CardIndex.by_title`)
+    - `postings` : trigramme -> numéros des titres qui le contiennent
+
+    Les candidats sont comptés en parcourant les seules listes des trigrammes
+    de la requête, puis classés par coefficient de Dice ; aucune comparaison
+    chaîne à chaîne avec l'ensemble des titres.
+    """
+
+    def __init__(self, titles: Iterable[str]):
+        self.titles: List[str] = []
+        self.sizes: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        for i, title in enumerate(titles):
+            grams = trigrams(title)
+            self.titles.append(title)
+            self.sizes.append(len(grams))
+            for g in grams:
+                self.postings.setdefault(g, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def add(self, title: str) -> None:
+        """Ajoute un titre normalisé (carte ajoutée à l'index strict), s'il n'y est pas déjà."""
+        if title in self.titles:
+            return
+        i = len(self.titles)
+        grams = trigrams(title)
+        self.titles.append(title)
+        self.sizes.append(len(grams))
+        for g in grams:
+            self.postings.setdefault(g, []).append(i)
+
+    def lookup(self, q: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Titres normalisés les plus proches de `q`, avec leur score (1 = identique), du meilleur au moins bon."""
+        grams = trigrams(normalize(q).strip())
+        if len(grams) < 3:
+            return []
+        counts = Counter()
+        for g in grams:
+            counts.update(self.postings.get(g, ()))
+        floor = FUZZY_MIN_OVERLAP * len(grams)
+        n = len(grams)
+        # À score égal, le premier titre du dataset l'emporte
+        scored = (
+            (2 * c / (n + self.sizes[i]), -i)
+            for i, c in counts.items() if c >= floor
+        )
+        return [(self.titles[-i], score) for score, i in nlargest(limit, scored) if score >= FUZZY_MIN_SCORE]
+
+# =========================
+# Index de recherche
+# =========================
+PREFIX_MIN_LEN = 3
+# Tokens de requête dont les candidats restent en mémoire (LRU) : le service
+# HTTP et la validation en direct interrogent l'index pendant toute la session
+CANDIDATES_CACHE_MAX = 4096
+
+def card_tokens(card: Dict) -> Set[str]:
+    """Tokens indexés d'une carte : titre, nom, sous-titre et mots-clés."""
+    name = card.get("name") or ""
+    subtitle = card.get("subtitle") or ""
+    token_set = set(tokenize(card_title(card)) + tokenize(name) + tokenize(subtitle))
+    for k in card.get("searchable_keywords") or []:
+        if isinstance(k, str):
+            token_set.update(tokenize(k))
+    return token_set
+
+class CardIndex:
+    """
+    Index de recherche stricte, bilingue et sans faux positifs.
+
+    - `by_title` : titre complet normalisé -> positions des cartes (correspondance exacte)
+    - `postings` : token -> positions des cartes qui le contiennent (index inversé)
+    - `sorted_tokens` : tokens triés, pour résoudre la règle de préfixe (>= 3 caractères) par bisection
+
+    Les positions renvoient à `cards`, dans l'ordre du dataset : les résultats
+    sont donc identiques à un parcours linéaire de la liste.
+    """
+
+    def __init__(self, cards: Iterable[Dict] = ()):
+        self.cards: List[Dict] = []
+        self.by_title: Dict[str, List[int]] = {}
+        self.postings: Dict[str, List[int]] = {}
+
+        for pos, c in enumerate(cards):
+            self.cards.append(c)
+            self.by_title.setdefault(normalize(card_title(c)), []).append(pos)
+            for t in card_tokens(c):
+                self.postings.setdefault(t, []).append(pos)
+
+        self.sorted_tokens: List[str] = sorted(self.postings)
+        self._candidates_cache: "OrderedDict[str, Set[int]]" = OrderedDict()
+        self._candidates_lock = threading.Lock()
+        self._fuzzy: Optional[FuzzyIndex] = None
+
+    @classmethod
+    def from_parts(
+        cls,
+        cards: List[Dict],
+        by_title: Dict[str, Sequence[int]],
+        postings: Dict[str, Sequence[int]],
+    ) -> "CardIndex":
+        """Reconstruit un index déjà calculé (snapshot), sans retokeniser les cartes."""
+        index = cls()
+        index.cards = cards
+        index.by_title = by_title
+        index.postings = postings
+        index.sorted_tokens = sorted(postings)
+        return index
+
+    @property
+    def fuzzy(self) -> FuzzyIndex:
+        """Index de trigrammes des titres, construit au premier accès (ou au chargement du dataset)."""
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyIndex(self.by_title)
+        return self._fuzzy
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    # ---- Mise à jour incrémentale ----
+    @staticmethod
+    def _writable(table: Dict[str, Sequence[int]], key: str) -> List[int]:
+        """Liste modifiable des positions de `key` (les postings d'un snapshot sont des vues en lecture seule)."""
+        lst = table.get(key)
+        if not isinstance(lst, list):
+            lst = table[key] = list(lst or ())
+        return lst
+
+    def add_card(self, pos: int, card: Dict) -> None:
+        """Indexe `card` à la position `pos` (nouvelle position en fin de liste, ou position libérée par `remove_card`)."""
+        if pos == len(self.cards):
+            self.cards.append(card)
+        else:
+            self.cards[pos] = card
+        title = normalize(card_title(card))
+        titles = self._writable(self.by_title, title)
+        if not titles and self._fuzzy is not None:
+            self._fuzzy.add(title)
+        insort(titles, pos)
+        for t in card_tokens(card):
+            lst = self._writable(self.postings, t)
+            if not lst:
+                insort(self.sorted_tokens, t)
+            insort(lst, pos)
+        self._clear_candidates()
+
+    def remove_card(self, pos: int) -> None:
+        """Retire de l'index la carte en position `pos` ; la position reste réservée."""
+        card = self.cards[pos]
+        title = normalize(card_title(card))
+        titles = self._writable(self.by_title, title)
+        titles.remove(pos)
+        if not titles:
+            del self.by_title[title]
+        for t in card_tokens(card):
+            lst = self._writable(self.postings, t)
+            lst.remove(pos)
+            if not lst:
+                del self.postings[t]
+                del self.sorted_tokens[bisect_left(self.sorted_tokens, t)]
+        self._clear_candidates()
+
+    def _clear_candidates(self) -> None:
+        with self._candidates_lock:
+            self._candidates_cache.clear()
+
+    def _candidates(self, query_tok: str) -> Set[int]:
+        """Positions des cartes dont au moins un token correspond à `query_tok` (égalité ou préfixe)."""
+        with self._candidates_lock:
+            cached = self._candidates_cache.get(query_tok)
+            if cached is not None:
+                self._candidates_cache.move_to_end(query_tok)
+                return cached
+
+        if len(query_tok) < PREFIX_MIN_LEN:
+            found = set(self.postings.get(query_tok, ()))
+        else:
+            found = set()
+            tokens = self.sorted_tokens
+            i = bisect_left(tokens, query_tok)
+            while i < len(tokens) and tokens[i].startswith(query_tok):
+                found.update(self.postings[tokens[i]])
+                i += 1
+
+        with self._candidates_lock:
+            self._candidates_cache[query_tok] = found
+            while len(self._candidates_cache) > CANDIDATES_CACHE_MAX:
+                self._candidates_cache.popitem(last=False)
+        return found
+
+    def exact(self, q_norm: str) -> List[Dict]:
+        return [self.cards[p] for p in self.by_title.get(q_norm, ())]
+
+    def search(self, q: str) -> List[Dict]:
+        return [self.cards[p] for p in self.search_positions(q)]
+
+    def search_positions(self, q: str) -> List[int]:
+        """Comme `search`, mais renvoie les positions des cartes dans `cards`."""
+        q_norm = normalize(q).strip()
+        if not q_norm:
+            return []
+
+        q_tokens = split_tokens(q_norm)
+        if not q_tokens:
+            return []
+
+        exact = self.by_title.get(q_norm)
+        if exact:
+            return list(exact)
+
+        # Intersection des listes de postings, de la plus courte à la plus longue
+        candidate_sets = sorted((self._candidates(qt) for qt in set(q_tokens)), key=len)
+        hits = set(candidate_sets[0])
+        for s in candidate_sets[1:]:
+            if not hits:
+                break
+            hits &= s
+
+        seen = set()
+        out = []
+        for pos in sorted(hits):
+            c = self.cards[pos]
+            cid = c.get("card_id") or id(c)
+            if cid not in seen:
+                out.append(pos)
+                seen.add(cid)
+        return out
+
+    def suggest(self, q: str, limit: int = 5) -> List[Tuple[Dict, float]]:
+        """
+        Cartes au titre proche de `q` (faute de frappe, mot manquant), avec leur score.
+        Rien si la recherche stricte trouve déjà `q` : ce ne sont que des suggestions.
+        """
+        if self.search_positions(q):
+            return []
+        # Un titre retiré par une mise à jour incrémentale reste dans l'index approché : ignoré ici
+        return [
+            (self.cards[self.by_title[t][0]], score)
+            for t, score in self.fuzzy.lookup(q, limit + 2) if t in self.by_title
+        ][:limit]
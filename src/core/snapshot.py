@@ -0,0 +1,265 @@
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.core.search_index import CardIndex
+
+# =========================
+# Format du snapshot
+# =========================
+# En-tête | table des cartes (enregistrements fixes) | chaînes UTF-8 | index (tokens, titres, postings)
+# L'en-tête ne décrit que le format : la correspondance avec les fichiers sources
+# est tenue par le manifeste du dataset (voir `ingest_dataset`).
+MAGIC = b"LORCYSNP"
+SNAPSHOT_VERSION = 3
+
+STR_FIELDS = (
+    "name", "subtitle", "type", "rules_text", "card_id", "card_identifier",
+    "thumbnail_url", "image_url", "searchable_keywords",
+)
+INT_FIELDS = ("strength", "willpower", "ink_cost", "quest_value", "culture_invariant_id")
+BOOL_FIELDS = ("ink_convertible",)
+FIELDS = STR_FIELDS + INT_FIELDS + BOOL_FIELDS
+
+KW_SEP = "\x1f"
+STR_NONE = 0xFFFFFFFF
+INT_NONE = -(2 ** 31)
+
+HEADER = struct.Struct("<8sIIQQQ")
+ROW = struct.Struct("<" + "II" * len(STR_FIELDS) + "i" * len(INT_FIELDS) + "B")
+ENTRY = struct.Struct("<IIII")
+
+_FIELD_SLOT = {f: i for i, f in enumerate(FIELDS)}
+
+
+# =========================
+# Lecture
+# =========================
+class SnapshotCard:
+    """
+    Carte adossée au snapshot mappé en mémoire : les champs ne sont décodés
+    qu'à l'accès. Se consulte comme le dict d'origine (`get`, `[]`, `in`).
+    Un champ absent de la source vaut `default`, comme pour un dict.
+    """
+
+    __slots__ = ("_snap", "_row", "_vals")
+
+    def __init__(self, snap: "Snapshot", row: int):
+        self._snap = snap
+        self._row = row
+        self._vals = None
+
+    def get(self, field: str, default: Any = None) -> Any:
+        slot = _FIELD_SLOT.get(field)
+        if slot is None:
+            return default
+        if self._vals is None:
+            self._vals = self._snap.read_row(self._row)
+        value = self._snap.decode(slot, self._vals)
+        return default if value is None else value
+
+    def __getitem__(self, field: str) -> Any:
+        value = self.get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field: str) -> bool:
+        return self.get(field) is not None
+
+    def keys(self) -> List[str]:
+        return [f for f in FIELDS if f in self]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f: self.get(f) for f in self.keys()}
+
+    def __repr__(self) -> str:
+        return f"SnapshotCard({self.get('name')!r}, {self.get('subtitle')!r})"
+
+
+class Snapshot:
+    """
+    Snapshot binaire du dataset, ouvert en lecture via mmap. Avec `in_memory`,
+    le fichier est lu d'un bloc : il peut alors être remplacé pendant que le
+    snapshot sert de base à une écriture incrémentale.
+    """
+
+    def __init__(self, path: Path, in_memory: bool = False):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = f.read() if in_memory else mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic, version, self.n_cards, self._rows_off, self._strings_off, self._index_off,
+        ) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError("Snapshot invalide ou d'une version antérieure.")
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+
+    # ---- Champs ----
+    def read_row(self, row: int) -> tuple:
+        return ROW.unpack_from(self._mm, self._rows_off + row * ROW.size)
+
+    def _str(self, off: int, length: int) -> Optional[str]:
+        if length == STR_NONE:
+            return None
+        start = self._strings_off + off
+        return self._mm[start:start + length].decode("utf-8")
+
+    def decode(self, slot: int, vals: tuple) -> Any:
+        n_str = len(STR_FIELDS)
+        if slot < n_str:
+            s = self._str(vals[2 * slot], vals[2 * slot + 1])
+            if s is not None and FIELDS[slot] == "searchable_keywords":
+                return s.split(KW_SEP) if s else []
+            return s
+        slot -= n_str
+        if slot < len(INT_FIELDS):
+            v = vals[2 * n_str + slot]
+            return None if v == INT_NONE else v
+        flags = vals[-1]
+        if not flags & 0b10:
+            return None
+        return bool(flags & 0b01)
+
+    # ---- Réutilisation par une écriture incrémentale ----
+    def row_bytes(self, row: int) -> bytes:
+        start = self._rows_off + row * ROW.size
+        return self._mm[start:start + ROW.size]
+
+    def strings_block(self) -> bytes:
+        """Bloc des chaînes (et son alignement) : recopié tel quel, les offsets des lignes restent valides."""
+        return self._mm[self._strings_off:self._index_off]
+
+    def index_refs(self) -> Dict[str, Tuple[int, int]]:
+        """Chaîne -> (offset, longueur) des tokens et titres déjà présents dans le bloc des chaînes."""
+        tokens, pos = self._entries(self._index_off)
+        titles, _ = self._entries(pos)
+        refs = {}
+        for entries in (tokens, titles):
+            for off, ln, _, _ in entries:
+                refs[self._str(off, ln)] = (off, ln)
+        return refs
+
+    # ---- Cartes et index ----
+    def cards(self) -> List[SnapshotCard]:
+        return [SnapshotCard(self, i) for i in range(self.n_cards)]
+
+    def _entries(self, pos: int) -> Tuple[Iterator[tuple], int]:
+        (count,) = struct.unpack_from("<I", self._mm, pos)
+        return ENTRY.iter_unpack(self._mm[pos + 4:pos + 4 + count * ENTRY.size]), pos + 4 + count * ENTRY.size
+
+    def index(self, cards: List[SnapshotCard]) -> CardIndex:
+        """Index de recherche pré-calculé ; les postings restent des vues sur le mmap."""
+        tokens, pos = self._entries(self._index_off)
+        titles, pos = self._entries(pos)
+        pos += -pos % 4
+        post = memoryview(self._mm)[pos:].cast("I")
+
+        def load(entries) -> Dict[str, memoryview]:
+            return {self._str(off, ln): post[p0:p0 + n] for off, ln, p0, n in entries}
+
+        return CardIndex.from_parts(cards, by_title=load(titles), postings=load(tokens))
+
+
+def open_snapshot(path: Path, in_memory: bool = False) -> Optional[Snapshot]:
+    """Ouvre le snapshot s'il existe et est lisible (format et version attendus), sinon None."""
+    try:
+        return Snapshot(path, in_memory=in_memory)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+# =========================
+# Écriture
+# =========================
+def write_snapshot(
+    path: Path,
+    cards: List[Dict],
+    index: CardIndex,
+    pick_image_url: Callable[[Dict], Optional[str]],
+    base: Optional[Snapshot] = None,
+) -> None:
+    """
+    Sérialise les champs utiles des cartes et l'index de recherche dans un fichier binaire.
+    `pick_image_url` fixe l'URL d'illustration retenue, stockée dans le champ `image_url`.
+
+    Avec `base` (snapshot précédent, encore ouvert), son bloc de chaînes est repris
+    en tête et les cartes qui en proviennent sont recopiées octet pour octet : seules
+    les cartes nouvelles ou modifiées sont encodées. Les chaînes des cartes remplacées
+    restent dans le bloc jusqu'à la prochaine reconstruction complète.
+    """
+    strings = bytearray(base.strings_block()) if base is not None else bytearray()
+    interned: Dict[str, Tuple[int, int]] = base.index_refs() if base is not None else {}
+
+    def ref(s: Optional[str]) -> Tuple[int, int]:
+        if s is None:
+            return 0, STR_NONE
+        found = interned.get(s)
+        if found is None:
+            data = s.encode("utf-8")
+            found = interned[s] = (len(strings), len(data))
+            strings.extend(data)
+        return found
+
+    rows = bytearray()
+    for c in cards:
+        if base is not None and isinstance(c, SnapshotCard) and c._snap is base:
+            rows.extend(base.row_bytes(c._row))
+            continue
+        fields: List[int] = []
+        for f in STR_FIELDS:
+            if f == "image_url":
+                v = pick_image_url(c)
+            elif f == "searchable_keywords":
+                kws = c.get(f)
+                v = KW_SEP.join(k for k in kws if isinstance(k, str)) if isinstance(kws, (list, tuple)) else None
+            else:
+                v = c.get(f)
+                v = None if v is None else str(v)
+            fields.extend(ref(v))
+        for f in INT_FIELDS:
+            v = c.get(f)
+            fields.append(v if isinstance(v, int) and not isinstance(v, bool) else INT_NONE)
+        inkable = c.get("ink_convertible")
+        flags = (0b10 | int(bool(inkable))) if inkable is not None else 0
+        rows.extend(ROW.pack(*fields, flags))
+
+    postings = array("I")
+
+    def entries(table: Dict[str, List[int]]) -> bytes:
+        out = bytearray(struct.pack("<I", len(table)))
+        for key in sorted(table):
+            off, ln = ref(key)
+            out.extend(ENTRY.pack(off, ln, len(postings), len(table[key])))
+            postings.extend(table[key])
+        return bytes(out)
+
+    index_bytes = entries(index.postings) + entries(index.by_title)
+
+    rows_off = HEADER.size
+    strings_off = rows_off + len(rows)
+    index_off = strings_off + len(strings)
+    index_off += -index_off % 4
+    header = HEADER.pack(
+        MAGIC, SNAPSHOT_VERSION, len(cards), rows_off, strings_off, index_off,
+    )
+
+    post_off = index_off + len(index_bytes)
+    pad = -post_off % 4
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(rows)
+        f.write(strings)
+        f.write(b"\0" * (index_off - strings_off - len(strings)))
+        f.write(index_bytes)
+        f.write(b"\0" * pad)
+        f.write(postings.tobytes())
+    os.replace(tmp, path)
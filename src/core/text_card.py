@@ -0,0 +1,216 @@
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+# =========================
+# Registre des polices
+# =========================
+def open_font(name: str, size: int) -> ImageFont.FreeTypeFont:
+    """Ouvre une police TrueType ; à défaut (hors Windows), la police par défaut de Pillow."""
+    try:
+        return ImageFont.truetype(name, size)
+    except OSError:
+        print(f"[DEBUG] Police {name} introuvable, police par défaut utilisée.")
+        return ImageFont.load_default(size)
+
+_LOCAL = threading.local()
+
+def get_font(name: str, size: int) -> ImageFont.FreeTypeFont:
+    """
+    Police chargée une seule fois par (fichier, taille) et par thread :
+    un objet FreeType ne doit pas être utilisé par deux threads à la fois.
+    """
+    fonts = getattr(_LOCAL, "fonts", None)
+    if fonts is None:
+        fonts = _LOCAL.fonts = {}
+    font = fonts.get((name, size))
+    if font is None:
+        font = fonts[(name, size)] = open_font(name, size)
+    return font
+
+# =========================
+# Mesures mémoïsées
+# =========================
+@lru_cache(maxsize=None)
+def line_height(font: ImageFont.FreeTypeFont) -> int:
+    _, y0, _, y1 = font.getbbox("Hg")
+    return y1 - y0
+
+@lru_cache(maxsize=65536)
+def word_width(font: ImageFont.FreeTypeFont, word: str) -> float:
+    return font.getlength(word)
+
+@lru_cache(maxsize=4096)
+def _bbox_size(font: ImageFont.FreeTypeFont, text: str) -> Tuple[int, int]:
+    x0, y0, x1, y1 = font.getbbox(text)
+    return (x1 - x0, y1 - y0)
+
+def text_size(draw, text, font):
+    return _bbox_size(font, text)
+
+@lru_cache(maxsize=16384)
+def word_mask(font: ImageFont.FreeTypeFont, word: str) -> Tuple[Optional[Image.Image], int, int]:
+    """Masque anti-aliasé d'un mot, rendu une seule fois, avec son décalage (x0, y0)."""
+    x0, y0, x1, y1 = font.getbbox(word)
+    if x1 <= x0 or y1 <= y0:
+        return None, 0, 0
+    mask = Image.new("L", (x1 - x0, y1 - y0), 0)
+    ImageDraw.Draw(mask).text((-x0, -y0), word, fill=255, font=font)
+    return mask, x0, y0
+
+def draw_words(img: Image.Image, xy: Tuple[int, int], text: str, font, fill="black") -> None:
+    """
+    Écrit une ligne mot par mot à partir des masques mis en cache : le texte
+    des règles réutilise sans cesse les mêmes mots, rendus une seule fois.
+    """
+    x, y = xy
+    space = word_width(font, " ")
+    for w in text.split(" "):
+        if w:
+            mask, dx, dy = word_mask(font, w)
+            if mask is not None:
+                img.paste(fill, (int(round(x)) + dx, y + dy), mask)
+            x += word_width(font, w)
+        x += space
+
+def draw_wrapped(img, text, font, x, y, max_w, line_gap=6, fill="black"):
+    """
+    Écrit `text` sur plusieurs lignes de largeur `max_w`.
+    La largeur d'une ligne est cumulée à partir des largeurs de mots mémoïsées,
+    au lieu de remesurer la ligne entière à chaque mot ajouté.
+    """
+    line_h = line_height(font)
+    space = word_width(font, " ")
+    words = text.split()
+    line = []
+    line_w = 0.0
+    cy = y
+    for w in words:
+        ww = word_width(font, w)
+        probe_w = line_w + space + ww if line else ww
+        if probe_w <= max_w:
+            line.append(w)
+            line_w = probe_w
+        else:
+            draw_words(img, (x, cy), " ".join(line), font, fill)
+            cy += line_h + line_gap
+            line = [w]
+            line_w = ww
+    if line:
+        draw_words(img, (x, cy), " ".join(line), font, fill)
+        cy += line_h + line_gap
+    return cy
+
+# =========================
+# Rendu des cartes texte
+# =========================
+# Champs de la carte lus par `TextCardRenderer.render`
+RENDERED_FIELDS = ("name", "subtitle", "type", "rules_text", "strength", "willpower", "ink_cost", "ink_convertible")
+
+def card_digest(card: Dict) -> str:
+    """Empreinte des champs rendus : une errata change la source du rendu, donc l'entrée de cache."""
+    payload = "\x1f".join(str(card.get(f) or "") for f in RENDERED_FIELDS)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+class TextCardRenderer:
+    """
+    Rendu des cartes « texte uniquement ».
+
+    Les polices et les hauteurs de ligne sont résolues une fois ; la partie
+    fixe de la carte (bordure, cadre du coût, mention encrable, séparateur)
+    est pré-rendue dans un gabarit par valeur d'`ink_convertible`, puis copiée.
+    Le texte variable est posé mot par mot depuis le cache de masques.
+    """
+
+    P = 26
+    COST_BOX = 82
+    LORE_COL_W = 56
+    BORDER = 3
+    LINE_COLOR = "#B0B8C0"
+
+    def __init__(self, width: int, height: int):
+        self.W, self.H = width, height
+        self.f_name = get_font("comicbd.ttf", 50)
+        self.f_sub = get_font("comic.ttf", 36)
+        self.f_type = get_font("comicbd.ttf", 32)
+        self.f_ability = get_font("comicbd.ttf", 44)
+        self.f_text = get_font("comic.ttf", 40)
+        self.f_stat = get_font("comicbd.ttf", 46)
+        self.f_cost = get_font("comicbd.ttf", 40)
+        self.f_tag = get_font("comic.ttf", 32)
+
+        P = self.P
+        self.cost_x, self.cost_y = P, P
+        self.title_y = self.cost_y + self.COST_BOX + 14
+        self.sub_y = self.title_y + line_height(self.f_name) - 6
+        self.sep_y = self.sub_y + line_height(self.f_sub) + 8
+        self.type_y = self.sep_y + 8
+        self.text_top = self.type_y + line_height(self.f_type) + 18
+        self.text_max_w = self.W - 2 * P - self.LORE_COL_W
+        self._templates: Dict[bool, Image.Image] = {}
+
+    @staticmethod
+    def tag_style(inkable: bool) -> Tuple[str, str]:
+        return ("#10B981", "ENCRABLE") if inkable else ("#FF0000", "NON-ENCRABLE")
+
+    def template(self, inkable: bool) -> Image.Image:
+        tpl = self._templates.get(inkable)
+        if tpl is None:
+            W, H, P = self.W, self.H, self.P
+            tag_color, tag_txt = self.tag_style(inkable)
+            tpl = Image.new("RGB", (W, H), "white")
+            d = ImageDraw.Draw(tpl)
+            d.rounded_rectangle([(5, 5), (W - 5, H - 5)], radius=22, outline=self.LINE_COLOR, width=self.BORDER)
+            cx, cy, box = self.cost_x, self.cost_y, self.COST_BOX
+            d.rounded_rectangle([cx, cy, cx + box, cy + box], radius=6, outline=tag_color, width=4)
+            d.text((cx + box + 14, cy + 8), tag_txt, fill=tag_color, font=self.f_tag)
+            d.line((P, self.sep_y, W - P, self.sep_y), fill=self.LINE_COLOR, width=2)
+            self._templates[inkable] = tpl
+        return tpl
+
+    def render(self, card: Dict) -> Image.Image:
+        W, H, P = self.W, self.H, self.P
+
+        name = card.get("name", "")
+        subtitle = card.get("subtitle", "")
+        ctype = card.get("type", "")
+        rules_raw = (card.get("rules_text") or "").strip()
+
+        ability_name, rules_text = "", rules_raw
+        if "\n" in rules_raw:
+            parts = [p.strip() for p in rules_raw.split("\n", 1)]
+            ability_name, rules_text = parts[0], parts[1]
+
+        strength = str(card.get("strength") or "")
+        willpower = str(card.get("willpower") or "")
+        ink_cost = str(card.get("ink_cost") or "?")
+        inkable = bool(card.get("ink_convertible", False))
+        tag_color, _ = self.tag_style(inkable)
+
+        img = self.template(inkable).copy()
+        d = ImageDraw.Draw(img)
+
+        box = self.COST_BOX
+        tw, th = text_size(d, ink_cost, self.f_cost)
+        d.text((self.cost_x + (box - tw)//2, self.cost_y + (box - th)//2), ink_cost, fill=tag_color, font=self.f_cost)
+
+        draw_words(img, (P, self.title_y), name, self.f_name)
+        draw_words(img, (P, self.sub_y), subtitle, self.f_sub)
+        draw_words(img, (P, self.type_y), ctype, self.f_type)
+
+        text_top = self.text_top
+        if ability_name:
+            draw_words(img, (P, text_top), ability_name, self.f_ability)
+            text_top += line_height(self.f_ability) + 8
+
+        draw_wrapped(img, rules_text, self.f_text, P, text_top, max_w=self.text_max_w, line_gap=8)
+
+        if strength or willpower:
+            stats = f"{strength}/{willpower}" if strength and willpower else (strength or willpower)
+            tw, th = text_size(d, stats, self.f_stat)
+            d.text((W - P - tw, H - P - th), stats, fill="black", font=self.f_stat)
+
+        return img
@@ -0,0 +1,66 @@
+"""
+Mise à jour du dataset persistant (snapshot et index de recherche) après une sortie.
+
+Exemples :
+    python -m src.ingest set10.json          # ajoute les cartes d'une nouvelle extension
+    python -m src.ingest                     # prend en compte un `full.json` remplacé
+    python -m src.ingest --rebuild
+
+Un fichier delta contient les cartes publiées après `full.json`, au même
+format ({"cards": {"characters": [...], ...}}, ou simplement une liste de
+cartes) ; il est copié dans `data/deltas/` puis fusionné. Seuls les
+sous-ensembles dont l'empreinte a changé sont relus, convertis et indexés :
+les cartes déjà connues gardent leur position (et leur clé stable).
+"""
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+from src.core import make_proxies as mp
+from src.core.ingest import ingest_dataset, parse_subset, read_subsets
+from src.utils.env import DELTAS_DIR
+
+
+def add_delta(path: Path) -> int:
+    """Vérifie un fichier delta puis le copie dans `DELTAS_DIR` ; renvoie son nombre de cartes."""
+    subsets = read_subsets(path.name, path.read_text(encoding="utf-8"))
+    for s in subsets:
+        parse_subset(s)
+    count = len({key for s in subsets for key in s.keys})
+    if not count:
+        raise ValueError(f"{path.name} : aucune carte trouvée")
+    DELTAS_DIR.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(path, DELTAS_DIR / path.name)
+    return count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.ingest", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("deltas", nargs="*", type=Path, help="fichiers delta (JSON) à ajouter au dataset")
+    parser.add_argument("--rebuild", action="store_true", help="reconstruire tout le snapshot")
+    args = parser.parse_args(argv)
+
+    for path in args.deltas:
+        try:
+            print(f"{path.name} : {add_delta(path)} cartes")
+        except (OSError, ValueError) as e:
+            print(f"Delta refusé : {e}", file=sys.stderr)
+            return 1
+    if args.rebuild:
+        mp.DATASET_MANIFEST_PATH.unlink(missing_ok=True)
+
+    _, _, report = ingest_dataset(
+        mp.SNAPSHOT_PATH, mp.DATASET_MANIFEST_PATH, mp.DATASET_PATH, DELTAS_DIR, mp.pick_image_url
+    )
+    print(
+        f"Dataset {report.mode}{' (' + report.reason + ')' if report.reason else ''} : {report.cards} cartes, "
+        f"{report.added} ajoutées, {report.updated} mises à jour en {report.seconds * 1000:.0f} ms"
+    )
+    for name in report.changed:
+        print(f"  sous-ensemble modifié : {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
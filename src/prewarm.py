@@ -0,0 +1,254 @@
+"""
+Préchauffage hors ligne des caches : illustrations et cartes prêtes à imprimer.
+
+Exemples :
+    python -m src.prewarm                         # toutes les cartes, modèles color et bw
+    python -m src.prewarm --set set5 set6 --lang fr
+    python -m src.prewarm --lang en --models color text
+    python -m src.prewarm --mirror http://192.168.1.20:8000 --rate 20
+
+Chaque illustration manquante est téléchargée (en parallèle, débit limité)
+dans le magasin d'images, puis ses dérivés d'impression sont rendus dans le
+cache disque. Ce qui est déjà en cache est ignoré : une exécution interrompue
+reprend là où elle s'était arrêtée. Les rendus sont limités au budget du cache
+d'impression (LORCY_PRINT_CACHE_MB, 1 Go par défaut) pour ne pas évincer ce
+qui vient d'être préparé ; un avertissement indique la taille nécessaire.
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from src.core import make_proxies as mp
+from src.core.prefetch import MAX_WORKERS, get_session
+
+MODELS = ("text", "color", "bw")
+# Taille moyenne d'un dérivé dans le cache d'impression (PNG 300 dpi, noir et blanc en niveaux de gris)
+DERIVATIVE_BYTES = {"color": 1_000_000, "bw": 350_000, "text": 90_000}
+
+
+# =========================
+# Limitation de débit
+# =========================
+class RateLimiter:
+    """Seau à jetons partagé entre threads : au plus `rate` requêtes par seconde (0 = illimité)."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate)))
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+# =========================
+# Sélection du travail
+# =========================
+def url_matches(url: Optional[str], *groups: Sequence[str]) -> bool:
+    """
+    Vrai si, pour chaque groupe de filtres non vide (extensions, langues…),
+    un segment du chemin de l'URL vaut l'une des valeurs du groupe.
+    Ex. : /images/fr/set5/140_….jpg correspond à (["set5", "set6"], ["fr"]).
+    """
+    groups = [g for g in groups if g]
+    if not groups:
+        return True
+    if not url:
+        return False
+    segments = {s.lower() for s in urlsplit(url).path.split("/") if s}
+    return all(any(v.lower() in segments for v in g) for g in groups)
+
+@dataclass
+class PrewarmJob:
+    """Une source à préparer (URL d'illustration ou identifiant de carte) et ses modèles manquants."""
+    source: str
+    is_art: bool
+    card: Dict
+    models: List[str] = field(default_factory=list)
+
+def plan_jobs(
+    cards: Sequence[Dict], models: Sequence[str], sets: Sequence[str] = (), langs: Sequence[str] = ()
+) -> Tuple[List[PrewarmJob], int, int]:
+    """Regroupe le travail par source ; renvoie (tâches, dérivés déjà en cache, leur taille en octets)."""
+    jobs: Dict[str, PrewarmJob] = {}
+    cached = cached_bytes = 0
+    for card in cards:
+        if not url_matches(mp.pick_image_url(card), sets, langs):
+            continue
+        for model in models:
+            source, is_art = mp.render_source(card, model)
+            job = jobs.get(source)
+            if job is None:
+                job = jobs[source] = PrewarmJob(source, is_art, card)
+            if model in job.models:
+                continue
+            size = mp.PRINT_CACHE.size_of(source, model)
+            if size is None:
+                job.models.append(model)
+            else:
+                cached += 1
+                cached_bytes += size
+    return pending_jobs(jobs.values()), cached, cached_bytes
+
+def pending_jobs(jobs: Iterable[PrewarmJob]) -> List[PrewarmJob]:
+    """Tâches qui ont encore un dérivé à rendre ou une illustration à télécharger."""
+    return [j for j in jobs if j.models or (j.is_art and j.source not in mp.IMAGE_STORE)]
+
+def fit_budget(jobs: List[PrewarmJob], cached_bytes: int, max_bytes: int) -> Tuple[List[PrewarmJob], int, int]:
+    """
+    Limite les rendus à ce que le cache d'impression peut garder avec les dérivés
+    déjà en cache : au-delà, chaque nouveau dérivé en évincerait un de la même
+    préparation, rendu à nouveau à la reprise suivante. Les illustrations restent
+    téléchargées. Renvoie (tâches, dérivés écartés, taille estimée du plan complet).
+    """
+    room = max_bytes - cached_bytes
+    needed = cached_bytes
+    skipped = 0
+    for job in jobs:
+        kept = []
+        for model in job.models:
+            cost = DERIVATIVE_BYTES[model]
+            needed += cost
+            if cost <= room:
+                room -= cost
+                kept.append(model)
+            else:
+                skipped += 1
+        job.models = kept
+    return pending_jobs(jobs), skipped, needed
+
+
+# =========================
+# Exécution
+# =========================
+@dataclass
+class PrewarmStats:
+    sources: int = 0
+    downloaded: int = 0
+    bytes: int = 0
+    rendered: int = 0
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+
+def mirror_url(url: str, mirror: Optional[str]) -> Optional[str]:
+    """Adresse équivalente sur le miroir (même chemin), ou None sans miroir."""
+    if not mirror:
+        return None
+    parts = urlsplit(url)
+    return mirror.rstrip("/") + parts.path + (f"?{parts.query}" if parts.query else "")
+
+def run_job(job: PrewarmJob, limiter: RateLimiter, mirror: Optional[str]) -> Tuple[int, int]:
+    """Télécharge l'illustration si besoin et rend les dérivés manquants : (octets téléchargés, rendus)."""
+    downloaded = 0
+    im = None
+    if job.is_art:
+        missing = job.source not in mp.IMAGE_STORE
+        if missing:
+            limiter.wait()
+        data = mp.fetch_image_bytes(job.source, get_session(), download_url=mirror_url(job.source, mirror))
+        downloaded = len(data) if missing else 0
+        if job.models:
+            im = mp.open_art(data)
+    for model in job.models:
+        out = mp.render_art(im, model) if job.is_art else mp.generate_text_card(job.card)
+        mp.PRINT_CACHE.put(job.source, model, out)
+    return downloaded, len(job.models)
+
+def prewarm(
+    models: Sequence[str] = ("color", "bw"),
+    sets: Sequence[str] = (),
+    langs: Sequence[str] = (),
+    workers: int = MAX_WORKERS,
+    rate: float = 10.0,
+    mirror: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> PrewarmStats:
+    cards = mp.DATASET.get().cards
+    jobs, cached, cached_bytes = plan_jobs(cards, models, sets, langs)
+    if limit is not None:
+        jobs = jobs[:limit]
+    jobs, skipped, needed = fit_budget(jobs, cached_bytes, mp.PRINT_CACHE.max_bytes)
+    if skipped:
+        print(
+            f"Attention : le cache d'impression ({mp.PRINT_CACHE.max_bytes / 1e6:.0f} Mo) ne peut pas tout garder "
+            f"(≈ {needed / 1e6:.0f} Mo nécessaires) : {skipped} dérivés ne seront pas rendus. "
+            f"Augmenter LORCY_PRINT_CACHE_MB ou restreindre --set, --lang ou --models."
+        )
+    stats = PrewarmStats(sources=len(jobs))
+    print(f"{len(jobs)} sources à préparer, {cached} dérivés déjà en cache")
+    if not jobs:
+        return stats
+
+    limiter = RateLimiter(rate)
+    t0 = time.perf_counter()
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run_job, j, limiter, mirror): j for j in jobs}
+        try:
+            for fut in as_completed(futures):
+                job = futures[fut]
+                done += 1
+                try:
+                    nbytes, rendered = fut.result()
+                    stats.downloaded += bool(nbytes)
+                    stats.bytes += nbytes
+                    stats.rendered += rendered
+                except Exception as e:
+                    stats.failed.append((job.source, str(e)))
+                if done % 50 == 0 or done == len(jobs):
+                    elapsed = time.perf_counter() - t0
+                    print(
+                        f"  {done}/{len(jobs)}  {stats.downloaded} téléchargées "
+                        f"({stats.bytes / 1e6:.1f} Mo), {stats.rendered} rendus, "
+                        f"{len(stats.failed)} échecs, {elapsed:.0f} s"
+                    )
+        except KeyboardInterrupt:
+            for f in futures:
+                f.cancel()
+            print("Interrompu : relancer la commande pour reprendre.")
+            raise
+    mp.IMAGE_STORE.flush()
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.prewarm", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--set", nargs="*", default=[], dest="sets", metavar="SET",
+                        help="extensions à préparer, d'après le chemin de l'URL (set5, promo1…)")
+    parser.add_argument("--lang", nargs="*", default=[], dest="langs", metavar="LANG",
+                        help="langues à préparer, d'après le chemin de l'URL (fr, en…)")
+    parser.add_argument("--models", nargs="*", choices=MODELS, default=["color", "bw"], help="dérivés à rendre")
+    parser.add_argument("-j", "--workers", type=int, default=MAX_WORKERS, help="téléchargements/rendus simultanés")
+    parser.add_argument("--rate", type=float, default=10.0, help="requêtes par seconde au plus (0 = illimité)")
+    parser.add_argument("--mirror", help="télécharger depuis ce serveur (même chemin) plutôt que l'API")
+    parser.add_argument("--limit", type=int, help="nombre maximal de sources traitées")
+    args = parser.parse_args(argv)
+
+    stats = prewarm(args.models, args.sets, args.langs, args.workers, args.rate, args.mirror, args.limit)
+    print(
+        f"Terminé : {stats.downloaded} illustrations ({stats.bytes / 1e6:.1f} Mo), "
+        f"{stats.rendered} cartes rendues, {len(stats.failed)} échecs."
+    )
+    for source, err in stats.failed[:20]:
+        print(f"  échec {source} : {err}")
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,211 @@
+"""
+Service HTTP local de génération de proxys, avec moteur gardé en mémoire.
+
+Usage : python -m src.server [--host 127.0.0.1] [--port 8787] [--workers 2] [--queue 8]
+
+    POST /generate   {"decklist": "4 Stitch\\n...", "model": "color", "name": "Aggro"}
+                     -> application/pdf (503 + Retry-After si la file est pleine)
+    GET  /health     -> état du service (JSON)
+
+Le dataset, l'index, les polices et les caches de rendu sont partagés par
+toutes les requêtes : seule la première génération paie le démarrage à froid.
+"""
+import argparse
+import json
+import re
+import shutil
+import tempfile
+import threading
+import unicodedata
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from src.core.make_proxies import DATASET, DeckStats, generate_from_text
+from src.core.render_cache import RENDER_CACHE
+
+MODELS = ("text", "color", "bw")
+MAX_BODY = 1024 * 1024
+CHUNK = 64 * 1024
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+class ProxyService:
+    """
+    Moteur de génération partagé : au plus `workers` générations simultanées,
+    au plus `max_queue` requêtes en attente ; au-delà, refus immédiat.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 8):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._running = threading.BoundedSemaphore(workers)
+        self._admitted = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.served = 0
+
+    def warm_up(self) -> None:
+        DATASET.get()
+
+    def generate(self, decklist: str, name: str, model: str, out_dir: Path) -> Path:
+        if not self._admitted.acquire(blocking=False):
+            raise ServiceBusy()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            with self._running:
+                # Sortie dans un dossier temporaire supprimé après la réponse : rien à réutiliser
+                pdf = generate_from_text(
+                    decklist, name, model=model, output_dir=out_dir, stats=DeckStats(), remember_build=False
+                )
+            with self._lock:
+                self.served += 1
+            return pdf
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._admitted.release()
+
+    def health(self) -> dict:
+        state = DATASET.state
+        return {
+            "dataset_loaded": state is not None,
+            "cards": len(state.cards) if state else 0,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "served": self.served,
+            "rendered_in_memory": len(RENDER_CACHE),
+        }
+
+
+def safe_deck_name(name: Optional[str]) -> str:
+    name = re.sub(r"[^\w\- ]+", "_", (name or "").strip())[:80].strip()
+    return name or "proxies"
+
+def content_disposition(name: str) -> str:
+    """
+    En-tête de téléchargement : les en-têtes HTTP sont envoyés en Latin-1, donc
+    `filename` est replié en ASCII, et le nom exact passe par `filename*` (RFC 5987).
+    """
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    folded = re.sub(r"[^\w\- ]+", "_", folded).strip() or "proxies"
+    return f"attachment; filename=\"{folded}.pdf\"; filename*=UTF-8''{quote(name + '.pdf', safe='')}"
+
+
+def make_handler(service: ProxyService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _json(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._json(200, service.health())
+            else:
+                self._json(404, {"error": "introuvable"})
+
+        def do_POST(self):
+            if self.path != "/generate":
+                self._json(404, {"error": "introuvable"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0 or length > MAX_BODY:
+                self._json(413 if length > MAX_BODY else 400, {"error": "corps de requête invalide"})
+                return
+            try:
+                req = json.loads(self.rfile.read(length).decode("utf-8"))
+                decklist = req["decklist"]
+                model = req.get("model", "text")
+                if not isinstance(decklist, str) or model not in MODELS:
+                    raise ValueError
+                if not isinstance(req.get("name") or "", str):
+                    raise ValueError
+            except (ValueError, KeyError, TypeError):
+                self._json(400, {"error": "attendu : {\"decklist\": str, \"model\": text|color|bw, \"name\": str}"})
+                return
+
+            name = safe_deck_name(req.get("name"))
+            out_dir = Path(tempfile.mkdtemp(prefix="lorcy_srv_"))
+            try:
+                try:
+                    pdf = service.generate(decklist, name, model, out_dir)
+                except ServiceBusy:
+                    self._json(503, {"error": "service occupé, réessayer"}, {"Retry-After": "2"})
+                    return
+                except ValueError as e:
+                    self._json(422, {"error": str(e)})
+                    return
+                except Exception as e:
+                    self._json(500, {"error": str(e)})
+                    return
+
+                # En-têtes calculés avant la ligne de statut : une erreur ici donne encore une réponse 500
+                try:
+                    headers = {
+                        "Content-Type": "application/pdf",
+                        "Content-Length": str(pdf.stat().st_size),
+                        "Content-Disposition": content_disposition(name),
+                    }
+                except OSError as e:
+                    self._json(500, {"error": str(e)})
+                    return
+                self.send_response(200)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                with open(pdf, "rb") as f:
+                    while chunk := f.read(CHUNK):
+                        self.wfile.write(chunk)
+            finally:
+                shutil.rmtree(out_dir, ignore_errors=True)
+
+        def log_message(self, fmt, *args):
+            print(f"[DEBUG] HTTP {self.address_string()} {fmt % args}")
+
+    return Handler
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8787, workers: int = 2, max_queue: int = 8) -> ThreadingHTTPServer:
+    service = ProxyService(workers, max_queue)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.server", description="Service local de génération de proxys.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--workers", type=int, default=2, help="générations simultanées")
+    parser.add_argument("--queue", type=int, default=8, help="requêtes en attente avant refus (503)")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, max(1, args.workers), max(0, args.queue))
+    server.service.warm_up()
+    print(f"Lorcy : service prêt sur http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,15 @@
 import os
+import queue
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from pathlib import Path
 from datetime import datetime
-from PIL import Image, ImageTk
 
-from src.core.make_proxies import generate_from_text, load_dataset
+# Le générateur (Pillow, index, caches) n'est importé qu'en tâche de fond :
+# la fenêtre s'affiche sans l'attendre.
+from src.core.instrument import STAGE_LABELS
+from src.ui.validation import LiveValidator
 from src.core.config import (
     APP_TITLE,
     APP_VERSION,
@@ -20,6 +23,13 @@ from src.core.config import (
     ICONS_DIR,
 )
 
+# Période de relève des planches d'aperçu prêtes
+PREVIEW_POLL_MS = 30
+
+# Délai sans frappe avant de valider la decklist, et période de relève des résultats
+VALIDATE_DELAY_MS = 150
+VALIDATE_POLL_MS = 16
+
 
 # ==========================================================
 # BOUTON
@@ -47,9 +57,10 @@ class RoundedButton(tk.Canvas):
         self.font = font
         self.text = text
         self.id_text = None
+        self.enabled = True
         self.bind("<Button-1>", self._on_click)
-        self.bind("<Enter>", lambda e: self.itemconfig("rect", fill=self._brighten(bg)))
-        self.bind("<Leave>", lambda e: self.itemconfig("rect", fill=bg))
+        self.bind("<Enter>", lambda e: self.enabled and self.itemconfig("rect", fill=self._brighten(bg)))
+        self.bind("<Leave>", lambda e: self.enabled and self.itemconfig("rect", fill=bg))
         self._draw_button()
 
     def _draw_button(self):
@@ -76,8 +87,14 @@ class RoundedButton(tk.Canvas):
         b = min(b + 20, 255)
         return f"#{r:02x}{g:02x}{b:02x}"
 
+    def set_enabled(self, enabled, text=None):
+        self.enabled = enabled
+        self.itemconfig("rect", fill=self.bg if enabled else "#9CA3AF")
+        if text is not None:
+            self.itemconfig(self.id_text, text=text)
+
     def _on_click(self, event):
-        if self.command:
+        if self.command and self.enabled:
             self.command()
 
 
@@ -99,8 +116,18 @@ class LorcanaApp(tk.Tk):
         except Exception:
             pass
 
+        self.validator = LiveValidator()
+        self._validate_job = None
+        self._collect_job = None
+        self._core_ready = False
         self._create_widgets()
 
+        # Import du générateur puis chargement du dataset et de l'index sur un thread dédié ;
+        # la boucle Tk vérifie périodiquement s'ils sont prêts.
+        self._core_result = None
+        threading.Thread(target=self._load_core, name="core-loader", daemon=True).start()
+        self.after(100, self._poll_core)
+
     # ======================================================
     # CRÉATION DES WIDGETS
     # ======================================================
@@ -158,7 +185,7 @@ class LorcanaApp(tk.Tk):
         text_frame.pack(pady=(8, 15))
         self.text = tk.Text(
             text_frame,
-            height=18,
+            height=17,
             width=78,
             wrap="word",
             font=("Consolas", 10, "italic"),
@@ -183,9 +210,23 @@ class LorcanaApp(tk.Tk):
         self.text.bind("<Control-v>", self._paste_clipboard)
         self.text.bind("<Command-v>", self._paste_clipboard)
 
+        # Validation pendant la saisie : lignes introuvables surlignées,
+        # carte retenue (ou suggestions) de la ligne du curseur affichée dessous
+        self.text.tag_configure("unresolved", background="#FEE2E2", foreground="#B91C1C")
+        self.text.tag_configure("resolved", foreground="#047857")
+        self.text.bind("<<Modified>>", self._on_text_modified)
+        self.text.bind("<KeyRelease>", self._show_line_status)
+        self.text.bind("<ButtonRelease-1>", self._show_line_status)
+        self.validation_label = tk.Label(
+            text_frame, text="", anchor="w", bg=BG_COLOR, fg="#6B7280", font=("Segoe UI", 9)
+        )
+        self.validation_label.pack(fill="x", pady=(4, 0))
+
         # Barre de progression
         self.progress = ttk.Progressbar(self, orient="horizontal", length=400, mode="determinate")
         self.progress.pack_forget()
+        self.stage_label = tk.Label(self, text="", bg=BG_COLOR, fg="#9CA3AF", font=("Segoe UI", 9))
+        self._stage_event = None
 
         # Boutons
         btn_frame = tk.Frame(self, bg=BG_COLOR)
@@ -194,27 +235,120 @@ class LorcanaApp(tk.Tk):
             btn_frame, text="Générer le PDF", bg=BUTTON_GREEN, fg="white", command=self.start_generation
         )
         self.generate_btn.grid(row=0, column=0, padx=20)
+        self.generate_btn.set_enabled(False, text="Chargement…")
+        self.preview_btn = RoundedButton(
+            btn_frame, text="Aperçu", bg=PRIMARY_COLOR, fg="white", command=self.start_preview
+        )
+        self.preview_btn.grid(row=0, column=1, padx=20)
+        self.preview_btn.set_enabled(False)
         self.reset_btn = RoundedButton(
             btn_frame, text="Vider le formulaire", bg=BUTTON_RED, fg="white", command=self.reset_fields
         )
-        self.reset_btn.grid(row=0, column=1, padx=20)
-
-        # Footer
-        cards = load_dataset()
-        today = datetime.now().strftime("%d %B %Y").capitalize()
-        footer_text = (
-            f"{APP_TITLE} {APP_VERSION}  •  {APP_AUTHOR}  "
-            f"–  🧩 {len(cards):,} cartes chargées  •  {today}"
-        ).replace(",", " ")
+        self.reset_btn.grid(row=0, column=2, padx=20)
 
-        footer = tk.Label(
+        # Footer (nombre de cartes renseigné à la fin du chargement)
+        self.footer = tk.Label(
             self,
-            text=footer_text,
+            text=self._footer_text("⏳ chargement des cartes…"),
             bg=BG_COLOR,
             fg="#9CA3AF",
             font=("Segoe UI", 9, "italic"),
         )
-        footer.pack(side="bottom", pady=10)
+        self.footer.pack(side="bottom", pady=10)
+
+    def _footer_text(self, status):
+        today = datetime.now().strftime("%d %B %Y").capitalize()
+        return f"{APP_TITLE} {APP_VERSION}  •  {APP_AUTHOR}  –  {status}  •  {today}"
+
+    # ======================================================
+    # CHARGEMENT EN TÂCHE DE FOND
+    # ======================================================
+    def _load_core(self):
+        """Thread de chargement : aucun appel Tk ici, le résultat est relevé par `_poll_core`."""
+        try:
+            from src.core.make_proxies import DATASET
+
+            self._core_result = (len(DATASET.get().cards), None)
+        except Exception as e:
+            self._core_result = (0, e)
+
+    def _poll_core(self):
+        if self._core_result is None:
+            self.after(100, self._poll_core)
+            return
+        count, err = self._core_result
+        if err is None:
+            self.footer.config(text=self._footer_text(f"🧩 {count:,} cartes chargées".replace(",", " ")))
+        else:
+            self.footer.config(text=self._footer_text(f"⚠ dataset indisponible : {err}"))
+        # En cas d'erreur, la génération réessaie le chargement et affiche l'erreur
+        self.generate_btn.set_enabled(True, text="Générer le PDF")
+        self.preview_btn.set_enabled(True)
+        self._core_ready = err is None
+        self._validate()
+
+    # ======================================================
+    # VALIDATION PENDANT LA SAISIE
+    # ======================================================
+    def _on_text_modified(self, event=None):
+        if not self.text.edit_modified():
+            return
+        self.text.edit_modified(False)
+        if self._validate_job is not None:
+            self.after_cancel(self._validate_job)
+        self._validate_job = self.after(VALIDATE_DELAY_MS, self._validate)
+
+    def _validate(self):
+        """Envoie les lignes nouvelles ou modifiées au thread de résolution (jamais résolues ici)."""
+        self._validate_job = None
+        if not self._core_ready:
+            return
+        self.validator.update("" if self.placeholder_active else self.text.get("1.0", "end-1c"))
+        self._apply_validation()
+        if self.validator.pending and self._collect_job is None:
+            self._collect_job = self.after(VALIDATE_POLL_MS, self._collect_validation)
+
+    def _collect_validation(self):
+        self._collect_job = None
+        if self.validator.collect():
+            self._apply_validation()
+        if self.validator.pending:
+            self._collect_job = self.after(VALIDATE_POLL_MS, self._collect_validation)
+
+    def _apply_validation(self):
+        self.text.tag_remove("unresolved", "1.0", "end")
+        self.text.tag_remove("resolved", "1.0", "end")
+        for line in self.validator.lines:
+            res = self.validator.result(line)
+            if res is not None and not res.error:
+                tag = "resolved" if res.title else "unresolved"
+                self.text.tag_add(tag, f"{line.number}.0", f"{line.number}.end")
+        self._show_line_status()
+
+    def _show_line_status(self, event=None):
+        lines = self.validator.lines
+        results = [self.validator.result(l) for l in lines]
+        found = sum(1 for r in results if r is not None and r.title)
+        missing = sum(1 for r in results if r is not None and not r.title and not r.error)
+        failed = sum(1 for r in results if r is not None and r.error)
+        if not lines:
+            self.validation_label.config(text="")
+            return
+        text = f"✔ {found} ligne(s) reconnue(s)  •  ✖ {missing} introuvable(s)"
+        if failed:
+            text += f"  •  ⚠ {failed} non vérifiée(s)"
+        if None in results:
+            text += "  •  vérification…"
+        line = self.validator.line(int(self.text.index("insert").split(".")[0]))
+        res = self.validator.result(line) if line else None
+        if res is not None and res.title:
+            text += f"   |   ligne {line.number} → {res.title}"
+        elif res is not None and res.error:
+            text += f"   |   ligne {line.number} : vérification impossible ({res.error})"
+        elif res is not None:
+            hint = " ; ".join(res.suggestions)
+            text += f"   |   ligne {line.number} : " + (f"vouliez-vous dire {hint} ?" if hint else "aucune carte")
+        self.validation_label.config(text=text)
 
     # ======================================================
     # PLACEHOLDER MANAGEMENT
@@ -242,38 +376,86 @@ class LorcanaApp(tk.Tk):
         self.placeholder_active = True
         self.deckname_entry.delete(0, "end")
         self.progress.pack_forget()
+        self.stage_label.pack_forget()
         self.progress["value"] = 0
         self.deckname_entry.focus_set()
 
     # ======================================================
     # GÉNÉRATION PDF
     # ======================================================
-    def start_generation(self):
+    def _read_form(self):
+        """(decklist, nom du deck, modèle) saisis, ou None si la decklist est vide."""
         deck_text = self.text.get("1.0", "end").strip()
         if self.placeholder_active or not deck_text:
             messagebox.showwarning("Erreur", "Veuillez coller votre decklist.")
+            return None
+        return deck_text, self.deckname_entry.get().strip() or "proxies", self.model_choice.get()
+
+    def start_generation(self):
+        form = self._read_form()
+        if form is not None:
+            self.launch_generation(*form)
+
+    def launch_generation(self, deck_text, deck_name, model):
+        if not self.generate_btn.enabled:
             return
-        deck_name = self.deckname_entry.get().strip() or "proxies"
-        model = self.model_choice.get()
-        self.progress.pack(pady=(10, 20))
+        self.progress.pack(pady=(10, 0))
+        self.stage_label.config(text="")
+        self.stage_label.pack(pady=(2, 12))
         self.progress["value"] = 0
-        self.generate_btn.itemconfig(self.generate_btn.id_text, text="Génération…")
+        self.generate_btn.set_enabled(False, text="Génération…")
         threading.Thread(target=self.run_generation, args=(deck_text, deck_name, model), daemon=True).start()
 
     def run_generation(self, deck_text, deck_name, model):
         try:
-            pdf_path = generate_from_text(deck_text, deck_name, model=model, progress_callback=self.update_progress)
-            self.after(0, lambda: os.startfile(Path(pdf_path).parent))
+            from src.core.make_proxies import generate_from_text
+
+            pdf_path = generate_from_text(
+                deck_text,
+                deck_name,
+                model=model,
+                progress_callback=self.update_progress,
+                on_event=self.update_stage,
+            )
+            if hasattr(os, "startfile"):
+                self.after(0, lambda: os.startfile(Path(pdf_path).parent))
         except Exception as e:
             err_msg = str(e)
             self.after(0, lambda msg=err_msg: messagebox.showerror("Erreur", msg))
         finally:
-            self.after(0, lambda: self.generate_btn.itemconfig(self.generate_btn.id_text, text="Générer le PDF"))
+            self.after(0, lambda: self.generate_btn.set_enabled(True, text="Générer le PDF"))
             self.after(0, lambda: self.progress.pack_forget())
+            self.after(0, lambda: self.stage_label.pack_forget())
             self.after(0, lambda: self.progress.config(value=0))
 
+    # Appelés depuis le thread de génération : l'affichage passe par la boucle Tk
     def update_progress(self, ratio):
-        self.progress["value"] = ratio * 100
+        self.after(0, lambda: self.progress.config(value=ratio * 100))
+
+    def update_stage(self, event):
+        pending = self._stage_event is not None
+        self._stage_event = event
+        if not pending:
+            self.after(50, self._show_stage)
+
+    def _show_stage(self):
+        ev, self._stage_event = self._stage_event, None
+        if ev is None:
+            return
+        text = STAGE_LABELS.get(ev.stage, ev.stage)
+        if ev.total:
+            text += f" – {ev.done}/{ev.total}"
+        if ev.hits:
+            text += f" ({ev.hits} en cache)"
+        self.stage_label.config(text=text)
+
+    # ======================================================
+    # APERÇU
+    # ======================================================
+    def start_preview(self):
+        form = self._read_form()
+        if form is not None:
+            PreviewWindow(self, *form)
 
     # ======================================================
     # COLLER (CTRL+V)
@@ -284,6 +466,107 @@ class LorcanaApp(tk.Tk):
             if self.placeholder_active:
                 self._clear_placeholder(None)
             self.text.insert("insert", clip)
+            # Pas de délai après un collage : validation immédiate
+            if self._validate_job is not None:
+                self.after_cancel(self._validate_job)
+            self.text.edit_modified(False)
+            self._validate()
         except tk.TclError:
             pass
         return "break"
+
+
+# ==========================================================
+# FENÊTRE D'APERÇU
+# ==========================================================
+class PreviewWindow(tk.Toplevel):
+    """
+    Planches basse résolution du deck, affichées au fur et à mesure de leur calcul
+    (thread dédié, relevées par la boucle Tk). « Générer le PDF » lance ensuite le
+    rendu complet avec la decklist, le nom et le modèle de l'aperçu.
+    """
+
+    COLUMNS = 3
+    PAD = 12
+
+    def __init__(self, app, deck_text, deck_name, model):
+        super().__init__(app)
+        self.app = app
+        self.form = (deck_text, deck_name, model)
+        self.title(f"Aperçu – {deck_name}")
+        self.geometry("840x720")
+        self.configure(bg=BG_COLOR)
+
+        self.status = tk.Label(self, text="Préparation de l’aperçu…", bg=BG_COLOR, fg=TEXT_COLOR, font=("Segoe UI", 10))
+        self.status.pack(pady=(10, 4))
+
+        btn_frame = tk.Frame(self, bg=BG_COLOR)
+        btn_frame.pack(side="bottom", pady=10)
+        RoundedButton(btn_frame, text="Générer le PDF", bg=BUTTON_GREEN, fg="white", command=self._confirm).grid(
+            row=0, column=0, padx=20
+        )
+        RoundedButton(btn_frame, text="Fermer", bg=BUTTON_RED, fg="white", command=self.close).grid(row=0, column=1, padx=20)
+
+        body = tk.Frame(self, bg=BG_COLOR)
+        body.pack(fill="both", expand=True, padx=10)
+        self.canvas = tk.Canvas(body, bg=BG_COLOR, highlightthickness=0)
+        scroll = ttk.Scrollbar(body, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=scroll.set)
+        scroll.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.photos = []
+        self._pages = queue.Queue()
+        self._cancel = threading.Event()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        threading.Thread(target=self._run, args=(deck_text, model), name="preview", daemon=True).start()
+        self.after(PREVIEW_POLL_MS, self._poll)
+
+    def _run(self, deck_text, model):
+        """Thread d'aperçu : aucun appel Tk, les planches passent par la file."""
+        try:
+            from src.core.preview import preview_deck
+
+            deck = preview_deck(deck_text, model, lambda n, total, page: self._pages.put((n, total, page)), self._cancel)
+            self._pages.put(("done", deck, None))
+        except Exception as e:
+            self._pages.put(("error", e, None))
+
+    def _poll(self):
+        if self._cancel.is_set():
+            return
+        from PIL import ImageTk
+
+        while True:
+            try:
+                n, total, page = self._pages.get_nowait()
+            except queue.Empty:
+                break
+            if n == "error":
+                self.status.config(text=f"Aperçu impossible : {total}")
+                return
+            if n == "done":
+                missing = len(total.unresolved)
+                text = f"{len(total.cards)} cartes sur {len(self.photos)} planche(s)"
+                if missing:
+                    text += f"  •  {missing} ligne(s) introuvable(s)"
+                self.status.config(text=text)
+                return
+            photo = ImageTk.PhotoImage(page)
+            self.photos.append(photo)
+            row, col = divmod(n - 1, self.COLUMNS)
+            w, h = page.size
+            self.canvas.create_image(
+                self.PAD + col * (w + self.PAD), self.PAD + row * (h + self.PAD), image=photo, anchor="nw"
+            )
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+            self.status.config(text=f"Planche {n}/{total}…")
+        self.after(PREVIEW_POLL_MS, self._poll)
+
+    def _confirm(self):
+        self.close()
+        self.app.launch_generation(*self.form)
+
+    def close(self):
+        self._cancel.set()
+        self.destroy()
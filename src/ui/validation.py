@@ -0,0 +1,109 @@
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from src.core.decklist import DeckLine, dataset_version, parse_decklist, resolve_query, suggestions_for
+from src.core.search_index import card_title
+
+# =========================
+# Validation de la decklist pendant la saisie
+# =========================
+# Au-delà, la mémoire des requêtes déjà résolues est vidée (saisies intermédiaires)
+MEMO_MAX_ENTRIES = 5000
+
+@dataclass
+class LineResult:
+    """
+    Résolution d'une requête : titre de la carte trouvée, ou None et les suggestions ;
+    `error` si la recherche a échoué (la ligne est redemandée à la saisie suivante).
+    """
+    title: Optional[str]
+    suggestions: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+class LiveValidator:
+    """
+    Résout les lignes d'une decklist en tâche de fond, sans aucun appel Tk.
+
+    - `update(texte)` (thread Tk) découpe le texte et n'envoie au thread de
+      résolution que les requêtes jamais vues : une ligne modifiée est la seule
+      à être recherchée à nouveau
+    - `collect()` (thread Tk) récupère les résultats arrivés ; vrai s'il y en a
+    - `result(ligne)` renvoie le résultat connu d'une ligne, ou None s'il est en cours
+
+    Les recherches passent par l'index et le cache de requêtes du générateur.
+    """
+
+    def __init__(self):
+        self.lines: List[DeckLine] = []
+        self._memo: Dict[str, LineResult] = {}
+        self._version: Optional[str] = None
+        self._requests: "queue.Queue[Dict[str, DeckLine]]" = queue.Queue()
+        self._results: "queue.Queue[Tuple[str, List[str], Dict[str, LineResult]]]" = queue.Queue()
+        self._asked: set = set()
+        self.pending = 0
+        threading.Thread(target=self._run, name="deck-validator", daemon=True).start()
+
+    # ---- Thread Tk ----
+    def update(self, deck_text: str) -> None:
+        self.lines = parse_decklist(deck_text)
+        self._request_missing()
+
+    def _request_missing(self) -> None:
+        todo = {
+            l.query: l for l in self.lines
+            if (l.query not in self._memo or self._memo[l.query].error) and l.query not in self._asked
+        }
+        if todo:
+            self._asked.update(todo)
+            self.pending += 1
+            self._requests.put(todo)
+
+    def collect(self) -> bool:
+        got = False
+        while True:
+            try:
+                version, asked, results = self._results.get_nowait()
+            except queue.Empty:
+                return got
+            self.pending -= 1
+            got = True
+            self._asked.difference_update(asked)
+            if version != self._version or len(self._memo) > MEMO_MAX_ENTRIES:
+                # Dataset rechargé (ou mémoire pleine) : les lignes affichées sont redemandées
+                self._version = version
+                self._memo = {}
+                self._memo.update(results)
+                self._request_missing()
+            else:
+                self._memo.update(results)
+
+    def result(self, line: DeckLine) -> Optional[LineResult]:
+        return self._memo.get(line.query)
+
+    def line(self, number: int) -> Optional[DeckLine]:
+        return next((l for l in self.lines if l.number == number), None)
+
+    # ---- Thread de résolution ----
+    def _run(self) -> None:
+        from src.core.make_proxies import DATASET, DECK_QUERIES
+
+        while True:
+            todo = self._requests.get()
+            try:
+                state = DATASET.get()
+                version = dataset_version(state)
+                DECK_QUERIES.bind(version)
+                out = {}
+                for query, line in todo.items():
+                    card, _ = resolve_query(line, state, DECK_QUERIES)
+                    out[query] = (
+                        LineResult(card_title(card)) if card is not None
+                        else LineResult(None, suggestions_for(line, state))
+                    )
+            except Exception as e:
+                # Chaque ligne demandée reçoit un état final, plutôt que de rester « en cours »
+                print(f"[DEBUG] Validation de la decklist impossible : {e}")
+                version, out = self._version, {query: LineResult(None, error=str(e)) for query in todo}
+            self._results.put((version, list(todo), out))
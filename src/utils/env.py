@@ -1,4 +1,6 @@
+import os
 import sys
+import tempfile
 from pathlib import Path
 
 def get_base_dir() -> Path:
@@ -8,11 +10,37 @@ def get_base_dir() -> Path:
     else:
         return Path(__file__).resolve().parent.parent
 
+def get_cache_dir() -> Path:
+    """
+    Dossier de cache unique de l'application (dataset, images, rendus).
+    LORCY_CACHE_DIR le remplace ; en version PyInstaller, il est dans le dossier
+    temporaire du système (le dossier d'extraction est supprimé à la fermeture).
+    """
+    override = os.environ.get("LORCY_CACHE_DIR")
+    if override:
+        return Path(override)
+    if getattr(sys, "frozen", False):
+        return Path(tempfile.gettempdir()) / "Lorcy" / "cache_lorcana"
+    return BASE_DIR / "cache_lorcana"
+
+def get_legacy_cache_dir() -> Path:
+    """
+    Ancien cache des illustrations (fichiers nommés d'après l'URL), repris dans
+    le magasin d'images : dossier temporaire du système en version PyInstaller,
+    `src/core/cache_lorcana` sinon.
+    """
+    if getattr(sys, "frozen", False):
+        return Path(tempfile.gettempdir()) / "Lorcy" / "cache_lorcana"
+    return BASE_DIR / "core" / "cache_lorcana"
+
 BASE_DIR = get_base_dir()
 DATA_DIR = BASE_DIR / "data"
-CACHE_DIR = BASE_DIR / "cache_lorcana"
+CACHE_DIR = get_cache_dir()
+LEGACY_CACHE_DIR = get_legacy_cache_dir()
 
 DATASET_PATH = DATA_DIR / "full.json"
+# Cartes publiées après `full.json` (une extension par fichier), fusionnées au dataset
+DELTAS_DIR = DATA_DIR / "deltas"
 OUTPUT_DIR = Path.home() / "Downloads"
 
 def ensure_dirs():
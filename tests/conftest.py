@@ -0,0 +1,132 @@
+"""
+Fixtures communes. Le cache de l'application est redirigé vers un dossier
+temporaire avant tout import de `src` (les chemins sont fixés à l'import).
+"""
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+from PIL import Image
+
+_CACHE = tempfile.mkdtemp(prefix="lorcy_tests_")
+os.environ["LORCY_CACHE_DIR"] = _CACHE
+os.environ["NO_PROXY"] = os.environ["no_proxy"] = "127.0.0.1,localhost"
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_CACHE, ignore_errors=True)
+
+
+def jpeg_bytes(size: Tuple[int, int] = (734, 1024), color: str = "orange") -> bytes:
+    b = io.BytesIO()
+    Image.new("RGB", size, color).save(b, "JPEG", quality=85)
+    return b.getvalue()
+
+
+def raw_card(n: int, name: str, subtitle: str = "", **extra) -> Dict:
+    """Carte brute au format de `full.json` (avec une variante d'illustration sans nom)."""
+    card = {
+        "culture_invariant_id": n,
+        "name": name,
+        "subtitle": subtitle,
+        "type": "Personnage",
+        "rules_text": f"Règle {n}",
+        "ink_cost": n % 9 + 1,
+        "strength": n % 5,
+        "willpower": None,
+        "ink_convertible": n % 2 == 0,
+        "searchable_keywords": ["Héros", f"mot{n}"],
+        "thumbnail_url": f"https://img.test/thumb/{n}.jpg",
+        "variants": [{"detail_image_url": f"https://img.test/art/{n}.jpg"}],
+    }
+    card.update(extra)
+    return card
+
+
+class ArtServer:
+    """
+    Serveur d'illustrations local. Par défaut, tout chemin renvoie un JPEG
+    avec un ETag ; `script[chemin]` impose une suite de réponses
+    (statut, corps, en-têtes) consommées dans l'ordre. `delay` ralentit
+    chaque réponse ; `peak` garde le nombre maximal de requêtes simultanées.
+    """
+
+    def __init__(self):
+        self.body = jpeg_bytes()
+        self.etag = '"art-v1"'
+        self.script: Dict[str, List[Tuple[int, bytes, Dict[str, str]]]] = {}
+        self.requests: List[Tuple[str, Optional[str]]] = []
+        self.delay = 0.0
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append((self.path, self.headers.get("If-None-Match")))
+                    scripted = server.script.get(self.path)
+                    reply = scripted.pop(0) if scripted else None
+                    server.active += 1
+                    server.peak = max(server.peak, server.active)
+                try:
+                    time.sleep(server.delay)
+                    self._reply(reply)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+            def _reply(self, reply):
+                if reply is None:
+                    if self.headers.get("If-None-Match") == server.etag:
+                        reply = (304, b"", {"ETag": server.etag})
+                    else:
+                        reply = (200, server.body, {"ETag": server.etag, "Content-Type": "image/jpeg"})
+                status, body, headers = reply
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def hits(self, path: str) -> int:
+        return sum(1 for p, _ in self.requests if p == path)
+
+
+@pytest.fixture
+def art_server():
+    server = ArtServer()
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def image_store(tmp_path, monkeypatch):
+    """Magasin d'images et ancien cache vides, propres au test."""
+    from src.core import make_proxies as mp
+    from src.core.image_store import ImageStore
+
+    store = ImageStore(tmp_path / "images")
+    monkeypatch.setattr(mp, "IMAGE_STORE", store)
+    monkeypatch.setattr(mp, "LEGACY_CACHE_DIR", tmp_path / "legacy")
+    yield store
+    store.close()
@@ -0,0 +1,21 @@
+import json
+
+import pytest
+
+from src import cli
+
+
+@pytest.mark.parametrize("entries, message", [
+    ([{"name": "X"}], "entrée 1 : champ 'file' manquant"),
+    ([{"file": "a.txt"}, "b.txt"], "entrée 2 : objet attendu"),
+    ([{"file": "a.txt", "name": 3}], "entrée 1 : champ 'name' invalide"),
+    ([{"file": "a.txt", "model": "sepia"}], "entrée 1 : modèle inconnu"),
+    ({"file": "a.txt"}, "liste d'entrées"),
+    ([{"file": "a.txt", "name": "Aggro"}, {"file": "b.txt", "name": "aggro"}], "même nom de sortie : Aggro"),
+])
+def test_invalid_manifest_exits_with_a_message(tmp_path, capsys, entries, message):
+    manifest = tmp_path / "decks.json"
+    manifest.write_text(json.dumps(entries), encoding="utf-8")
+
+    assert cli.main([str(manifest)]) == 1
+    assert message in capsys.readouterr().err
@@ -0,0 +1,100 @@
+import pytest
+from pypdf import PdfReader
+
+from src.core import make_proxies as mp
+from src.core.card_record import make_record
+from src.core.dataset import DatasetState
+from src.core.deck_builds import manifest_path, page_hashes
+from src.core.decklist import QueryCache
+from src.core.search_index import CardIndex, card_key
+from tests.conftest import raw_card
+
+# Dix cartes : deux planches (9 + 1)
+DECK = "".join(f"1 Carte {n}\n" for n in range(1, 11))
+
+
+@pytest.fixture
+def deck_env(tmp_path, image_store, art_server, monkeypatch):
+    """Dataset synthétique réglable (`overrides[n]` : champs modifiés), illustrations locales."""
+    overrides = {}
+    arts = {}
+
+    def state():
+        raws = [raw_card(n, f"Carte {n}", **overrides.get(n, {})) for n in range(1, 11)]
+        cards = [make_record(r, mp.pick_image_url) for r in raws]
+        return DatasetState(cards, CardIndex(cards), (1, 1))
+
+    monkeypatch.setattr(mp.DATASET, "get", state)
+    monkeypatch.setattr(mp, "DECK_QUERIES", QueryCache(None))
+    monkeypatch.setattr(mp, "BUILDS_DIR", tmp_path / "builds")
+    monkeypatch.setattr(
+        mp, "pick_image_url", lambda card: f"{art_server.url}/art/{card_key(card)}{arts.get(card_key(card), '')}.jpg"
+    )
+    return overrides, arts, tmp_path / "out"
+
+
+def generate(out_dir, model="text", **kwargs):
+    stats = mp.DeckStats()
+    pdf = mp.generate_from_text(DECK, "Deck", model=model, output_dir=out_dir, stats=stats, **kwargs)
+    return pdf, stats
+
+
+def image_streams(pdf):
+    return [
+        sorted(x._data for x in (page["/Resources"]["/XObject"][n] for n in page["/Resources"]["/XObject"]))
+        for page in PdfReader(pdf, strict=True).pages
+    ]
+
+
+def test_unchanged_deck_reuses_every_page(deck_env):
+    _, _, out = deck_env
+    pdf, first = generate(out)
+    before = image_streams(pdf)
+    assert first.reused == 0 and first.rendered + first.disk_hits + first.memory_hits == 10
+
+    pdf, again = generate(out)
+    assert (again.reused, again.pages_reused, again.unique) == (10, 2, 0)
+    assert image_streams(pdf) == before
+
+
+def test_errata_invalidates_only_its_page(deck_env):
+    overrides, _, out = deck_env
+    generate(out)
+
+    overrides[10] = {"rules_text": "Règle corrigée"}
+    _, stats = generate(out)
+    assert (stats.reused, stats.pages_reused, stats.unique) == (9, 1, 1)
+
+
+def test_new_art_invalidates_only_its_page(deck_env, art_server):
+    _, arts, out = deck_env
+    generate(out, model="color")
+    assert len(art_server.requests) == 10
+
+    arts["2"] = "-v2"
+    _, stats = generate(out, model="color")
+    assert (stats.reused, stats.pages_reused, stats.images) == (9, 1, 1)
+    assert art_server.requests[10:] == [("/art/2-v2.jpg", None)]
+
+
+def test_page_hashes_are_stable():
+    keys = [f"text|card:{n}:abc" for n in range(10)]
+    assert page_hashes(keys, 9, "text", "p") == page_hashes(list(keys), 9, "text", "p")
+    assert len(page_hashes(keys, 9, "text", "p")) == 2
+    assert page_hashes(keys, 9, "text", "p")[0] != page_hashes(keys, 9, "bw", "p")[0]
+    assert page_hashes(keys[1:] + keys[:1], 9, "text", "p")[0] != page_hashes(keys, 9, "text", "p")[0]
+
+
+def test_throwaway_build_leaves_the_manifest_alone(deck_env):
+    _, _, out = deck_env
+    pdf, _ = generate(out)
+    manifest = manifest_path(mp.BUILDS_DIR, pdf)
+    saved = manifest.read_bytes(), manifest.stat().st_mtime_ns
+
+    _, stats = generate(out, remember_build=False)
+    assert stats.reused == 0
+    assert (manifest.read_bytes(), manifest.stat().st_mtime_ns) == saved
+
+    _, elsewhere = generate(out.parent / "jetable", remember_build=False)
+    assert elsewhere.reused == 0
+    assert sorted(p.name for p in mp.BUILDS_DIR.iterdir()) == [manifest.name]
@@ -0,0 +1,48 @@
+from src.core.card_record import make_record
+from src.core.dataset import DatasetState
+from src.core.decklist import QueryCache, resolve_deck
+from src.core.make_proxies import pick_image_url
+from src.core.search_index import CardIndex, card_key
+from tests.conftest import raw_card
+
+DECK = "2 Elsa\n1 Mickey Mouse\n3 elsa\n1 Carte Inconnue\n"
+
+
+def make_state(version=(100, 1), order=(1, 2, 3)):
+    titles = {1: ("Elsa", "Reine des Neiges"), 2: ("Mickey Mouse", "Vrai Ami"), 3: ("Stitch", "Rock Star")}
+    cards = [make_record(raw_card(n, *titles[n]), pick_image_url) for n in order]
+    return DatasetState(cards, CardIndex(cards), version)
+
+
+def keys(deck):
+    return [card_key(c) for c in deck.cards]
+
+
+def test_query_cache_survives_a_restart(tmp_path):
+    path = tmp_path / "deck_queries.json"
+    first = resolve_deck(DECK, make_state(), QueryCache(path))
+    assert (first.queries, first.cache_hits) == (3, 0)
+    assert path.exists()
+
+    again = resolve_deck(DECK, make_state(), QueryCache(path))
+    assert (again.queries, again.cache_hits) == (3, 3)
+    assert keys(again) == keys(first) == ["1", "1", "2", "1", "1", "1"]
+    assert [l.name for l in again.unresolved] == ["Carte Inconnue"]
+
+
+def test_dataset_change_invalidates_the_cache(tmp_path):
+    path = tmp_path / "deck_queries.json"
+    resolve_deck(DECK, make_state(), QueryCache(path))
+
+    changed = resolve_deck(DECK, make_state(version=(100, 2)), QueryCache(path))
+    assert changed.cache_hits == 0
+
+
+def test_stale_entry_is_recomputed(tmp_path):
+    path = tmp_path / "deck_queries.json"
+    resolve_deck("1 Mickey Mouse", make_state(), QueryCache(path))
+
+    # Même version annoncée, mais cartes réordonnées : la clé revérifiée ne correspond plus
+    moved = resolve_deck("1 Mickey Mouse", make_state(order=(3, 1, 2)), QueryCache(path))
+    assert moved.cache_hits == 0
+    assert keys(moved) == ["2"]
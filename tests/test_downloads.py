@@ -0,0 +1,98 @@
+import pytest
+
+from src.core import make_proxies as mp
+from src.core.image_store import IncompleteDownload
+from src.core.prefetch import prefetch_images
+from tests.conftest import jpeg_bytes
+
+
+def test_prefetch_downloads_each_url_once_in_parallel(art_server, image_store):
+    art_server.delay = 0.05
+    urls = [f"{art_server.url}/art/{i}.jpg" for i in range(8)]
+    results = list(prefetch_images(urls + urls[:3] + [None], mp.fetch_image, max_workers=4))
+
+    assert sorted(r.url for r in results) == sorted(urls)
+    assert all(r.error is None for r in results)
+    assert all(r.image.mode == "RGB" for r in results)
+    assert all(art_server.hits(f"/art/{i}.jpg") == 1 for i in range(8))
+    assert 1 < art_server.peak <= 4
+
+
+def test_cached_art_is_not_downloaded_again(art_server, image_store):
+    url = f"{art_server.url}/art/a.jpg"
+    first = mp.fetch_image(url)
+    second = mp.fetch_image(url)
+
+    assert art_server.hits("/art/a.jpg") == 1
+    assert not first.info["cached"] and second.info["cached"]
+    assert image_store.get(url) == art_server.body
+
+
+def test_truncated_download_is_rejected_then_retried(art_server, image_store):
+    url = f"{art_server.url}/art/t.jpg"
+    art_server.script["/art/t.jpg"] = [(200, art_server.body[: len(art_server.body) // 2], {})]
+
+    with pytest.raises(IncompleteDownload):
+        mp.fetch_image_bytes(url)
+    assert url not in image_store
+
+    assert mp.fetch_image_bytes(url) == art_server.body
+    assert art_server.hits("/art/t.jpg") == 2
+    assert url in image_store
+
+
+def test_http_error_is_reported_per_url(art_server, image_store):
+    art_server.script["/art/missing.jpg"] = [(404, b"", {})]
+    urls = [f"{art_server.url}/art/missing.jpg", f"{art_server.url}/art/ok.jpg"]
+    results = {r.url: r for r in prefetch_images(urls, mp.fetch_image)}
+
+    assert results[urls[0]].error is not None and results[urls[0]].image is None
+    assert results[urls[1]].error is None
+    assert urls[0] not in image_store
+
+
+def test_revalidation_uses_etag(art_server, image_store):
+    url = f"{art_server.url}/art/e.jpg"
+    mp.fetch_image_bytes(url)
+    assert image_store.etag(url) == art_server.etag
+
+    assert mp.fetch_image_bytes(url, revalidate=True) == art_server.body
+    assert art_server.requests[-1] == ("/art/e.jpg", art_server.etag)
+
+    art_server.body, art_server.etag = jpeg_bytes(color="blue"), '"art-v2"'
+    assert mp.fetch_image_bytes(url, revalidate=True) == art_server.body
+    assert image_store.etag(url) == '"art-v2"'
+
+
+def test_truncated_legacy_file_is_dropped_and_downloaded(art_server, image_store):
+    url = f"{art_server.url}/art/legacy.jpg"
+    legacy = mp.legacy_image_path(url)
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(art_server.body[:1000])
+
+    assert mp.fetch_image_bytes(url) == art_server.body
+    assert not legacy.exists()
+    assert art_server.hits("/art/legacy.jpg") == 1
+
+
+def test_legacy_file_is_moved_into_the_store(art_server, image_store):
+    url = f"{art_server.url}/art/old.jpg"
+    legacy = mp.legacy_image_path(url)
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(art_server.body)
+
+    assert mp.fetch_image_bytes(url) == art_server.body
+    assert image_store.get(url) == art_server.body
+    assert not legacy.exists()
+    assert art_server.hits("/art/old.jpg") == 0
+
+
+def test_palette_art_is_decoded_at_print_size():
+    import io
+    from PIL import Image
+
+    b = io.BytesIO()
+    Image.new("RGB", (3000, 4000), "red").quantize(16).save(b, "PNG")
+    im = mp.open_art(b.getvalue())
+    assert im.mode == "RGB"
+    assert im.width >= mp.CARD_W_PX * 0.98 and im.height >= mp.CARD_H_PX * 0.98
@@ -0,0 +1,165 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from src.core.card_record import make_record
+from src.core.ingest import ingest_dataset
+from src.core.make_proxies import pick_image_url
+from src.core.search_index import CardIndex, card_key
+from src.core.snapshot import FIELDS
+from tests.conftest import raw_card
+
+QUERIES = ["elsa", "glacée", "mickey", "héros", "mot3", "mot7", "lanterne", "stitch rock", "inconnu"]
+
+
+def write_json(path, obj):
+    """Écrit un fichier source en garantissant un mtime nouveau (la détection s'appuie dessus)."""
+    old = path.stat().st_mtime_ns if path.exists() else 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(obj, ensure_ascii=False), encoding="utf-8")
+    if path.stat().st_mtime_ns <= old:
+        os.utime(path, ns=(old + 1_000_000, old + 1_000_000))
+
+
+def load(root):
+    return ingest_dataset(
+        root / "cards.snapshot", root / "manifest.json", root / "full.json", root / "deltas", pick_image_url
+    )
+
+
+def rebuild(root, tmp_path):
+    """Reconstruction complète des mêmes sources, dans un dossier vierge."""
+    fresh = tmp_path / "fresh"
+    shutil.rmtree(fresh, ignore_errors=True)
+    fresh.mkdir()
+    shutil.copy(root / "full.json", fresh / "full.json")
+    if (root / "deltas").is_dir():
+        shutil.copytree(root / "deltas", fresh / "deltas")
+    cards, index, report = load(fresh)
+    assert report.mode == "complet"
+    return cards, index
+
+
+def plain(value):
+    return list(value) if isinstance(value, (list, tuple)) else value
+
+
+def assert_same(loaded, expected):
+    cards, index = loaded
+    ref_cards, ref_index = expected
+    assert [card_key(c) for c in cards] == [card_key(c) for c in ref_cards]
+    for card, ref in zip(cards, ref_cards):
+        assert {f: plain(card.get(f)) for f in FIELDS} == {f: plain(ref.get(f)) for f in FIELDS}
+    for q in QUERIES:
+        assert [card_key(c) for c in index.search(q)] == [card_key(c) for c in ref_index.search(q)], q
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "data"
+    write_json(root / "full.json", {"cards": {
+        "characters": [
+            raw_card(1, "Elsa", "Reine des Neiges"),
+            raw_card(2, "Elsa", "Esprit de l'Hiver"),
+            raw_card(3, "Mickey Mouse", "Vrai Ami"),
+        ],
+        "items": [raw_card(4, "Lanterne", type="Objet")],
+    }})
+    report = load(root)[2]
+    assert (report.mode, report.cards) == ("complet", 4)
+    return root
+
+
+def test_unchanged_sources_reuse_snapshot(root):
+    cards, _, report = load(root)
+    assert report.mode == "snapshot"
+    assert [card_key(c) for c in cards] == ["1", "2", "3", "4"]
+
+
+def test_delta_file_is_appended_incrementally(root, tmp_path):
+    write_json(root / "deltas" / "001.json", [raw_card(5, "Stitch", "Rock Star"), raw_card(7, "Elsa", "Glacée")])
+    cards, index, report = load(root)
+
+    assert report.mode == "incrémental"
+    assert report.changed == ["deltas/001.json:cards"]
+    assert (report.added, report.updated) == (2, 0)
+    assert_same((cards, index), rebuild(root, tmp_path))
+    assert load(root)[2].mode == "snapshot"
+
+
+def test_changed_card_is_updated_in_place(root, tmp_path):
+    full = json.loads((root / "full.json").read_text(encoding="utf-8"))
+    full["cards"]["characters"][1]["subtitle"] = "Glacée"
+    full["cards"]["characters"][1]["ink_cost"] = 9
+    write_json(root / "full.json", full)
+    cards, index, report = load(root)
+
+    assert report.mode == "incrémental"
+    assert report.changed == ["full.json:characters"]
+    assert (report.added, report.updated) == (0, 1)
+    assert cards[1].get("subtitle") == "Glacée" and cards[1].get("ink_cost") == 9
+    assert [card_key(c) for c in index.search("glacée")] == ["2"]
+    assert [card_key(c) for c in index.search("esprit hiver")] == []
+    assert_same((cards, index), rebuild(root, tmp_path))
+
+
+def test_removed_card_falls_back_to_full_rebuild(root, tmp_path):
+    full = json.loads((root / "full.json").read_text(encoding="utf-8"))
+    del full["cards"]["characters"][0]
+    write_json(root / "full.json", full)
+    cards, index, report = load(root)
+
+    assert report.mode == "complet"
+    assert report.reason == "cartes retirées des sources"
+    assert [card_key(c) for c in cards] == ["2", "3", "4"]
+    assert_same((cards, index), rebuild(root, tmp_path))
+
+
+@pytest.mark.parametrize("edit", ["insert", "reorder"])
+def test_card_inserted_mid_sources_falls_back_to_full_rebuild(root, tmp_path, edit):
+    full = json.loads((root / "full.json").read_text(encoding="utf-8"))
+    characters = full["cards"]["characters"]
+    if edit == "insert":
+        characters.append(raw_card(9, "Lampe Magique", searchable_keywords=["Héros"]))
+    else:
+        characters.reverse()
+    write_json(root / "full.json", full)
+    cards, index, report = load(root)
+
+    assert report.mode == "complet"
+    assert report.reason == "cartes insérées ou réordonnées dans les sources"
+    assert_same((cards, index), rebuild(root, tmp_path))
+    if edit == "insert":
+        assert [card_key(c) for c in cards] == ["1", "2", "3", "9", "4"]
+        assert [card_key(c) for c in index.search("héros")] == ["1", "2", "3", "9", "4"]
+
+
+def test_card_appended_to_last_subset_stays_incremental(root, tmp_path):
+    full = json.loads((root / "full.json").read_text(encoding="utf-8"))
+    full["cards"]["items"].append(raw_card(9, "Lampe Magique"))
+    write_json(root / "full.json", full)
+    cards, index, report = load(root)
+
+    assert (report.mode, report.added) == ("incrémental", 1)
+    assert_same((cards, index), rebuild(root, tmp_path))
+
+
+def test_index_updates_match_a_fresh_index():
+    raws = [raw_card(n, name, sub) for n, name, sub in [
+        (1, "Elsa", "Reine des Neiges"), (2, "Mickey Mouse", "Vrai Ami"), (3, "Stitch", "Rock Star"),
+    ]]
+    cards = [make_record(r, pick_image_url) for r in raws]
+    index = CardIndex(cards)
+
+    glacee = make_record(raw_card(1, "Elsa", "Glacée"), pick_image_url)
+    index.remove_card(0)
+    index.add_card(0, glacee)
+    index.add_card(3, make_record(raw_card(7, "Elsa", "Esprit de l'Hiver"), pick_image_url))
+    cards = [glacee] + cards[1:] + [make_record(raw_card(7, "Elsa", "Esprit de l'Hiver"), pick_image_url)]
+    fresh = CardIndex(cards)
+
+    for q in QUERIES + ["reine", "esprit", "elsa glacee"]:
+        assert index.search_positions(q) == fresh.search_positions(q), q
+    assert len(index) == len(fresh)
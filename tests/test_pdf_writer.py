@@ -0,0 +1,101 @@
+import re
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader
+
+from src.core.pdf_writer import PdfStreamWriter
+
+DPI = 300
+PAGE = (2480, 3508)
+
+
+def write_deck(path, cards, per_page=3, encoding="flate"):
+    """Planches de `per_page` cartes ; une carte (clé, image) n'est écrite qu'une fois."""
+    with PdfStreamWriter(path, resolution=DPI, title="Deck é") as pdf:
+        for start in range(0, len(cards), per_page):
+            placements = []
+            for n, (key, im) in enumerate(cards[start:start + per_page]):
+                ref = pdf.add_image(im, key=key, encoding=encoding)
+                placements.append((ref, 100 + n * 800, 200, im.width, im.height))
+            pdf.add_page(*PAGE, placements)
+    return pdf
+
+
+def page_images(page):
+    xobjects = page["/Resources"]["/XObject"]
+    return {name: xobjects[name] for name in xobjects}
+
+
+@pytest.fixture
+def cards():
+    red = Image.new("RGB", (40, 56), (200, 10, 10))
+    gray = Image.linear_gradient("L").resize((40, 56))
+    return [("red", red), ("gray", gray), ("red", red), ("red", red), ("gray", gray)]
+
+
+def test_round_trip_with_strict_reader(tmp_path, cards):
+    path = tmp_path / "deck.pdf"
+    write_deck(path, cards)
+    reader = PdfReader(path, strict=True)
+
+    assert len(reader.pages) == 2
+    assert reader.metadata.title == "Deck é"
+    for page in reader.pages:
+        assert [round(float(v), 2) for v in page.mediabox] == [0, 0, 595.2, 841.92]
+    first = page_images(reader.pages[0])
+    assert len(first) == 2
+    assert reader.pages[0].get_contents().get_data().count(b" Do") == 3
+    decoded = {name: x.decode_as_image() for name, x in first.items()}
+    assert {im.mode for im in decoded.values()} == {"RGB", "L"}
+    assert any(im.tobytes() == cards[1][1].tobytes() for im in decoded.values())
+
+
+def test_each_key_is_embedded_once(tmp_path, cards):
+    path = tmp_path / "deck.pdf"
+    write_deck(path, cards)
+    reader = PdfReader(path, strict=True)
+
+    refs = {x.indirect_reference.idnum for page in reader.pages for x in page_images(page).values()}
+    assert len(refs) == 2
+    assert path.read_bytes().count(b"/Subtype /Image") == 2
+
+
+def test_xref_offsets_point_at_their_objects(tmp_path, cards):
+    path = tmp_path / "deck.pdf"
+    write_deck(path, cards, encoding="jpeg")
+    data = path.read_bytes()
+    xref_at = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    assert data[xref_at:].startswith(b"xref\n")
+    count = int(re.match(rb"xref\n0 (\d+)\n", data[xref_at:]).group(1))
+    entries = re.findall(rb"(\d{10}) 00000 n \n", data[xref_at:])
+    assert len(entries) == count - 1
+    for oid, offset in enumerate(entries, 1):
+        assert data[int(offset):].startswith(b"%d 0 obj\n" % oid)
+
+
+def test_failed_write_leaves_no_file(tmp_path, cards):
+    path = tmp_path / "deck.pdf"
+    with pytest.raises(RuntimeError):
+        with PdfStreamWriter(path, resolution=DPI) as pdf:
+            pdf.add_image(cards[0][1], key="red")
+            raise RuntimeError("échec du rendu")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_encoded_images_are_copied_verbatim(tmp_path, cards):
+    first = tmp_path / "first.pdf"
+    writer = write_deck(first, cards, encoding="jpeg")
+    raw = first.read_bytes()
+
+    second = tmp_path / "second.pdf"
+    with PdfStreamWriter(second, resolution=DPI) as pdf:
+        placements = []
+        for key, (offset, length, width, height, colorspace, filter_name) in writer.image_locations.items():
+            ref = pdf.add_encoded_image(width, height, colorspace, filter_name, raw[offset:offset + length], key=key)
+            placements.append((ref, 0, 0, width, height))
+        pdf.add_page(*PAGE, placements)
+
+    old = {x.decode_as_image().mode: x._data for x in page_images(PdfReader(first, strict=True).pages[0]).values()}
+    new = {x.decode_as_image().mode: x._data for x in page_images(PdfReader(second, strict=True).pages[0]).values()}
+    assert new == old
@@ -0,0 +1,27 @@
+from src.core import make_proxies as mp
+from src.core.preview import PreviewLayout, card_thumbnail
+from tests.conftest import jpeg_bytes, raw_card
+
+
+def test_thumbnail_reads_legacy_art_without_importing_it(image_store):
+    card = raw_card(1, "Elsa")
+    url = mp.pick_image_url(card)
+    legacy = mp.legacy_image_path(url)
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(jpeg_bytes(color="blue"))
+    size = PreviewLayout().card_size
+
+    im = card_thumbnail(card, "color", size)
+    assert im.size == size
+    r, g, b = im.getpixel((size[0] // 2, size[1] // 2))
+    assert b > 200 and r < 50
+    assert url not in image_store and len(image_store) == 0
+    assert legacy.exists()
+
+
+def test_thumbnail_without_cached_art_is_a_placeholder(image_store):
+    size = PreviewLayout().card_size
+    im = card_thumbnail(raw_card(2, "Mickey Mouse"), "bw", size)
+    assert im.size == size
+    assert im.getpixel((size[0] // 2, size[1] - 3)) == (0xE5, 0xE7, 0xEB)
+    assert len(image_store) == 0
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src import prewarm as pw
+from src.core import make_proxies as mp
+from src.core.bitmap_cache import BitmapCache
+from tests.conftest import raw_card
+
+CARDS = [raw_card(n, f"Carte {n}") for n in range(1, 4)]
+
+
+@pytest.fixture
+def print_cache(tmp_path, image_store, monkeypatch):
+    """Jeu de trois cartes, magasin d'images et cache d'impression vides."""
+    cache = BitmapCache(tmp_path / "print", mp.PRINT_CACHE.params)
+    monkeypatch.setattr(mp, "PRINT_CACHE", cache)
+    monkeypatch.setattr(mp.DATASET, "get", lambda: SimpleNamespace(cards=CARDS))
+    return cache
+
+
+def run(art_server, **kwargs):
+    return pw.prewarm(("color", "bw"), workers=2, rate=0, mirror=art_server.url, **kwargs)
+
+
+def test_downloads_from_mirror_and_renders_each_model(art_server, print_cache, image_store):
+    stats = run(art_server)
+
+    assert (stats.sources, stats.downloaded, stats.rendered, stats.failed) == (3, 3, 6, [])
+    assert stats.bytes == 3 * len(art_server.body)
+    for card in CARDS:
+        url = mp.pick_image_url(card)
+        assert image_store.get(url) == art_server.body
+        assert art_server.hits(f"/art/{card['culture_invariant_id']}.jpg") == 1
+        assert print_cache.get(url, "color").mode == "RGB"
+        assert print_cache.get(url, "bw").mode == "L"
+
+
+def test_second_run_resumes_with_nothing_to_do(art_server, print_cache):
+    run(art_server, limit=2)
+    assert len(art_server.requests) == 2
+
+    stats = run(art_server)
+    assert (stats.sources, stats.downloaded, stats.rendered) == (1, 1, 2)
+    assert run(art_server).sources == 0
+    assert len(art_server.requests) == 3
+
+
+def test_renders_stop_at_print_cache_budget(art_server, print_cache, capsys):
+    print_cache.max_bytes = pw.DERIVATIVE_BYTES["color"] + pw.DERIVATIVE_BYTES["bw"]
+    stats = run(art_server)
+
+    assert (stats.downloaded, stats.rendered) == (3, 2)
+    assert "4 dérivés ne seront pas rendus" in capsys.readouterr().out
+    assert len(list(print_cache.root.glob("*.png"))) == 2
+
+
+def test_fit_budget_counts_cached_derivatives(image_store):
+    jobs = [pw.PrewarmJob(f"u{n}", True, {}, ["color", "bw"]) for n in range(2)]
+    kept, skipped, needed = pw.fit_budget(jobs, cached_bytes=500_000, max_bytes=1_900_000)
+
+    # La seconde illustration est quand même téléchargée, sans dérivé
+    assert [(j.source, j.models) for j in kept] == [("u0", ["color", "bw"]), ("u1", [])]
+    assert skipped == 2
+    assert needed == 500_000 + 2 * (pw.DERIVATIVE_BYTES["color"] + pw.DERIVATIVE_BYTES["bw"])
+
+
+def test_failed_download_is_reported_and_retried_next_run(art_server, print_cache, image_store):
+    art_server.script["/art/2.jpg"] = [(404, b"", {})]
+    stats = run(art_server)
+
+    assert [source for source, _ in stats.failed] == [mp.pick_image_url(CARDS[1])]
+    assert (stats.downloaded, stats.rendered) == (2, 4)
+    assert mp.pick_image_url(CARDS[1]) not in image_store
+
+    again = run(art_server)
+    assert (again.sources, again.downloaded, again.rendered, again.failed) == (1, 1, 2, [])
@@ -0,0 +1,34 @@
+from src.core import search_index as si
+from src.core.card_record import make_record
+from src.core.make_proxies import pick_image_url
+from src.core.search_index import CardIndex, card_key
+from tests.conftest import raw_card
+
+
+def make_index(*cards):
+    return CardIndex([make_record(raw_card(n, name, sub), pick_image_url) for n, name, sub in cards])
+
+
+def test_candidates_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(si, "CANDIDATES_CACHE_MAX", 3)
+    index = make_index((1, "Elsa", "Reine des Neiges"), (2, "Mickey Mouse", "Vrai Ami"))
+    for q in ["elsa", "reine", "mickey", "vrai", "inconnu", "elsa"]:
+        index.search(q)
+
+    assert list(index._candidates_cache) == ["vrai", "inconnu", "elsa"]
+    assert [card_key(c) for c in index.search("reine")] == ["1"]
+
+
+def test_suggest_fixes_a_typo_but_not_a_resolved_query():
+    index = make_index(
+        (1, "Elsa", "Reine des Neiges"), (2, "Mickey Mouse", "Vrai Ami"),
+        (3, "Minnie Mouse", "Vraie Amie"), (4, "Stitch", "Rock Star"),
+    )
+    assert index.search("Mickez Mouse") == []
+    best, score = index.suggest("Mickez Mouse")[0]
+    assert card_key(best) == "2" and score >= si.FUZZY_MIN_SCORE
+    assert card_key(index.suggest("Mickey Mouse – Vrai Amk")[0][0]) == "2"
+
+    for resolved in ["Mickey Mouse", "Stitch - Rock Star", "elsa"]:
+        assert index.search(resolved)
+        assert index.suggest(resolved) == []
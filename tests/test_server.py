@@ -0,0 +1,109 @@
+import io
+import threading
+
+import pytest
+import requests
+from pypdf import PdfReader
+
+from src import server as srv
+from src.core import make_proxies as mp
+from src.core.search_index import card_key
+
+DECK = "2 Elsa\n1 Mickey Mouse\n"
+
+
+@pytest.fixture
+def service_url():
+    httpd = srv.make_server("127.0.0.1", 0, workers=1, max_queue=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}", httpd.service
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def art_from(art_server, image_store, monkeypatch):
+    """Illustrations des cartes servies par le serveur local."""
+    monkeypatch.setattr(mp, "pick_image_url", lambda card: f"{art_server.url}/art/{card_key(card)}.jpg")
+    return art_server
+
+
+def post(url, payload):
+    return requests.post(f"{url}/generate", json=payload, timeout=60)
+
+
+def test_generates_a_text_pdf_and_reports_health(service_url):
+    url, service = service_url
+    r = post(url, {"decklist": DECK, "name": "Aggro/1", "model": "text"})
+
+    assert r.status_code == 200
+    assert r.headers["Content-Type"] == "application/pdf"
+    assert 'filename="Aggro_1.pdf"' in r.headers["Content-Disposition"]
+    assert len(PdfReader(io.BytesIO(r.content), strict=True).pages) == 1
+
+    health = requests.get(f"{url}/health", timeout=10).json()
+    assert health["dataset_loaded"] and health["cards"] > 0
+    assert health["served"] == 1 and health["in_flight"] == 0
+    assert service.served == 1
+
+
+def test_non_latin1_deck_name_is_sent_as_rfc5987(service_url):
+    url, _ = service_url
+    r = post(url, {"decklist": DECK, "name": "Cœur de Glace ş"})
+
+    assert r.status_code == 200
+    assert PdfReader(io.BytesIO(r.content), strict=True).pages
+    disposition = r.headers["Content-Disposition"]
+    assert 'filename="Cur de Glace s.pdf"' in disposition
+    assert "filename*=UTF-8''C%C5%93ur%20de%20Glace%20%C5%9F.pdf" in disposition
+
+
+def test_color_deck_downloads_art_once_from_local_server(service_url, art_from, tmp_path, monkeypatch):
+    monkeypatch.setattr(mp, "BUILDS_DIR", tmp_path / "builds")
+    url, _ = service_url
+    for _ in range(2):
+        r = post(url, {"decklist": DECK, "model": "color"})
+        assert r.status_code == 200
+        reader = PdfReader(io.BytesIO(r.content), strict=True)
+        xobjects = reader.pages[0]["/Resources"]["/XObject"]
+        assert {xobjects[n]["/Filter"] for n in xobjects} == {"/DCTDecode"}
+
+    art_paths = {p for p, _ in art_from.requests}
+    assert len(art_paths) == 2
+    assert all(art_from.hits(p) == 1 for p in art_paths)
+    assert not (tmp_path / "builds").exists()
+
+
+@pytest.mark.parametrize("payload, status", [
+    ({"model": "text"}, 400),
+    ({"decklist": DECK, "model": "sepia"}, 400),
+    ({"decklist": DECK, "name": 3}, 400),
+    (["decklist"], 400),
+    ({"decklist": "3 Carte Qui N'Existe Pas"}, 422),
+])
+def test_rejects_bad_requests(service_url, payload, status):
+    url, _ = service_url
+    assert post(url, payload).status_code == status
+    assert requests.get(f"{url}/ailleurs", timeout=10).status_code == 404
+
+
+def test_busy_service_answers_503(service_url, monkeypatch):
+    url, _ = service_url
+    started, release = threading.Event(), threading.Event()
+
+    def slow_generate(*args, **kwargs):
+        started.set()
+        release.wait(10)
+        raise ValueError("interrompu")
+
+    monkeypatch.setattr(srv, "generate_from_text", slow_generate)
+    first = threading.Thread(target=post, args=(url, {"decklist": DECK}))
+    first.start()
+    assert started.wait(10)
+
+    r = post(url, {"decklist": DECK})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "2"
+    release.set()
+    first.join(10)
@@ -0,0 +1,117 @@
+import json
+import os
+
+import pytest
+
+from src.core import snapshot as snap_mod
+from src.core.card_record import make_record
+from src.core.ingest import ingest_dataset
+from src.core.make_proxies import pick_image_url
+from src.core.search_index import CardIndex, card_key
+from src.core.snapshot import FIELDS, Snapshot, open_snapshot, write_snapshot
+from tests.conftest import raw_card
+
+QUERIES = ["elsa", "reine des neiges", "mickey", "héros", "mot3", "stitch rock", "inconnu"]
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    raws = [
+        raw_card(1, "Elsa", "Reine des Neiges"),
+        raw_card(2, "Elsa", "Esprit de l'Hiver"),
+        raw_card(3, "Mickey Mouse", "Vrai Ami", willpower=5),
+        raw_card(4, "Stitch", "Rock Star", searchable_keywords=None, ink_convertible=None),
+        raw_card(5, "Éclair d'été", "", type="Action", strength=None),
+    ]
+    path = tmp_path / "full.json"
+    path.write_text(json.dumps({"cards": {"characters": raws}}), encoding="utf-8")
+    cards = [make_record(r, pick_image_url) for r in raws]
+    return path, cards
+
+
+def plain(value):
+    """Mots-clés en liste (snapshot) ou en tuple (`CardRecord`) : même contenu."""
+    return list(value) if isinstance(value, (list, tuple)) else value
+
+
+def build(tmp_path, dataset):
+    _, cards = dataset
+    index = CardIndex(cards)
+    out = tmp_path / "cards.snapshot"
+    write_snapshot(out, cards, index, pick_image_url)
+    return out, cards, index
+
+
+def test_round_trip_fields_and_search(tmp_path, dataset):
+    out, cards, index = build(tmp_path, dataset)
+    snap = open_snapshot(out)
+    assert snap is not None
+    loaded = snap.cards()
+    assert len(loaded) == len(cards)
+    for rec, card in zip(cards, loaded):
+        for f in FIELDS:
+            assert plain(card.get(f)) == plain(rec.get(f)), f
+    assert loaded[0].get("image_url") == "https://img.test/art/1.jpg"
+    assert list(loaded[0].get("searchable_keywords")) == ["Héros", "mot1"]
+    assert loaded[3].get("ink_convertible") is None and loaded[1].get("ink_convertible") is True
+
+    loaded_index = snap.index(loaded)
+    for q in QUERIES:
+        assert [card_key(c) for c in loaded_index.search(q)] == [card_key(c) for c in index.search(q)], q
+
+
+def ingest(tmp_path, dataset):
+    return ingest_dataset(
+        tmp_path / "cards.snapshot", tmp_path / "manifest.json", dataset[0], tmp_path / "deltas", pick_image_url
+    )
+
+
+def test_touched_dataset_with_same_content_keeps_the_snapshot(tmp_path, dataset):
+    assert ingest(tmp_path, dataset)[2].mode == "complet"
+    written = (tmp_path / "cards.snapshot").read_bytes()
+    st = dataset[0].stat()
+    os.utime(dataset[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    _, _, report = ingest(tmp_path, dataset)
+    assert (report.mode, report.changed, report.updated) == ("incrémental", [], 0)
+    assert (tmp_path / "cards.snapshot").read_bytes() == written
+    assert ingest(tmp_path, dataset)[2].mode == "snapshot"
+
+
+@pytest.mark.parametrize("edit", ["resize", "same_size"])
+def test_changed_dataset_is_not_served_from_the_old_snapshot(tmp_path, dataset, edit):
+    ingest(tmp_path, dataset)
+    text = dataset[0].read_text(encoding="utf-8")
+    text = text + " " if edit == "resize" else text.replace("Mickey", "Minnie")
+    st = dataset[0].stat()
+    dataset[0].write_text(text, encoding="utf-8")
+    os.utime(dataset[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    cards, index, report = ingest(tmp_path, dataset)
+    assert report.mode == "incrémental"
+    assert report.updated == (0 if edit == "resize" else 1)
+    assert [card_key(c) for c in index.search("minnie")] == ([] if edit == "resize" else ["3"])
+
+
+def test_other_version_or_corrupt_snapshot_is_rebuilt(tmp_path, dataset, monkeypatch):
+    out = tmp_path / "cards.snapshot"
+    ingest(tmp_path, dataset)
+    monkeypatch.setattr(snap_mod, "SNAPSHOT_VERSION", snap_mod.SNAPSHOT_VERSION + 1)
+    assert open_snapshot(out) is None
+    cards, _, report = ingest(tmp_path, dataset)
+    assert (report.mode, len(cards)) == ("complet", 5)
+    assert ingest(tmp_path, dataset)[2].mode == "snapshot"
+    monkeypatch.undo()
+
+    out.write_bytes(out.read_bytes()[:20])
+    assert open_snapshot(out) is None
+    assert ingest(tmp_path, dataset)[2].mode == "complet"
+    assert open_snapshot(tmp_path / "absent.snapshot") is None
+
+
+def test_in_memory_snapshot_reads_like_the_mapped_one(tmp_path, dataset):
+    out, _, _ = build(tmp_path, dataset)
+    mapped, copied = Snapshot(out), Snapshot(out, in_memory=True)
+    assert [c.to_dict() for c in mapped.cards()] == [c.to_dict() for c in copied.cards()]
+    mapped.close()
+    copied.close()
@@ -0,0 +1,40 @@
+import time
+
+from src.core import make_proxies as mp
+from src.core.card_record import make_record
+from src.core.dataset import DatasetState
+from src.core.decklist import QueryCache
+from src.core.search_index import CardIndex
+from src.ui.validation import LiveValidator
+from tests.conftest import raw_card
+
+
+def settle(validator, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while validator.pending and time.monotonic() < deadline:
+        validator.collect()
+        time.sleep(0.01)
+    assert not validator.pending
+
+
+def test_failed_lookup_gives_a_final_state_then_retries(monkeypatch):
+    cards = [make_record(raw_card(1, "Elsa", "Reine des Neiges"), mp.pick_image_url)]
+    state = DatasetState(cards, CardIndex(cards), (1, 1))
+
+    def broken():
+        raise OSError("dataset illisible")
+
+    monkeypatch.setattr(mp, "DECK_QUERIES", QueryCache(None))
+    monkeypatch.setattr(mp.DATASET, "get", broken)
+    validator = LiveValidator()
+    validator.update("2 Elsa\n1 Mickey")
+    settle(validator)
+
+    results = [validator.result(l) for l in validator.lines]
+    assert [(r.title, r.error) for r in results] == [(None, "dataset illisible")] * 2
+
+    monkeypatch.setattr(mp.DATASET, "get", lambda: state)
+    validator.update("2 Elsa\n1 Mickey")
+    settle(validator)
+    results = [validator.result(l) for l in validator.lines]
+    assert [(r.title, r.error) for r in results] == [("Elsa – Reine des Neiges", None), (None, None)]